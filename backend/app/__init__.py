@@ -3,7 +3,6 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
 from config import Config
-from .api.youtube_routes import youtube_bp
 
 db = SQLAlchemy()
 jwt = JWTManager()
@@ -22,11 +21,13 @@ def create_app(config_class=Config):
     from app.api.content import bp as content_bp
     from app.api.auth import bp as auth_bp
     from app.api.youtube_routes import youtube_bp
+    from app.api.analysis import bp as analysis_bp
     
     app.register_blueprint(trends_bp, url_prefix='/api/trends')
     app.register_blueprint(content_bp, url_prefix='/api/content')
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(youtube_bp, url_prefix='/api/youtube')
+    app.register_blueprint(analysis_bp, url_prefix='/api/analysis')
 
     @app.route('/health')
     def health_check():
@@ -0,0 +1,197 @@
+from typing import Any, AsyncIterable, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+import heapq
+from itertools import count
+
+
+class TopK:
+    """Conserve les k meilleurs éléments d'un flux grâce à un tas borné."""
+
+    def __init__(self, k: int, key: Callable[[Any], float]):
+        self.k = k
+        self.key = key
+        self._heap = []
+        self._seq = count()
+
+    def push(self, item: Any) -> None:
+        """Ajoute un élément en O(log k), en évinçant le plus faible si besoin."""
+        if self.k <= 0:
+            return
+        # À score égal, l'élément le plus récent est évincé en premier,
+        # comme avec un tri stable décroissant suivi d'une troncature
+        entry = (self.key(item), -next(self._seq), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def merge(self, other: 'TopK') -> None:
+        """Fusionne un autre tas dans celui-ci."""
+        for item in other.items():
+            self.push(item)
+
+    def items(self) -> List[Any]:
+        """Retourne les éléments triés par score décroissant."""
+        return [item for _, _, item in sorted(self._heap, key=lambda e: (-e[0], -e[1]))]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class SpaceSaving:
+    """
+    Éléments les plus fréquents d'un flux en mémoire bornée (Space-Saving).
+
+    Au plus `capacity` compteurs sont suivis. Un élément nouveau quand le
+    résumé est plein hérite du plus petit compteur, compté comme erreur ;
+    chaque estimation majore donc la fréquence réelle d'au plus cette
+    erreur. Tant que le nombre d'éléments distincts ne dépasse pas
+    `capacity`, les comptes sont exacts et `most_common` donne le même
+    résultat que `Counter.most_common`.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        self.evicted = False
+
+    @property
+    def exact(self) -> bool:
+        """Vrai tant qu'aucun élément n'a été évincé (comptes exacts)."""
+        return not self.evicted
+
+    def _floor(self) -> int:
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def update(self, weights: Mapping[Hashable, int]) -> None:
+        """Intègre un lot d'occurrences {élément: nombre} (un `Counter` par exemple)."""
+        floor = self._floor()
+        for item, weight in weights.items():
+            if item in self.counts:
+                self.counts[item] += weight
+            else:
+                self.counts[item] = floor + weight
+                self.errors[item] = floor
+        if len(self.counts) > self.capacity:
+            # Ordre d'insertion conservé : à égalité, le premier vu l'emporte
+            keep = set(heapq.nlargest(self.capacity, self.counts, key=self.counts.__getitem__))
+            self.counts = {item: n for item, n in self.counts.items() if item in keep}
+            self.errors = {item: self.errors[item] for item in self.counts}
+            self.evicted = True
+
+    def most_common(self, n: int) -> List[Tuple[Hashable, int]]:
+        return sorted(self.counts.items(), key=lambda entry: -entry[1])[:n]
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+
+class GroupAggregate:
+    """Agrégats courants d'un groupe de tendances (une plateforme)."""
+
+    def __init__(self, k: int, metric_key: Callable[[Any], float], sum_fields: Dict[str, str]):
+        self.count = 0
+        self.sums = {name: 0 for name in sum_fields}
+        self.categories = set()
+        self.top = TopK(k, metric_key)
+
+    def merge(self, other: 'GroupAggregate') -> None:
+        self.count += other.count
+        for name, value in other.sums.items():
+            self.sums[name] = self.sums.get(name, 0) + value
+        self.categories |= other.categories
+        self.top.merge(other.top)
+
+
+class TrendAggregator:
+    """
+    Agrégateur en flux des tendances.
+
+    Chaque tendance est consommée une seule fois : un tas borné par groupe
+    conserve le top-K selon la métrique choisie, tandis que les sommes,
+    les compteurs et les catégories sont maintenus au fil de l'eau.
+    La mémoire est proportionnelle au nombre de groupes × k, et non au
+    nombre de tendances.
+    """
+
+    def __init__(
+        self,
+        metric: str = 'views',
+        k: int = 10,
+        sum_fields: Optional[Dict[str, str]] = None,
+        group_by: str = 'platform',
+        category_field: str = 'type',
+        default_category: str = 'general',
+    ):
+        """
+        Args:
+            metric: Champ utilisé pour classer le top-K
+            k: Nombre de tendances conservées par groupe
+            sum_fields: Sommes à maintenir {nom_du_résultat: champ_de_la_tendance}
+            group_by: Champ de regroupement
+            category_field: Champ contenant la catégorie
+            default_category: Catégorie utilisée si le champ est absent ou vide
+        """
+        self.metric = metric
+        self.k = k
+        self.sum_fields = sum_fields if sum_fields is not None else {'total_engagement': metric}
+        self.group_by = group_by
+        self.category_field = category_field
+        self.default_category = default_category
+        self.groups: Dict[str, GroupAggregate] = {}
+
+    def _metric_value(self, trend: Dict[str, Any]) -> float:
+        return trend.get(self.metric, 0) or 0
+
+    def _group(self, name: str) -> GroupAggregate:
+        group = self.groups.get(name)
+        if group is None:
+            group = GroupAggregate(self.k, self._metric_value, self.sum_fields)
+            self.groups[name] = group
+        return group
+
+    def add(self, trend: Dict[str, Any]) -> None:
+        """Intègre une tendance dans les agrégats de son groupe."""
+        group = self._group(trend[self.group_by])
+        group.count += 1
+        for name, field in self.sum_fields.items():
+            group.sums[name] += trend.get(field, 0) or 0
+        group.categories.add(trend.get(self.category_field) or self.default_category)
+        group.top.push(trend)
+
+    def consume(self, trends: Iterable[Dict[str, Any]]) -> 'TrendAggregator':
+        """Consomme un itérable de tendances."""
+        for trend in trends:
+            self.add(trend)
+        return self
+
+    async def consume_async(self, trends: AsyncIterable[Dict[str, Any]]) -> 'TrendAggregator':
+        """Consomme un itérateur asynchrone de tendances."""
+        async for trend in trends:
+            self.add(trend)
+        return self
+
+    def merge(self, other: 'TrendAggregator') -> 'TrendAggregator':
+        """Fusionne les agrégats d'un autre agrégateur (mêmes paramètres)."""
+        for name, group in other.groups.items():
+            self._group(name).merge(group)
+        return self
+
+    def platform_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Retourne les statistiques par groupe, sérialisables en JSON."""
+        stats = {}
+        for name, group in self.groups.items():
+            stats[name] = {
+                'total_trends': group.count,
+                **group.sums,
+                'categories': sorted(group.categories),
+                'top_trends': group.top.items(),
+            }
+        return stats
+
+    def global_stats(self) -> Dict[str, Any]:
+        """Retourne les totaux tous groupes confondus."""
+        totals = {'total_trends': sum(group.count for group in self.groups.values())}
+        for name in self.sum_fields:
+            totals[name] = sum(group.sums[name] for group in self.groups.values())
+        return totals
@@ -0,0 +1,243 @@
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Union
+import logging
+from datetime import date, timedelta
+import numpy as np
+from .heatmap import HOURS, WEEKDAYS, EngagementHeatmap
+
+logger = logging.getLogger(__name__)
+
+PLATFORMS = ('youtube', 'tiktok', 'instagram')
+CONTENT_TYPES = ('tutorial', 'review', 'story')
+
+# Horaires par défaut, pour une chaîne (ou un jour) sans données de publication
+DEFAULT_POSTING_HOURS = {
+    "Monday": [9, 12, 15],
+    "Tuesday": [10, 14, 16],
+    "Wednesday": [9, 13, 17],
+    "Thursday": [11, 14, 16],
+    "Friday": [10, 12, 15],
+    "Saturday": [11, 14, 17],
+    "Sunday": [12, 15, 18]
+}
+
+def _hours_grid(hours_by_day: Mapping[str, Sequence[int]]) -> np.ndarray:
+    grid = np.zeros((len(WEEKDAYS), HOURS))
+    for index, day in enumerate(WEEKDAYS):
+        grid[index, list(hours_by_day.get(day, []))] = 1.0
+    return grid
+
+_DEFAULT_GRID = _hours_grid(DEFAULT_POSTING_HOURS)
+
+def hour_weights(source: Union[None, EngagementHeatmap, Mapping[str, Sequence[int]], Any] = None) -> np.ndarray:
+    """
+    Poids des heures de publication (7 × 24, positifs) d'une chaîne.
+
+    Args:
+        source: Carte apprise (EngagementHeatmap : engagement moyen par case),
+                meilleures heures par jour ({'Monday': [9, 12], ...}), tableau
+                7 × 24 de poids, ou None (horaires par défaut)
+
+    Les jours sans aucun poids reprennent les horaires par défaut.
+    """
+    if source is None:
+        return _DEFAULT_GRID.copy()
+    if isinstance(source, EngagementHeatmap):
+        weights = np.nan_to_num(source.mean, nan=0.0)
+    elif isinstance(source, Mapping):
+        weights = _hours_grid(source)
+    else:
+        weights = np.asarray(source, dtype=float).reshape(len(WEEKDAYS), HOURS)
+    weights = np.clip(np.nan_to_num(weights, nan=0.0), 0.0, None)
+    empty = ~weights.any(axis=1)
+    weights[empty] = _DEFAULT_GRID[empty]
+    return weights
+
+def _padded(rows: List[np.ndarray]) -> np.ndarray:
+    """Lignes de longueurs différentes complétées par des zéros."""
+    matrix = np.zeros((len(rows), max((len(row) for row in rows), default=0) or 1))
+    for index, row in enumerate(rows):
+        matrix[index, :len(row)] = row
+    return matrix
+
+def _weighted_choice(rng: np.random.Generator, weights: np.ndarray, shape: tuple) -> np.ndarray:
+    """
+    Tire, pour chaque ligne de `weights` (U × K), un tableau `shape` d'indices
+    de colonne proportionnellement aux poids, en une recherche dichotomique
+    sur les fonctions de répartition mises bout à bout (ligne i décalée de i).
+    """
+    users = len(weights)
+    cumulative = np.cumsum(weights, axis=1)
+    cumulative /= cumulative[:, -1:]
+    offsets = np.arange(users)[:, None]
+    flat = (cumulative + offsets).ravel()
+    draws = rng.random((users, *shape)) + offsets.reshape((users,) + (1,) * len(shape))
+    indices = np.searchsorted(flat, draws.ravel(), side='right').reshape(draws.shape)
+    columns = indices - offsets.reshape(draws.shape[:1] + (1,) * len(shape)) * weights.shape[1]
+    return np.minimum(columns, weights.shape[1] - 1)
+
+class CalendarEngine:
+    """
+    Génère les calendriers de publication de nombreux créateurs à la fois.
+
+    Chaque créateur apporte sa carte d'heures de publication (apprise, voir
+    `hour_weights`), ses sujets pondérés et ses plateformes. Pour un lot de
+    créateurs, tous les créneaux sont tirés en quelques opérations NumPy :
+
+    - heures : `frequency` heures distinctes par jour, tirées sans remise
+      proportionnellement aux poids du jour de la semaine (Gumbel-top-k) ;
+      une fréquence fractionnaire (3/7 pour trois publications par semaine)
+      est répartie régulièrement sur les jours du calendrier ;
+    - sujets et plateformes : tirage pondéré avec remise par créneau.
+
+    Le générateur aléatoire d'un lot est dérivé de (seed, numéro du lot) :
+    à graine et taille de lot égales, les calendriers sont identiques.
+    Les calendriers sont produits créateur par créateur (`iter_calendars`),
+    si bien qu'un export de milliers de créateurs tient en mémoire bornée.
+    """
+
+    def __init__(
+        self,
+        seed: Optional[int] = 0,
+        chunk_size: int = 1000,
+        platforms: Sequence[str] = PLATFORMS,
+        content_types: Sequence[str] = CONTENT_TYPES,
+    ):
+        """
+        Args:
+            seed: Graine des tirages (None : tirages non reproductibles)
+            chunk_size: Nombre de créateurs traités par lot vectorisé
+            platforms: Plateformes par défaut d'un créateur
+            content_types: Types de contenu proposés
+        """
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.platforms = tuple(platforms)
+        self.content_types = tuple(content_types)
+
+    def _rng(self, chunk: int) -> np.random.Generator:
+        if self.seed is None:
+            return np.random.default_rng()
+        return np.random.default_rng([self.seed, chunk])
+
+    @staticmethod
+    def _topics(creator: Mapping[str, Any]) -> Dict[str, float]:
+        topics = creator.get('topics') or {}
+        if not isinstance(topics, Mapping):
+            topics = {topic: 1.0 for topic in topics}
+        topics = {topic: float(weight) for topic, weight in topics.items() if weight and weight > 0}
+        if not topics:
+            raise ValueError(f"Aucun sujet pour le créateur {creator.get('user_id')}")
+        return topics
+
+    def _schedule_chunk(
+        self,
+        creators: List[Mapping[str, Any]],
+        start: date,
+        days: int,
+        rng: np.random.Generator,
+    ) -> Iterator[Dict[str, Any]]:
+        topics = [self._topics(creator) for creator in creators]
+        platforms = [tuple(creator.get('platforms') or self.platforms) for creator in creators]
+        frequency = np.array([float(creator.get('frequency', 3)) for creator in creators])
+        # Publications du jour d : ⌊(d + 1)·f⌋ - ⌊d·f⌋, soit f par jour si f est entier
+        elapsed = np.floor(np.arange(days + 1) * frequency[:, None] + 1e-9)  # 7 × 3/7 = 3
+        per_day = np.diff(elapsed, axis=1).astype(int)
+        slots = int(min(per_day.max(initial=0), HOURS))
+        if slots <= 0:
+            for creator in creators:
+                yield {'user_id': creator.get('user_id'), 'entries': []}
+            return
+
+        # Poids des heures de chaque jour du calendrier : U × D × 24
+        weights = np.stack([hour_weights(creator.get('heatmap')) for creator in creators])
+        weekdays = (start.weekday() + np.arange(days)) % len(WEEKDAYS)
+        day_weights = weights[:, weekdays, :]
+
+        # Gumbel-top-k : les `slots` plus grandes clés log(w) + Gumbel forment un
+        # tirage sans remise proportionnel aux poids ; une heure de poids nul
+        # (clé -inf) n'est jamais retenue
+        with np.errstate(divide='ignore'):
+            keys = np.log(day_weights) + rng.gumbel(size=day_weights.shape)
+        ranked = np.argsort(-keys, axis=-1, kind='stable')[..., :slots]
+        valid = (
+            np.isfinite(np.take_along_axis(keys, ranked, axis=-1)) &
+            (np.arange(slots) < per_day[:, :, None])
+        )
+        hours = np.sort(np.where(valid, ranked, HOURS), axis=-1)
+
+        topic_index = _weighted_choice(rng, _padded([np.fromiter(t.values(), float) for t in topics]), (days, slots))
+        platform_index = _weighted_choice(rng, _padded([np.ones(len(p)) for p in platforms]), (days, slots))
+        type_index = rng.integers(len(self.content_types), size=(len(creators), days, slots))
+
+        dates = [(start + timedelta(days=day)).isoformat() for day in range(days)]
+        topic_names = [list(t) for t in topics]
+        topic_tags = [[f"#{topic.lower().replace(' ', '')}" for topic in names] for names in topic_names]
+        for user, creator in enumerate(creators):
+            entries = []
+            user_hours = hours[user].tolist()
+            user_topics = topic_index[user].tolist()
+            user_platforms = platform_index[user].tolist()
+            user_types = type_index[user].tolist()
+            for day in range(days):
+                for slot, hour in enumerate(user_hours[day]):
+                    if hour >= HOURS:
+                        break  # Créneaux non retenus, triés en fin de journée
+                    topic = user_topics[day][slot]
+                    platform = platforms[user][user_platforms[day][slot]]
+                    entries.append({
+                        'date': dates[day],
+                        'time': f"{hour:02d}:00",
+                        'topic': topic_names[user][topic],
+                        'platform': platform,
+                        'content_type': self.content_types[user_types[day][slot]],
+                        'suggested_hashtags': [topic_tags[user][topic], "#content", f"#{platform}"]
+                    })
+            yield {'user_id': creator.get('user_id'), 'entries': entries}
+
+    def iter_calendars(
+        self,
+        creators: Iterable[Mapping[str, Any]],
+        start: Optional[date] = None,
+        days: int = 30,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Calendriers d'une suite de créateurs, produits au fil de l'eau.
+
+        Args:
+            creators: Créateurs {'user_id', 'topics' (liste ou {sujet: poids}),
+                      'heatmap' (voir `hour_weights`), 'frequency' (publications
+                      par jour, éventuellement fractionnaire, 3 par défaut),
+                      'platforms' (optionnel)}
+            start: Premier jour (aujourd'hui par défaut)
+            days: Nombre de jours
+
+        Yields:
+            {'user_id': ..., 'entries': [{'date', 'time', 'topic', 'platform',
+            'content_type', 'suggested_hashtags'}, ...]}, dans l'ordre des créateurs
+
+        Raises:
+            ValueError: Si un créateur n'a aucun sujet
+        """
+        start = start or date.today()
+        chunk: List[Mapping[str, Any]] = []
+        chunk_number = 0
+        for creator in creators:
+            chunk.append(creator)
+            if len(chunk) >= self.chunk_size:
+                yield from self._schedule_chunk(chunk, start, days, self._rng(chunk_number))
+                chunk, chunk_number = [], chunk_number + 1
+        if chunk:
+            yield from self._schedule_chunk(chunk, start, days, self._rng(chunk_number))
+
+    def calendar(
+        self,
+        topics: Union[Sequence[str], Mapping[str, float]],
+        heatmap: Any = None,
+        frequency: float = 3,
+        start: Optional[date] = None,
+        days: int = 30,
+        platforms: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Calendrier d'un seul créateur (voir `iter_calendars`)."""
+        creator = {'topics': topics, 'heatmap': heatmap, 'frequency': frequency, 'platforms': platforms}
+        return next(self.iter_calendars([creator], start, days))['entries']
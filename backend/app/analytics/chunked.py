@@ -0,0 +1,195 @@
+from typing import Any, Dict, Iterator, Optional, Sequence, TYPE_CHECKING
+import logging
+import math
+import os
+import time
+from datetime import datetime
+
+# numpy et pandas sont importés à la première utilisation
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CORRELATION_FEATURES = ('volume', 'engagement', 'growth_rate', 'sentiment_score')
+# Colonnes lues par l'analyse en flux
+ANALYSIS_COLUMNS = ('id', *CORRELATION_FEATURES)
+SIGNIFICANT_CORRELATION = 0.5  # Seuil de corrélation significative
+
+# Lignes lues par requête (ANALYSIS_CHUNK_SIZE)
+DEFAULT_CHUNK_SIZE = int(os.environ.get('ANALYSIS_CHUNK_SIZE', 50_000))
+
+class CorrelationAccumulator:
+    """
+    Matrice de corrélation de Pearson en flux, sur observations complètes
+    deux à deux comme `DataFrame.corr()` : pour chaque paire de colonnes,
+    effectif, moyennes, sommes des carrés et co-moment fusionnables.
+    """
+
+    def __init__(self, columns: Sequence[str]):
+        import numpy as np
+
+        self.columns = list(columns)
+        shape = (len(columns), len(columns))
+        self.count = np.zeros(shape)
+        self.mean_x = np.zeros(shape)
+        self.mean_y = np.zeros(shape)
+        self.m2_x = np.zeros(shape)
+        self.m2_y = np.zeros(shape)
+        self.co_moment = np.zeros(shape)
+
+    def _combine(self, i: int, j: int, count, mean_x, mean_y, m2_x, m2_y, co_moment) -> None:
+        total = self.count[i, j] + count
+        delta_x = mean_x - self.mean_x[i, j]
+        delta_y = mean_y - self.mean_y[i, j]
+        factor = self.count[i, j] * count / total
+        self.m2_x[i, j] += m2_x + delta_x * delta_x * factor
+        self.m2_y[i, j] += m2_y + delta_y * delta_y * factor
+        self.co_moment[i, j] += co_moment + delta_x * delta_y * factor
+        self.mean_x[i, j] += delta_x * count / total
+        self.mean_y[i, j] += delta_y * count / total
+        self.count[i, j] = total
+
+    def update(self, matrix: 'np.ndarray') -> None:
+        """Intègre un lot (lignes × colonnes, NaN pour les valeurs manquantes)."""
+        import numpy as np
+
+        valid = ~np.isnan(matrix)
+        for i in range(len(self.columns)):
+            for j in range(i, len(self.columns)):
+                mask = valid[:, i] & valid[:, j]
+                count = int(mask.sum())
+                if not count:
+                    continue
+                x, y = matrix[mask, i], matrix[mask, j]
+                mean_x, mean_y = x.mean(), y.mean()
+                dx, dy = x - mean_x, y - mean_y
+                self._combine(i, j, count, mean_x, mean_y, (dx * dx).sum(), (dy * dy).sum(), (dx * dy).sum())
+
+    def merge(self, other: 'CorrelationAccumulator') -> None:
+        for i in range(len(self.columns)):
+            for j in range(i, len(self.columns)):
+                if other.count[i, j]:
+                    self._combine(
+                        i, j, other.count[i, j], other.mean_x[i, j], other.mean_y[i, j],
+                        other.m2_x[i, j], other.m2_y[i, j], other.co_moment[i, j],
+                    )
+
+    def correlation(self, i: int, j: int) -> float:
+        i, j = min(i, j), max(i, j)
+        divisor = math.sqrt(self.m2_x[i, j] * self.m2_y[i, j])
+        if not self.count[i, j] or divisor == 0:
+            return math.nan
+        return max(-1.0, min(1.0, float(self.co_moment[i, j] / divisor)))
+
+    def matrix(self) -> Dict[str, Dict[str, float]]:
+        """Matrice au format `DataFrame.corr().to_dict()`."""
+        return {
+            column: {row: self.correlation(i, j) for i, row in enumerate(self.columns)}
+            for j, column in enumerate(self.columns)
+        }
+
+class ChunkedTrendAnalysis:
+    """
+    Corrélations entre métriques des tendances, calculées par lots en
+    mémoire bornée.
+
+    Produit le même résultat que `analyze_correlations` (tasks.analysis)
+    sans charger la fenêtre entière : chaque lot est intégré à un état
+    fusionnable puis libéré. Les performances par plateforme ne sont pas
+    calculées ici : elles viennent de `services.trend_queries.platform_performance`
+    (agrégats exacts dans la base), seule source utilisée par les tâches
+    et l'API.
+    """
+
+    def __init__(self):
+        self.correlations = CorrelationAccumulator(CORRELATION_FEATURES)
+        self.rows = 0
+        self.chunks = 0
+
+    def update(self, chunk: 'pd.DataFrame') -> 'ChunkedTrendAnalysis':
+        """Intègre un lot de tendances (colonnes de `ANALYSIS_COLUMNS`)."""
+        self.correlations.update(chunk[list(CORRELATION_FEATURES)].to_numpy(dtype=float))
+        self.rows += len(chunk)
+        self.chunks += 1
+        return self
+
+    def merge(self, other: 'ChunkedTrendAnalysis') -> 'ChunkedTrendAnalysis':
+        """Fusionne l'état d'une autre analyse (lots ultérieurs ou autre worker)."""
+        self.correlations.merge(other.correlations)
+        self.rows += other.rows
+        self.chunks += other.chunks
+        return self
+
+    def correlation_analysis(self) -> Dict[str, Any]:
+        """Corrélations entre métriques (format de `analyze_correlations`)."""
+        significant_correlations = []
+        for i, metric1 in enumerate(CORRELATION_FEATURES):
+            for j in range(i + 1, len(CORRELATION_FEATURES)):
+                corr = self.correlations.correlation(i, j)
+                if abs(corr) > SIGNIFICANT_CORRELATION:
+                    significant_correlations.append({
+                        'metric1': metric1,
+                        'metric2': CORRELATION_FEATURES[j],
+                        'correlation': corr,
+                    })
+        return {
+            'correlation_matrix': self.correlations.matrix(),
+            'significant_correlations': significant_correlations,
+        }
+
+def iter_trend_chunks(
+    session,
+    since: Optional[datetime] = None,
+    table=None,
+    columns: Sequence[str] = ANALYSIS_COLUMNS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator['pd.DataFrame']:
+    """
+    Lit les tendances par lots de `chunk_size` lignes, dans l'ordre des
+    identifiants (pagination par clé : chaque requête reprend après le
+    dernier identifiant lu, sans OFFSET).
+    """
+    import pandas as pd
+    from sqlalchemy import select
+
+    if table is None:
+        from app.models.trend import Trend
+        table = Trend.__table__
+
+    columns = list(columns)
+    if 'id' not in columns:
+        columns.insert(0, 'id')
+    id_index = columns.index('id')
+    last_id = None
+    while True:
+        query = select(*(table.c[column] for column in columns)).order_by(table.c.id).limit(chunk_size)
+        if since is not None:
+            query = query.where(table.c.detected_at >= since)
+        if last_id is not None:
+            query = query.where(table.c.id > last_id)
+        rows = session.execute(query).all()
+        if not rows:
+            return
+        last_id = rows[-1][id_index]
+        yield pd.DataFrame.from_records(rows, columns=columns)
+        if len(rows) < chunk_size:
+            return
+
+def analyze_trend_window(
+    session,
+    since: Optional[datetime] = None,
+    table=None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ChunkedTrendAnalysis:
+    """Analyse en flux toutes les tendances détectées depuis `since`."""
+    start = time.perf_counter()
+    analysis = ChunkedTrendAnalysis()
+    for chunk in iter_trend_chunks(session, since, table, chunk_size=chunk_size):
+        analysis.update(chunk)
+    logger.info(
+        f"{analysis.rows} tendances analysées en {analysis.chunks} lots "
+        f"({time.perf_counter() - start:.1f}s)"
+    )
+    return analysis
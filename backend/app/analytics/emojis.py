@@ -0,0 +1,92 @@
+from typing import Dict, Iterable, List
+import re
+from functools import lru_cache
+import emoji
+
+_SEQUENCES = emoji.EMOJI_DATA
+# Sélecteur de variation (U+FE0F) et modificateurs de teinte de peau (U+1F3FB à U+1F3FF)
+_VARIANTS = re.compile('[\ufe0f\U0001F3FB-\U0001F3FF]')
+_KEYCAP = '\u20e3'
+_END = None  # Marque une séquence complète dans le trie
+
+def _build_trie() -> Dict:
+    trie: Dict = {}
+    for sequence in _SEQUENCES:
+        node = trie
+        for char in sequence:
+            node = node.setdefault(char, {})
+        node[_END] = sequence
+    return trie
+
+def _coarse_class(chars: Iterable[str]) -> str:
+    """
+    Classe de caractères englobante : Latin-1 listé un à un, puis une plage
+    par plan. Une classe à quelques plages est testée bien plus vite par
+    `re` qu'une énumération exacte ; le trie élimine les faux positifs.
+    """
+    codepoints = sorted({ord(char) for char in chars if not char.isascii()})
+    latin1 = [cp for cp in codepoints if cp < 0x100]
+    bmp = [cp for cp in codepoints if 0x100 <= cp < 0x10000]
+    astral = [cp for cp in codepoints if cp >= 0x10000]
+    parts = [re.escape(chr(cp)) for cp in latin1]
+    for plane in (bmp, astral):
+        if plane:
+            parts.append(f'{re.escape(chr(plane[0]))}-{re.escape(chr(plane[-1]))}')
+    return f"[{''.join(parts)}]"
+
+# Construits une fois à l'import (une dizaine de millisecondes)
+_TRIE = _build_trie()
+_RUNS = re.compile(
+    _coarse_class(sequence[0] for sequence in _SEQUENCES)
+    + _coarse_class(char for sequence in _SEQUENCES for char in sequence[1:]) + '*'
+)
+
+def _split(text: str, found: List[str]) -> None:
+    """Découpe un texte en séquences connues, à la correspondance la plus longue."""
+    length = len(text)
+    pos = 0
+    while pos < length:
+        node = _TRIE
+        end = pos
+        i = pos
+        while i < length:
+            node = node.get(text[i])
+            if node is None:
+                break
+            i += 1
+            if _END in node:
+                end = i
+        if end > pos:
+            found.append(text[pos:end])
+            pos = end
+        else:
+            pos += 1
+
+def extract_emojis(text: str) -> List[str]:
+    """
+    Extrait les emojis d'un texte, séquences comprises.
+
+    La correspondance la plus longue est retenue : '❤️' (avec sélecteur de
+    variation), '👍🏽' (teinte de peau), '👨‍👩‍👧' (séquence ZWJ), un drapeau
+    ou une touche '1️⃣' forment un seul emoji.
+    """
+    if text.isascii():
+        return []
+    found: List[str] = []
+    if _KEYCAP in text:
+        # Les touches commencent par un caractère ASCII : parcours complet (rare)
+        _split(text, found)
+        return found
+    # Les suites de caractères candidats sont trouvées en C ; une suite qui
+    # est exactement un emoji (cas courant) est retenue sans passer par le trie
+    for run in _RUNS.findall(text):
+        if run in _SEQUENCES:
+            found.append(run)
+        else:
+            _split(run, found)
+    return found
+
+@lru_cache(maxsize=4096)
+def emoji_key(token: str) -> str:
+    """Forme de base d'un emoji (sans sélecteur de variation ni teinte de peau)."""
+    return _VARIANTS.sub('', token) or token
@@ -0,0 +1,228 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+HOURS = 24
+
+def _check_timezone(tz: str) -> str:
+    try:
+        ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Fuseau horaire inconnu: {tz}")
+    return tz
+
+def _as_utc(moment: datetime) -> datetime:
+    """Date UTC (une date naïve est supposée UTC)."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+class EngagementHeatmap:
+    """
+    Carte jour de la semaine × heure (7 × 24) de l'engagement des publications.
+
+    Chaque cellule cumule la somme et le nombre des valeurs (taux
+    d'engagement, vues...) publiées ce jour-là à cette heure, dans le fuseau
+    horaire de la carte. Les publications sont réparties en une passe
+    vectorisée (`np.bincount` sur l'indice jour × 24 + heure) ; deux cartes
+    du même fuseau se fusionnent par addition.
+    """
+
+    def __init__(self, tz: str = 'UTC'):
+        """
+        Args:
+            tz: Fuseau horaire des cases (nom IANA, ex. 'Europe/Paris')
+        """
+        self.tz = _check_timezone(tz)
+        self.sums = np.zeros((len(WEEKDAYS), HOURS))
+        self.counts = np.zeros((len(WEEKDAYS), HOURS))
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[Dict[str, Any]],
+        time_key: str = 'posted_at',
+        value_key: str = 'engagement_rate',
+        days: Optional[int] = None,
+        tz: str = 'UTC',
+        now: Optional[datetime] = None,
+    ) -> 'EngagementHeatmap':
+        """
+        Construit la carte d'une liste de publications.
+
+        Args:
+            records: Publications (dictionnaires)
+            time_key: Clé de la date de publication (ISO 8601 ou datetime, UTC si naïve)
+            value_key: Clé de la valeur agrégée
+            days: Fenêtre, en jours avant `now` (toutes les publications si None)
+            tz: Fuseau horaire des cases
+            now: Fin de la fenêtre (maintenant par défaut)
+        """
+        timestamps, values = [], []
+        for record in records:
+            timestamps.append(record.get(time_key))
+            values.append(record.get(value_key))
+        heatmap = cls(tz)
+        since = None
+        if days is not None:
+            since = (now or datetime.now(timezone.utc)) - timedelta(days=days)
+        heatmap.add(timestamps, values, since)
+        return heatmap
+
+    @classmethod
+    def from_arrays(cls, sums: Sequence[Sequence[float]], counts: Sequence[Sequence[float]], tz: str = 'UTC') -> 'EngagementHeatmap':
+        """Reconstruit une carte enregistrée (voir `to_arrays`)."""
+        heatmap = cls(tz)
+        heatmap.sums = np.asarray(sums, dtype=float).reshape(heatmap.sums.shape)
+        heatmap.counts = np.asarray(counts, dtype=float).reshape(heatmap.counts.shape)
+        return heatmap
+
+    def to_arrays(self) -> Tuple[List[List[float]], List[List[float]]]:
+        """Sommes et nombres, en listes 7 × 24 (stockage JSON)."""
+        return self.sums.tolist(), self.counts.tolist()
+
+    def _buckets(
+        self,
+        timestamps: Sequence[Any],
+        values: Sequence[Any],
+        since: Optional[datetime] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Indice de case (jour × 24 + heure), valeur et date UTC des publications valides."""
+        import pandas as pd  # Importé à la première utilisation
+
+        times = pd.to_datetime(pd.Series(timestamps, dtype=object), utc=True, errors='coerce', format='ISO8601')
+        values = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=float)
+        valid = times.notna().to_numpy() & ~np.isnan(values)
+        if since is not None:
+            since = pd.Timestamp(since)
+            if since.tzinfo is None:
+                since = since.tz_localize('UTC')
+            valid &= (times >= since).to_numpy()
+        if not valid.all():
+            logger.debug(f"{int((~valid).sum())} publications hors fenêtre ou sans date/valeur")
+
+        times = times[valid]
+        local = times.dt.tz_convert(self.tz)
+        cells = local.dt.dayofweek.to_numpy() * HOURS + local.dt.hour.to_numpy()
+        return cells.astype(np.intp), values[valid], times.to_numpy(dtype='datetime64[ns]')
+
+    def add(
+        self,
+        timestamps: Sequence[Any],
+        values: Sequence[Any],
+        since: Optional[datetime] = None,
+        half_life_days: Optional[float] = None,
+        now: Optional[datetime] = None,
+    ) -> int:
+        """
+        Ajoute des publications à la carte.
+
+        Args:
+            timestamps: Dates de publication
+            values: Valeurs agrégées
+            since: Début de la fenêtre (aucune limite si None)
+            half_life_days: Pondère chaque publication par 0.5 ** (âge / demi-vie),
+                            l'âge étant compté jusqu'à `now` (pas de pondération si None)
+            now: Date de référence de la pondération (maintenant par défaut)
+
+        Returns:
+            Nombre de publications retenues (date et valeur valides, dans la fenêtre)
+        """
+        cells, values, times = self._buckets(timestamps, values, since)
+        weights = np.ones(len(values))
+        if half_life_days is not None:
+            reference = np.datetime64(_as_utc(now or datetime.now(timezone.utc)).replace(tzinfo=None), 'ns')
+            ages = (reference - times) / np.timedelta64(1, 'D')
+            weights = 0.5 ** (np.maximum(ages, 0.0) / half_life_days)
+        size = len(WEEKDAYS) * HOURS
+        self.sums += np.bincount(cells, weights=values * weights, minlength=size).reshape(self.sums.shape)
+        self.counts += np.bincount(cells, weights=weights, minlength=size).reshape(self.counts.shape)
+        return len(values)
+
+    def decay(self, factor: float) -> 'EngagementHeatmap':
+        """Multiplie sommes et nombres par `factor` (vieillissement ; moyennes inchangées)."""
+        self.sums *= factor
+        self.counts *= factor
+        return self
+
+    def to_timezone(self, tz: str, at: Optional[datetime] = None) -> 'EngagementHeatmap':
+        """
+        Copie de la carte dans un autre fuseau horaire, par décalage circulaire
+        des cases.
+
+        Le décalage est celui des deux fuseaux à la date `at` (maintenant par
+        défaut), arrondi à l'heure : les publications de part et d'autre d'un
+        changement d'heure sont approchées à une heure près.
+        """
+        at = _as_utc(at or datetime.now(timezone.utc))
+        shift = at.astimezone(ZoneInfo(_check_timezone(tz))).utcoffset() - at.astimezone(ZoneInfo(self.tz)).utcoffset()
+        hours = int(round(shift / timedelta(hours=1)))
+        heatmap = EngagementHeatmap(tz)
+        heatmap.sums = np.roll(self.sums.ravel(), hours).reshape(self.sums.shape)
+        heatmap.counts = np.roll(self.counts.ravel(), hours).reshape(self.counts.shape)
+        return heatmap
+
+    def merge(self, other: 'EngagementHeatmap') -> 'EngagementHeatmap':
+        """Ajoute une autre carte du même fuseau horaire."""
+        if other.tz != self.tz:
+            raise ValueError(f"Fuseaux horaires différents: {self.tz} et {other.tz}")
+        self.sums += other.sums
+        self.counts += other.counts
+        return self
+
+    @staticmethod
+    def _mean(sums: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    @property
+    def mean(self) -> np.ndarray:
+        """Moyenne par case (NaN sans publication)."""
+        return self._mean(self.sums, self.counts)
+
+    def day_means(self) -> np.ndarray:
+        """Moyenne par jour de la semaine, toutes heures confondues."""
+        return self._mean(self.sums.sum(axis=1), self.counts.sum(axis=1))
+
+    def hour_means(self) -> np.ndarray:
+        """Moyenne par heure, tous jours confondus."""
+        return self._mean(self.sums.sum(axis=0), self.counts.sum(axis=0))
+
+    @staticmethod
+    def _top(means: np.ndarray, n: int) -> List[int]:
+        """Indices des `n` meilleures moyennes (cases vides exclues, égalités dans l'ordre)."""
+        filled = np.flatnonzero(~np.isnan(means))
+        order = np.argsort(-means[filled], kind='stable')
+        return filled[order[:n]].tolist()
+
+    def best_hours(self, n: int = 3) -> Dict[str, List[int]]:
+        """Meilleures heures de chaque jour ayant des publications."""
+        means = self.mean
+        return {
+            day: self._top(means[index], n)
+            for index, day in enumerate(WEEKDAYS)
+            if self.counts[index].any()
+        }
+
+    def best_days(self, n: int = 3) -> List[int]:
+        """Indices (0 = lundi) des meilleurs jours."""
+        return self._top(self.day_means(), n)
+
+    def best_hours_overall(self, n: int = 3) -> List[int]:
+        """Meilleures heures, tous jours confondus."""
+        return self._top(self.hour_means(), n)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Représentation sérialisable : moyennes (None sans publication) et nombres."""
+        means = self.mean
+        return {
+            'timezone': self.tz,
+            'days': list(WEEKDAYS),
+            'mean': [[None if np.isnan(v) else float(v) for v in row] for row in means],
+            'count': self.counts.tolist(),
+        }
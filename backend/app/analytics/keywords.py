@@ -0,0 +1,173 @@
+from typing import Dict, FrozenSet, Iterable, List, Sequence, Set, Tuple
+import os
+import re
+from collections import Counter, deque
+from functools import lru_cache
+
+# À partir de ce nombre de motifs, la recherche passe par l'automate ;
+# en dessous, un `in` par motif (recherche de sous-chaîne en C) est plus rapide
+AUTOMATON_THRESHOLD = int(os.environ.get('KEYWORD_AUTOMATON_THRESHOLD', 64))
+# Suites de caractères dont le résultat est mémorisé (KEYWORD_RUN_CACHE_SIZE)
+RUN_CACHE_SIZE = int(os.environ.get('KEYWORD_RUN_CACHE_SIZE', 100_000))
+
+class KeywordMatcher:
+    """
+    Recherche simultanée de mots-clés (sous-chaînes) par automate
+    d'Aho-Corasick.
+
+    L'automate est construit une fois par lexique, sous forme d'automate
+    déterministe complet (les liens d'échec sont résolus à la construction) :
+    un texte est parcouru en une passe, quel que soit le nombre de motifs.
+    Un caractère absent de tous les motifs ramène l'automate à la racine ;
+    les suites de caractères des motifs sont donc extraites par une
+    expression régulière et leur résultat est mémorisé, les mêmes mots
+    revenant d'un texte à l'autre.
+
+    Pour un petit lexique (moins de `threshold` motifs), chaque motif est
+    cherché directement : le résultat est identique, et plus rapide.
+    """
+
+    def __init__(self, patterns: Iterable[str], threshold: int = AUTOMATON_THRESHOLD):
+        """
+        Args:
+            patterns: Motifs recherchés (doublons ignorés, sensible à la casse)
+            threshold: Nombre de motifs à partir duquel l'automate est utilisé
+        """
+        self.patterns: Tuple[str, ...] = tuple(dict.fromkeys(p for p in patterns if p))
+        self.use_automaton = len(self.patterns) >= threshold
+        # L'automate n'est construit que s'il sert
+        self._delta, self._outputs = self._build() if self.use_automaton else ([{}], [frozenset()])
+        alphabet = sorted({char for pattern in self.patterns for char in pattern})
+        self._runs = re.compile(f"[{''.join(re.escape(char) for char in alphabet)}]+") if alphabet else None
+        self._min_length = min((len(p) for p in self.patterns), default=0)
+        self._seen: Set[str] = set()
+        self._hits: Dict[str, FrozenSet[str]] = {}
+
+    def _build(self) -> Tuple[List[Dict[str, int]], List[FrozenSet[str]]]:
+        """Construit l'automate : transitions complètes et motifs reconnus par état."""
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Set[str]] = [set()]
+        for pattern in self.patterns:
+            state = 0
+            for char in pattern:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append(set())
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state].add(pattern)
+
+        # Parcours en largeur : lien d'échec de chaque état, puis transitions
+        # héritées de cet état (un état est complété après son lien d'échec)
+        delta = [dict(transitions) for transitions in goto]
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, target in delta[fail[state]].items():
+                delta[state].setdefault(char, target)
+            for char, target in goto[state].items():
+                fail[target] = delta[fail[state]].get(char, 0) if state else 0
+                outputs[target] |= outputs[fail[target]]
+                queue.append(target)
+        return delta, [frozenset(found) for found in outputs]
+
+    def _scan(self, text: str) -> FrozenSet[str]:
+        """Motifs présents dans un texte, par parcours de l'automate."""
+        delta, outputs = self._delta, self._outputs
+        state = 0
+        found: Set[str] = set()
+        for char in text:
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                found |= outputs[state]
+        return frozenset(found)
+
+    def search(self, text: str) -> Set[str]:
+        """Motifs présents dans un texte (chacun une fois)."""
+        if not self.use_automaton:
+            return {pattern for pattern in self.patterns if pattern in text}
+        if self._runs is None:
+            return set()
+
+        runs = set(self._runs.findall(text))
+        new = runs - self._seen
+        if new:
+            if len(self._seen) > RUN_CACHE_SIZE:
+                self._seen.clear()
+                self._hits.clear()
+                new = runs
+            for run in new:
+                if len(run) >= self._min_length:
+                    found = self._scan(run)
+                    if found:
+                        self._hits[run] = found
+            self._seen |= new
+
+        found: Set[str] = set()
+        for run in runs & self._hits.keys():
+            found |= self._hits[run]
+        return found
+
+class KeywordSentiment:
+    """
+    Sentiment par lexiques de mots positifs et négatifs, insensible à la
+    casse : score entre 0 et 1 (part des mots positifs, 0.5 sans mot trouvé).
+
+    Par défaut, un mot compte une fois s'il apparaît dans le texte, y compris
+    au sein d'un mot plus long ; avec `whole_words`, chaque occurrence d'un
+    mot isolé (séparé par des espaces) compte.
+    """
+
+    def __init__(self, positive: Iterable[str], negative: Iterable[str], whole_words: bool = False):
+        """
+        Args:
+            positive: Mots positifs
+            negative: Mots négatifs
+            whole_words: Compte les occurrences de mots isolés plutôt que les sous-chaînes
+        """
+        self.positive = frozenset(word.lower() for word in positive)
+        self.negative = frozenset(word.lower() for word in negative)
+        self.whole_words = whole_words
+        self.matcher = None if whole_words else KeywordMatcher(self.positive | self.negative)
+
+    def counts(self, text: str) -> Tuple[int, int]:
+        """Nombre de mots positifs et négatifs trouvés."""
+        text = (text or '').lower()
+        if self.whole_words:
+            words = Counter(text.split())
+            return (
+                sum(words[word] for word in words.keys() & self.positive),
+                sum(words[word] for word in words.keys() & self.negative),
+            )
+        found = self.matcher.search(text)
+        return len(found & self.positive), len(found & self.negative)
+
+    def counts_batch(self, texts: Sequence[str]) -> List[Tuple[int, int]]:
+        """Comptes d'un lot de textes ; les textes identiques sont analysés une fois."""
+        counts = {text: self.counts(text) for text in dict.fromkeys(texts)}
+        return [counts[text] for text in texts]
+
+    @staticmethod
+    def _ratio(positive: int, negative: int) -> float:
+        total = positive + negative
+        if total == 0:
+            return 0.5  # Neutre
+        return positive / total
+
+    def score(self, text: str) -> float:
+        """Score de sentiment d'un texte (0 à 1)."""
+        return self._ratio(*self.counts(text))
+
+    def score_batch(self, texts: Sequence[str]) -> List[float]:
+        """Scores d'un lot de textes (légendes, descriptions...)."""
+        return [self._ratio(*counts) for counts in self.counts_batch(texts)]
+
+@lru_cache(maxsize=32)
+def keyword_sentiment(
+    positive: Tuple[str, ...],
+    negative: Tuple[str, ...],
+    whole_words: bool = False,
+) -> KeywordSentiment:
+    """Analyseur d'un lexique, construit une fois et partagé dans le processus."""
+    return KeywordSentiment(positive, negative, whole_words)
@@ -0,0 +1,204 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import re
+import numpy as np
+from scipy import sparse
+from ..services.sentiment_scoring import normalize_text
+
+# Version du lexique, partie de la clé du cache de sentiment : à incrémenter
+# à chaque modification des poids
+LEXICON_VERSION = 'lexicon-1'
+
+# Coefficient appliqué à un terme nié (comme TextBlob : « not good » = -0.5 × good)
+NEGATION_FACTOR = -0.5
+# Nombre de mots couverts par une négation (une ponctuation la termine)
+NEGATION_SCOPE = 3
+
+LEXICON_EN = {
+    'love': 0.6, 'loved': 0.7, 'loves': 0.6, 'loving': 0.6, 'lovely': 0.5,
+    'like': 0.3, 'liked': 0.3, 'good': 0.7, 'great': 0.8, 'amazing': 0.6,
+    'awesome': 1.0, 'excellent': 1.0, 'perfect': 1.0, 'best': 1.0, 'better': 0.5,
+    'beautiful': 0.85, 'fantastic': 0.4, 'wonderful': 1.0, 'brilliant': 0.9,
+    'nice': 0.6, 'cool': 0.35, 'fun': 0.3, 'funny': 0.25, 'happy': 0.8,
+    'helpful': 0.6, 'useful': 0.3, 'interesting': 0.5, 'incredible': 0.9,
+    'favorite': 0.5, 'thanks': 0.2, 'thank': 0.2, 'enjoy': 0.4, 'enjoyed': 0.5,
+    'clear': 0.1, 'easy': 0.43, 'fine': 0.4, 'impressive': 1.0, 'epic': 0.5,
+    'hate': -0.8, 'hated': -0.9, 'bad': -0.7, 'worse': -0.4, 'worst': -1.0,
+    'terrible': -1.0, 'awful': -1.0, 'horrible': -1.0, 'poor': -0.4,
+    'boring': -1.0, 'useless': -0.5, 'waste': -0.2, 'wrong': -0.5,
+    'disappointing': -0.6, 'disappointed': -0.75, 'sad': -0.5, 'annoying': -0.8,
+    'stupid': -0.8, 'ugly': -0.7, 'fake': -0.5, 'confusing': -0.3,
+    'broken': -0.4, 'slow': -0.3, 'hard': -0.29, 'cringe': -0.6, 'scam': -0.8,
+}
+
+LEXICON_FR = {
+    'adore': 0.8, 'adorer': 0.8, 'aime': 0.5, 'aimé': 0.5, 'bien': 0.5,
+    'bon': 0.6, 'bonne': 0.6, 'super': 0.8, 'génial': 0.9, 'géniale': 0.9,
+    'excellent': 1.0, 'excellente': 1.0, 'parfait': 1.0, 'parfaite': 1.0,
+    'incroyable': 0.8, 'magnifique': 0.9, 'beau': 0.7, 'belle': 0.7,
+    'top': 0.7, 'cool': 0.4, 'drôle': 0.4, 'merci': 0.3, 'bravo': 0.8,
+    'utile': 0.5, 'clair': 0.3, 'claire': 0.3, 'intéressant': 0.5,
+    'intéressante': 0.5, 'meilleur': 0.8, 'meilleure': 0.8, 'content': 0.6,
+    'contente': 0.6, 'heureux': 0.8, 'heureuse': 0.8, 'formidable': 0.9,
+    'déteste': -0.8, 'détester': -0.8, 'mauvais': -0.7, 'mauvaise': -0.7,
+    'nul': -0.8, 'nulle': -0.8, 'horrible': -1.0, 'affreux': -1.0,
+    'décevant': -0.6, 'décevante': -0.6, 'déçu': -0.7, 'déçue': -0.7,
+    'ennuyeux': -0.7, 'ennuyeuse': -0.7, 'inutile': -0.5, 'triste': -0.5,
+    'pire': -1.0, 'mal': -0.5, 'nase': -0.7, 'bof': -0.3, 'arnaque': -0.8,
+    'faux': -0.4, 'fausse': -0.4, 'lent': -0.3, 'lente': -0.3,
+}
+
+LEXICON_ZH = {
+    '好': 0.6, '很好': 0.7, '喜欢': 0.6, '爱': 0.7, '棒': 0.8, '太棒了': 1.0,
+    '优秀': 0.9, '完美': 1.0, '精彩': 0.9, '漂亮': 0.7, '美': 0.6,
+    '厉害': 0.8, '有用': 0.5, '有趣': 0.5, '好看': 0.7, '好玩': 0.6,
+    '感谢': 0.4, '谢谢': 0.3, '支持': 0.5, '推荐': 0.5, '开心': 0.7,
+    '赞': 0.8, '牛': 0.7, '清楚': 0.3, '满意': 0.7, '可爱': 0.6,
+    '坏': -0.7, '差': -0.7, '太差': -1.0, '讨厌': -0.8, '恨': -0.9,
+    '糟糕': -1.0, '垃圾': -1.0, '无聊': -0.7, '失望': -0.7, '难看': -0.7,
+    '难过': -0.5, '生气': -0.7, '骗': -0.8, '假': -0.5, '烂': -0.8,
+    '没用': -0.6, '浪费': -0.5, '恶心': -0.9, '慢': -0.3, '坑': -0.6,
+}
+
+NEGATORS = {
+    # Anglais (« n't » est réécrit en « not » à la tokenisation)
+    'not', 'no', 'never', 'nothing', 'nobody', 'neither', 'nor', 'without',
+    # Français (« n' » donne le mot « n »)
+    'ne', 'n', 'pas', 'jamais', 'rien', 'aucun', 'aucune', 'sans', 'ni',
+    # Chinois
+    '不', '没', '没有', '别', '无', '非', '未', '不是',
+}
+
+INTENSIFIERS = {
+    'very': 1.3, 'really': 1.3, 'so': 1.2, 'super': 1.3, 'extremely': 1.5,
+    'too': 1.2, 'absolutely': 1.4, 'très': 1.3, 'trop': 1.3, 'vraiment': 1.3,
+    'tellement': 1.3, 'hyper': 1.4, 'vachement': 1.3,
+    '很': 1.3, '非常': 1.5, '太': 1.3, '真': 1.2, '超': 1.4, '特别': 1.4, '最': 1.5,
+}
+
+_CONTRACTION = re.compile(r"n't\b")
+_CJK = re.compile(r'[\u4e00-\u9fff]+')
+# Suites de sinogrammes, mots latins (chiffres exclus) et ponctuation de fin de proposition
+_TOKENS = re.compile(r"([\u4e00-\u9fff]+)|([^\W\d_\u4e00-\u9fff]+)|([.!?;:,])")
+
+class LexiconSentiment:
+    """
+    Moteur de sentiment lexical (français, anglais, chinois), alternative
+    rapide à TextBlob.
+
+    Un lot de textes est tokenisé en une matrice creuse documents × termes
+    du lexique ; chaque cellule porte le modificateur de l'occurrence
+    (1, NEGATION_FACTOR si le terme est nié, × l'intensificateur qui le
+    précède). Tous les documents sont ensuite scorés par un seul produit
+    matrice-vecteur avec les poids du lexique : la polarité est la moyenne
+    des termes trouvés, bornée à [-1, 1] (0 sans terme connu).
+
+    Le chinois, sans espaces, est segmenté à la correspondance la plus
+    longue sur les mots du lexique.
+    """
+
+    def __init__(
+        self,
+        lexicon: Optional[Dict[str, float]] = None,
+        negators: Optional[set] = None,
+        intensifiers: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Args:
+            lexicon: Poids des termes, de -1 à 1 (lexiques FR/EN/ZH par défaut)
+            negators: Mots de négation
+            intensifiers: Coefficients des intensificateurs
+        """
+        if lexicon is None:
+            lexicon = {**LEXICON_EN, **LEXICON_FR, **LEXICON_ZH}
+        self.negators = NEGATORS if negators is None else negators
+        self.intensifiers = INTENSIFIERS if intensifiers is None else intensifiers
+        self.vocabulary = {term: column for column, term in enumerate(lexicon)}
+        self.weights = np.fromiter(lexicon.values(), dtype=float, count=len(lexicon))
+
+        # Mots chinois connus, pour la segmentation
+        self._cjk_words = {
+            word for word in (*lexicon, *self.negators, *self.intensifiers)
+            if _CJK.fullmatch(word)
+        }
+        self._cjk_max = max((len(word) for word in self._cjk_words), default=1)
+
+    def _segment(self, run: str) -> List[str]:
+        """Segmente une suite de sinogrammes (correspondance la plus longue)."""
+        words = []
+        pos = 0
+        while pos < len(run):
+            for size in range(min(self._cjk_max, len(run) - pos), 0, -1):
+                word = run[pos:pos + size]
+                if size == 1 or word in self._cjk_words:
+                    words.append(word)
+                    pos += size
+                    break
+        return words
+
+    def tokenize(self, text: str) -> List[str]:
+        """Mots d'un texte normalisé ; la ponctuation est conservée comme séparateur."""
+        text = _CONTRACTION.sub(' not', normalize_text(text).replace('’', "'"))
+        tokens = []
+        for cjk, word, punctuation in _TOKENS.findall(text):
+            if cjk:
+                tokens.extend(self._segment(cjk))
+            else:
+                tokens.append(word or punctuation)
+        return tokens
+
+    def _terms(self, text: str) -> List[Tuple[int, float]]:
+        """Occurrences des termes du lexique : (colonne, modificateur)."""
+        terms = []
+        negated = 0
+        boost = 1.0
+        for token in self.tokenize(text):
+            if token in self.negators:
+                negated = NEGATION_SCOPE
+                continue
+            if len(token) == 1 and token in '.!?;:,':
+                negated, boost = 0, 1.0
+                continue
+            column = self.vocabulary.get(token)
+            if column is not None:
+                terms.append((column, boost * (NEGATION_FACTOR if negated else 1.0)))
+            boost = self.intensifiers.get(token, 1.0)
+            negated = max(negated - 1, 0)
+        return terms
+
+    def document_terms(self, texts: Sequence[str]) -> Tuple[sparse.csr_matrix, np.ndarray]:
+        """
+        Matrice creuse documents × termes et nombre de termes trouvés par
+        document.
+        """
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        for text in texts:
+            for column, modifier in self._terms(text):
+                indices.append(column)
+                data.append(modifier)
+            indptr.append(len(indices))
+        indptr = np.asarray(indptr, dtype=np.int64)
+        matrix = sparse.csr_matrix(
+            (np.asarray(data, dtype=float), np.asarray(indices, dtype=np.int32), indptr),
+            shape=(len(texts), len(self.weights)),
+        )
+        return matrix, np.diff(indptr)
+
+    def score_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """Polarités d'un lot de textes (-1 à 1)."""
+        matrix, counts = self.document_terms(texts)
+        return np.clip(matrix @ self.weights / np.maximum(counts, 1), -1.0, 1.0)
+
+    def polarity(self, text: str) -> float:
+        """Polarité d'un texte isolé (-1 à 1)."""
+        return float(self.score_batch([text])[0])
+
+_shared: Optional[LexiconSentiment] = None
+
+def shared_lexicon() -> LexiconSentiment:
+    """Moteur lexical partagé dans le processus (vocabulaire construit une fois)."""
+    global _shared
+    if _shared is None:
+        _shared = LexiconSentiment()
+    return _shared
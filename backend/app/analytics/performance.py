@@ -1,100 +1,113 @@
 from typing import Dict, List, Optional, Any
+import logging
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from ..collectors.base import BaseCollector
+from .calendar_engine import DEFAULT_POSTING_HOURS, CalendarEngine
+from .heatmap import EngagementHeatmap
+from .virality import CONTENT_VIRALITY
+
+logger = logging.getLogger(__name__)
 
 class PerformanceAnalyzer:
     def __init__(self, collector: BaseCollector):
         self.collector = collector
         
-    async def analyze_best_posting_times(self, content_data: List[Dict[str, Any]], days: int = 30) -> Dict[str, List[int]]:
-        if not content_data:
-            return {
-                "Monday": [9, 12, 15],
-                "Tuesday": [10, 14, 16],
-                "Wednesday": [9, 13, 17],
-                "Thursday": [11, 14, 16],
-                "Friday": [10, 12, 15],
-                "Saturday": [11, 14, 17],
-                "Sunday": [12, 15, 18]
-            }
-            
-        df = pd.DataFrame(content_data)
-        df['posted_at'] = pd.to_datetime(df['posted_at'])
-        df['day'] = df['posted_at'].dt.day_name()
-        df['hour'] = df['posted_at'].dt.hour
+    async def analyze_best_posting_times(
+        self,
+        content_data: List[Dict[str, Any]],
+        days: int = 30,
+        timezone: str = 'UTC',
+    ) -> Dict[str, List[int]]:
+        """
+        Meilleures heures de publication de chaque jour de la semaine.
         
-        best_times = {}
-        for day in df['day'].unique():
-            day_data = df[df['day'] == day]
-            best_hours = day_data.groupby('hour')['engagement_rate'].mean().nlargest(3).index.tolist()
-            best_times[day] = best_hours
+        L'engagement moyen est calculé en une passe sur une carte 7 × 24
+        (analytics.heatmap), pour les contenus des `days` derniers jours,
+        les heures étant celles du fuseau `timezone`.
+        """
+        heatmap = EngagementHeatmap.from_records(content_data, days=days, tz=timezone)
+        if not heatmap.counts.any():
+            return {day: list(hours) for day, hours in DEFAULT_POSTING_HOURS.items()}
         
-        return best_times
+        return heatmap.best_hours(3)
+    
+    async def best_posting_times(
+        self,
+        platform: str,
+        days: int = 30,
+        timezone: str = 'UTC',
+    ) -> Dict[str, List[int]]:
+        """
+        Meilleures heures de publication de la plateforme : lues sur sa carte
+        persistante si elle est fraîche (services.posting_histograms), sinon
+        calculées sur l'historique des contenus (`analyze_best_posting_times`).
+        """
+        from ..services.posting_histograms import PLATFORM_WIDE
+        heatmaps = await self.collector.lookup_posting_times(platform, PLATFORM_WIDE, timezone)
+        if heatmaps is not None and heatmaps['engagement'].counts.any():
+            logger.debug(f"Meilleures heures {platform} lues sur la carte persistante")
+            return heatmaps['engagement'].best_hours(3)
+        content_data = await self.collector.get_content_history(days)
+        return await self.analyze_best_posting_times(content_data, days, timezone)
     
     async def predict_virality(self, content_data: Dict[str, Any]) -> float:
-        # Simple virality score based on engagement metrics
-        engagement_rate = content_data.get('engagement_rate', 0)
-        views = content_data.get('view_count', 0)
-        comments = content_data.get('comment_count', 0)
-        shares = content_data.get('share_count', 0)
-        
-        # Normalize metrics
-        max_engagement = 100
-        max_views = 1000000
-        max_comments = 10000
-        max_shares = 5000
-        
-        normalized_engagement = min(engagement_rate / max_engagement, 1)
-        normalized_views = min(views / max_views, 1)
-        normalized_comments = min(comments / max_comments, 1)
-        normalized_shares = min(shares / max_shares, 1)
-        
-        # Calculate weighted score
-        weights = {
-            'engagement': 0.4,
-            'views': 0.2,
-            'comments': 0.2,
-            'shares': 0.2
-        }
-        
-        virality_score = (
-            weights['engagement'] * normalized_engagement +
-            weights['views'] * normalized_views +
-            weights['comments'] * normalized_comments +
-            weights['shares'] * normalized_shares
-        ) * 100
+        """Potentiel viral d'un contenu, en % (analytics.virality.CONTENT_VIRALITY)."""
+        return CONTENT_VIRALITY.score(content_data)
+    
+    async def predict_virality_batch(
+        self,
+        records: Optional[List[Dict[str, Any]]] = None,
+        columns: Optional[Dict[str, List[float]]] = None,
+    ) -> np.ndarray:
+        """
+        Potentiel viral d'un lot de contenus, en une passe vectorisée.
         
-        return virality_score
+        Args:
+            records: Contenus (mêmes clés que `predict_virality`)
+            columns: Ou bien colonnes {'engagement_rate': [...], 'view_count': [...], ...}
+        """
+        if columns is not None:
+            return CONTENT_VIRALITY.score_columns(columns)
+        return CONTENT_VIRALITY.score_records(records or [])
     
-    async def generate_content_calendar(self, topics: List[str], frequency: int = 3) -> List[Dict[str, Any]]:
-        best_times = await self.analyze_best_posting_times([])
-        calendar = []
+    async def generate_content_calendar(
+        self,
+        topics: List[str],
+        frequency: int = 3,
+        platform: Optional[str] = None,
+        days: int = 30,
+        timezone: str = 'UTC',
+        seed: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Calendrier de publication des `days` prochains jours (analytics.calendar_engine).
+        
+        Les heures sont tirées sur la carte d'engagement de la plateforme :
+        la carte persistante si elle est fraîche, sinon celle de l'historique
+        des contenus ; les horaires par défaut complètent les jours sans données.
         
-        start_date = datetime.now()
-        for i in range(30):  # Generate calendar for next 30 days
-            current_date = start_date + timedelta(days=i)
-            day_name = current_date.strftime('%A')
-            
-            if day_name in best_times:
-                posting_times = best_times[day_name][:frequency]
-                
-                for hour in posting_times:
-                    topic = np.random.choice(topics)
-                    platform = np.random.choice(['youtube', 'tiktok', 'instagram'])
-                    content_type = np.random.choice(['tutorial', 'review', 'story'])
-                    
-                    calendar.append({
-                        'date': current_date.strftime('%Y-%m-%d'),
-                        'time': f"{hour:02d}:00",
-                        'topic': topic,
-                        'platform': platform,
-                        'content_type': content_type,
-                        'suggested_hashtags': [f"#{topic.lower().replace(' ', '')}", "#content", f"#{platform}"]
-                    })
+        Args:
+            topics: Sujets, tirés uniformément
+            frequency: Publications par jour
+            platform: Plateforme dont la carte persistante est lue (optionnelle)
+            days: Nombre de jours, et fenêtre de l'historique
+            timezone: Fuseau horaire des heures proposées
+            seed: Graine des tirages (calendrier reproductible)
+        """
+        heatmap = None
+        if platform is not None:
+            from ..services.posting_histograms import PLATFORM_WIDE
+            heatmaps = await self.collector.lookup_posting_times(platform, PLATFORM_WIDE, timezone)
+            if heatmaps is not None and heatmaps['engagement'].counts.any():
+                heatmap = heatmaps['engagement']
+        if heatmap is None:
+            content_data = await self.collector.get_content_history(days)
+            heatmap = EngagementHeatmap.from_records(content_data, days=days, tz=timezone)
         
-        return calendar
+        engine = CalendarEngine(seed=seed)
+        return engine.calendar(topics, heatmap, frequency, days=days)
     
     def _suggest_content_type(self, topic: str) -> str:
         """Suggère le type de contenu optimal pour un sujet."""
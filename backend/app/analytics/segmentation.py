@@ -0,0 +1,296 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union, TYPE_CHECKING
+import logging
+import math
+import os
+import pickle
+from datetime import datetime, timedelta
+
+# numpy et scikit-learn sont importés à la première utilisation
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FEATURES = ('volume', 'engagement', 'growth_rate', 'sentiment_score')
+STATE_NAME = 'trend_segmenter'
+
+class TrendSegmenter:
+    """
+    Segmentation incrémentale des tendances.
+
+    Un `StandardScaler` et un `MiniBatchKMeans` sont mis à jour par
+    `partial_fit` à chaque fenêtre de collecte au lieu d'être réentraînés
+    de zéro : les segments restent stables d'une exécution à l'autre et le
+    coût d'une mise à jour ne dépend que de la taille de la fenêtre. Une
+    réestimation complète (`refit`) est faite périodiquement pour corriger
+    la dérive ; les nouveaux centres sont alors appariés aux anciens afin
+    que chaque segment garde son numéro.
+
+    Les paramètres utiles à l'affectation (moyennes, échelles, centres) sont
+    aussi conservés en listes Python : `assign` classe une tendance en
+    quelques microsecondes, sans passer par numpy.
+    """
+
+    def __init__(
+        self,
+        n_clusters: int = 5,
+        batch_size: int = 1024,
+        refit_interval: Optional[timedelta] = None,
+        random_state: int = 42,
+    ):
+        """
+        Args:
+            n_clusters: Nombre de segments
+            batch_size: Taille des mini-lots passés à `partial_fit`
+            refit_interval: Délai entre deux réestimations complètes
+                            (SEGMENTATION_REFIT_DAYS, 7 jours par défaut)
+            random_state: Graine des initialisations
+        """
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.refit_interval = refit_interval or timedelta(
+            days=float(os.environ.get('SEGMENTATION_REFIT_DAYS', 7))
+        )
+        self.random_state = random_state
+        self.scaler = None
+        self.kmeans = None
+        self.refitted_at: Optional[datetime] = None
+        self.updates_since_refit = 0
+        self.version = 0
+        self._mean: List[float] = []
+        self._scale: List[float] = []
+        self._centers: List[List[float]] = []
+
+    @property
+    def fitted(self) -> bool:
+        return self.kmeans is not None and hasattr(self.kmeans, 'cluster_centers_')
+
+    def needs_refit(self, now: Optional[datetime] = None) -> bool:
+        """Indique si une réestimation complète est due."""
+        if not self.fitted or self.refitted_at is None:
+            return True
+        return (now or datetime.utcnow()) - self.refitted_at >= self.refit_interval
+
+    @staticmethod
+    def segment_name(label: int) -> str:
+        return f"Segment {label + 1}"
+
+    def matrix(self, data: Union['pd.DataFrame', Iterable[Dict[str, Any]]]) -> 'np.ndarray':
+        """Construit la matrice des features ; les valeurs manquantes sont imputées."""
+        import numpy as np
+
+        if hasattr(data, 'columns'):
+            X = data[list(FEATURES)].to_numpy(dtype=float, na_value=np.nan)
+        else:
+            X = np.array(
+                [[np.nan if row.get(f) is None else row[f] for f in FEATURES] for row in data],
+                dtype=float,
+            ).reshape(-1, len(FEATURES))
+
+        missing = np.isnan(X)
+        if missing.any():
+            if self.scaler is not None:
+                fill = self.scaler.mean_
+            else:
+                with np.errstate(all='ignore'):
+                    fill = np.nan_to_num(np.nanmean(X, axis=0))
+            X = np.where(missing, fill, X)
+        return X
+
+    def _new_kmeans(self, **params):
+        from sklearn.cluster import MiniBatchKMeans
+        # Pas de réaffectation aléatoire des centres peu peuplés entre deux
+        # réestimations : elle changerait le sens des segments
+        return MiniBatchKMeans(
+            n_clusters=self.n_clusters,
+            batch_size=self.batch_size,
+            random_state=self.random_state,
+            reassignment_ratio=0.0,
+            **params,
+        )
+
+    def partial_fit(self, X: 'np.ndarray') -> 'TrendSegmenter':
+        """Intègre une nouvelle fenêtre de tendances dans le modèle."""
+        if len(X) == 0:
+            return self
+        if not self.fitted:
+            return self.refit(X)
+
+        # Le scaler évolue : les centres sont réexprimés dans la nouvelle échelle
+        raw_centers = self.scaler.inverse_transform(self.kmeans.cluster_centers_)
+        self.scaler.partial_fit(X)
+        self.kmeans.cluster_centers_ = self.scaler.transform(raw_centers)
+
+        X_scaled = self.scaler.transform(X)
+        for start in range(0, len(X_scaled), self.batch_size):
+            self.kmeans.partial_fit(X_scaled[start:start + self.batch_size])
+
+        self.updates_since_refit += 1
+        self._sync()
+        return self
+
+    def refit(self, X: 'np.ndarray', now: Optional[datetime] = None) -> 'TrendSegmenter':
+        """
+        Réestime scaler et centres sur `X`, en conservant la numérotation
+        des segments existants.
+
+        Avec moins de `n_clusters` tendances, la réestimation est reportée et
+        le modèle reste inchangé.
+        """
+        import numpy as np
+        from sklearn.preprocessing import StandardScaler
+
+        if len(X) < self.n_clusters:
+            logger.warning(
+                f"Réestimation de la segmentation reportée: {len(X)} tendances "
+                f"pour {self.n_clusters} segments"
+            )
+            return self
+
+        previous = None
+        if self.fitted:
+            previous = self.scaler.inverse_transform(self.kmeans.cluster_centers_)
+
+        scaler = StandardScaler().fit(X)
+        kmeans = self._new_kmeans(n_init=3).fit(scaler.transform(X))
+
+        if previous is not None:
+            from scipy.optimize import linear_sum_assignment
+            # Apparie chaque ancien segment au nouveau centre le plus proche
+            old_scaled = scaler.transform(previous)
+            cost = ((old_scaled[:, None, :] - kmeans.cluster_centers_[None, :, :]) ** 2).sum(axis=2)
+            _, order = linear_sum_assignment(cost)
+            kmeans.cluster_centers_ = np.ascontiguousarray(kmeans.cluster_centers_[order])
+            if hasattr(kmeans, '_counts'):
+                kmeans._counts = np.ascontiguousarray(kmeans._counts[order])
+
+        self.scaler = scaler
+        self.kmeans = kmeans
+        self.refitted_at = now or datetime.utcnow()
+        self.updates_since_refit = 0
+        self._sync()
+        logger.info(f"Segmentation réestimée sur {len(X)} tendances")
+        return self
+
+    def update(self, X: 'np.ndarray', now: Optional[datetime] = None) -> 'TrendSegmenter':
+        """
+        Mise à jour incrémentale, ou réestimation complète si elle est due et
+        que la fenêtre compte au moins `n_clusters` tendances.
+        """
+        if self.needs_refit(now) and (len(X) >= self.n_clusters or not self.fitted):
+            return self.refit(X, now)
+        return self.partial_fit(X)
+
+    def _sync(self) -> None:
+        """Recopie les paramètres d'affectation en listes Python."""
+        self._mean = self.scaler.mean_.tolist()
+        self._scale = self.scaler.scale_.tolist()
+        self._centers = self.kmeans.cluster_centers_.tolist()
+
+    def predict(self, X: 'np.ndarray') -> 'np.ndarray':
+        """Affecte chaque ligne de `X` à son segment (vectorisé)."""
+        import numpy as np
+
+        if not self.fitted:
+            raise ValueError("Le modèle de segmentation n'est pas entraîné")
+        X_scaled = (X - np.asarray(self._mean)) / np.asarray(self._scale)
+        centers = np.asarray(self._centers)
+        distances = (
+            (X_scaled ** 2).sum(axis=1)[:, None]
+            - 2 * X_scaled @ centers.T
+            + (centers ** 2).sum(axis=1)[None, :]
+        )
+        return distances.argmin(axis=1)
+
+    def assign(self, trend: Dict[str, Any]) -> int:
+        """Affecte une tendance isolée à son segment (à l'ingestion)."""
+        if not self._centers:
+            raise ValueError("Le modèle de segmentation n'est pas entraîné")
+        point = []
+        for feature, mean, scale in zip(FEATURES, self._mean, self._scale):
+            value = trend.get(feature)
+            point.append(0.0 if value is None else (value - mean) / scale)
+
+        best, best_distance = 0, math.inf
+        for label, center in enumerate(self._centers):
+            distance = 0.0
+            for x, c in zip(point, center):
+                distance += (x - c) * (x - c)
+            if distance < best_distance:
+                best, best_distance = label, distance
+        return best
+
+    def summary(self) -> Dict[str, Any]:
+        """Paramètres du modèle, sérialisables en JSON."""
+        return {
+            'features': list(FEATURES),
+            'n_clusters': self.n_clusters,
+            'mean': self._mean,
+            'scale': self._scale,
+            'centers': self._centers,
+            'samples_seen': int(self.scaler.n_samples_seen_) if self.scaler is not None else 0,
+            'refitted_at': self.refitted_at.isoformat() if self.refitted_at else None,
+            'updates_since_refit': self.updates_since_refit,
+        }
+
+    def dumps(self) -> bytes:
+        return pickle.dumps({
+            'scaler': self.scaler,
+            'kmeans': self.kmeans,
+            'refitted_at': self.refitted_at,
+            'updates_since_refit': self.updates_since_refit,
+        })
+
+    @classmethod
+    def loads(cls, payload: bytes, version: int = 0, **params) -> 'TrendSegmenter':
+        state = pickle.loads(payload)
+        segmenter = cls(n_clusters=state['kmeans'].n_clusters, **params)
+        segmenter.scaler = state['scaler']
+        segmenter.kmeans = state['kmeans']
+        segmenter.refitted_at = state['refitted_at']
+        segmenter.updates_since_refit = state['updates_since_refit']
+        segmenter.version = version
+        segmenter._sync()
+        return segmenter
+
+# Modèle chargé par processus, rechargé quand sa version change en base
+_cached: Optional[TrendSegmenter] = None
+
+def load_segmenter(session=None) -> TrendSegmenter:
+    """Charge le modèle de segmentation persistant (un modèle vide s'il n'existe pas)."""
+    global _cached
+    from app import db
+    from app.models.model_state import ModelState
+
+    session = session or db.session
+    version = session.query(ModelState.version).filter_by(name=STATE_NAME).scalar()
+    if version is None:
+        return TrendSegmenter()
+    if _cached is None or _cached.version != version:
+        state = session.get(ModelState, STATE_NAME)
+        _cached = TrendSegmenter.loads(state.payload, version=state.version)
+    return _cached
+
+def save_segmenter(segmenter: TrendSegmenter, session=None) -> None:
+    """Enregistre le modèle de segmentation (la validation reste à l'appelant)."""
+    from app import db
+    from app.models.model_state import ModelState
+
+    session = session or db.session
+    state = session.get(ModelState, STATE_NAME)
+    if state is None:
+        state = ModelState(name=STATE_NAME, version=0)
+        session.add(state)
+    state.version += 1
+    state.payload = segmenter.dumps()
+    state.summary = segmenter.summary()
+    state.updated_at = datetime.utcnow()
+    segmenter.version = state.version
+
+def assign_segments(rows: Sequence[Dict[str, Any]], segmenter: TrendSegmenter) -> None:
+    """Renseigne le segment de lignes `trend` au moment de l'ingestion."""
+    if not segmenter.fitted:
+        return
+    for row in rows:
+        row['segment'] = segmenter.segment_name(segmenter.assign(row))
@@ -1,58 +1,356 @@
-from typing import Dict, List, Tuple
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Tuple
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import json
+import logging
+import os
 import re
+import threading
 from textblob import TextBlob
-import emoji
+from .aggregation import SpaceSaving
+from .emojis import emoji_key, extract_emojis
+from .sentiment_memo import SentimentMemo, memo_key, shared_memo
+from ..services.sentiment_scoring import ENGINES, normalize_text, resolve_engine
+
+logger = logging.getLogger(__name__)
+
+# Au-delà de ce nombre de commentaires distincts, l'analyse part dans le pool de processus
+PROCESS_THRESHOLD = int(os.environ.get('SENTIMENT_PROCESS_THRESHOLD', 2000))
+# Commentaires distincts par lot envoyé à un processus
+SHARD_SIZE = int(os.environ.get('SENTIMENT_SHARD_SIZE', 1000))
+# Processus du pool (nombre de cœurs par défaut)
+PROCESS_WORKERS = int(os.environ.get('SENTIMENT_WORKERS', 0)) or None
+# Analyse en flux : commentaires par lot et compteurs suivis pour les thèmes et emojis
+STREAM_BATCH_SIZE = int(os.environ.get('SENTIMENT_STREAM_BATCH_SIZE', 500))
+STREAM_CAPACITY = int(os.environ.get('SENTIMENT_STREAM_CAPACITY', 1000))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def process_pool() -> ProcessPoolExecutor:
+    """Pool de processus partagé, créé à la première analyse volumineuse."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PROCESS_WORKERS)
+        return _pool
+
+def shutdown_process_pool() -> None:
+    """Arrête le pool de processus (arrêt de l'application)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+_worker_analyzer = None
+
+def _analyze_shard(items: List[Tuple[str, int]], engine: Optional[str] = None) -> Dict:
+    """Analyse un lot dans un processus du pool (analyseur créé une fois par processus)."""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = SentimentAnalyzer()
+    return _worker_analyzer.analyze_counts(items, engine)
+
+async def iter_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[Dict]:
+    """
+    Décode un flux NDJSON (un objet JSON par ligne) reçu par morceaux.
+
+    Raises:
+        ValueError: Ligne qui n'est pas un objet JSON valide
+    """
+    buffer = b''
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield _ndjson_object(line, line_number)
+    if buffer.strip():
+        yield _ndjson_object(buffer, line_number + 1)
+
+def _ndjson_object(line: bytes, line_number: int) -> Dict:
+    try:
+        value = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Ligne {line_number}: JSON invalide ({e.msg})")
+    if not isinstance(value, dict):
+        raise ValueError(f"Ligne {line_number}: objet JSON attendu")
+    return value
 
 class SentimentAnalyzer:
-    def __init__(self):
+    def __init__(
+        self,
+        process_threshold: Optional[int] = None,
+        shard_size: Optional[int] = None,
+        memo: Optional[SentimentMemo] = None,
+        engine: Optional[str] = None,
+    ):
+        """
+        Args:
+            process_threshold: Nombre de commentaires distincts à partir duquel
+                               l'analyse est répartie sur le pool de processus
+                               (SENTIMENT_PROCESS_THRESHOLD, 2000 par défaut)
+            shard_size: Commentaires distincts par lot (SENTIMENT_SHARD_SIZE, 1000 par défaut)
+            memo: Mémo des polarités (mémo du processus par défaut)
+            engine: Moteur de polarité du texte, 'textblob' ou 'lexicon'
+                    (SENTIMENT_ENGINE par défaut) ; modifiable à chaque appel
+        """
         self.emoji_sentiment = {
             '❤️': 1.0, '😊': 0.8, '😂': 0.6,
             '😢': -0.5, '😡': -1.0, '👎': -0.8,
             '👍': 0.8, '🔥': 0.9, '💯': 1.0
         }
+        # Scores indexés par forme de base : '❤' et '❤️', '👍' et '👍🏽' comptent pareil
+        self._emoji_scores = {emoji_key(e): score for e, score in self.emoji_sentiment.items()}
+        self.process_threshold = process_threshold if process_threshold is not None else PROCESS_THRESHOLD
+        self.shard_size = shard_size or SHARD_SIZE
+        self.memo = memo if memo is not None else shared_memo()
+        self.engine = resolve_engine(engine)
+    
+    async def analyze_comments(self, comments: List[Dict], engine: Optional[str] = None) -> Dict:
+        """
+        Analyse complète des commentaires avec sentiment et thèmes.
+        
+        Les commentaires identiques sont regroupés avec leur multiplicité :
+        chaque texte distinct n'est analysé qu'une fois, et sa polarité est
+        cherchée dans le mémo avant d'appeler TextBlob. Le résultat inclut
+        les statistiques de déduplication (`dedupe_stats`).
+        
+        L'analyse est CPU-bound : au-delà de `process_threshold` textes
+        distincts, elle est découpée en lots répartis sur un pool de
+        processus et la boucle d'événements reste libre pendant le calcul ;
+        les résultats partiels sont ensuite fusionnés.
+        
+        `engine` choisit le moteur de polarité pour cet appel ('textblob'
+        ou 'lexicon', voir analytics.lexicon) ; ValueError s'il est inconnu.
+        """
+        engine = resolve_engine(engine or self.engine)
+        items = list(Counter(comment.get('text', '') for comment in comments).items())
+        if len(items) < self.process_threshold:
+            return self.summarize(self.analyze_counts(items, engine))
+        
+        shards = [items[i:i + self.shard_size] for i in range(0, len(items), self.shard_size)]
+        return self.summarize(self.merge(await self._analyze_shards(shards, engine)))
+    
+    async def _analyze_shards(self, shards: List[List[Tuple[str, int]]], engine: str) -> List[Dict]:
+        """
+        Analyse des lots dans le pool de processus, sans bloquer la boucle
+        d'événements ; résultats partiels dans l'ordre des lots.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.gather(*(
+                loop.run_in_executor(process_pool(), _analyze_shard, shard, engine) for shard in shards
+            ))
+        except BrokenProcessPool:
+            # Un processus du pool a été tué : le pool est recréé au prochain appel
+            logger.warning("Pool de processus indisponible, analyse dans un thread")
+            shutdown_process_pool()
+            items = [item for shard in shards for item in shard]
+            return [await loop.run_in_executor(None, self.analyze_counts, items, engine)]
+    
+    async def analyze_comment_stream(
+        self,
+        comments: AsyncIterable[Dict],
+        batch_size: int = STREAM_BATCH_SIZE,
+        capacity: int = STREAM_CAPACITY,
+        engine: Optional[str] = None,
+    ) -> Dict:
+        """
+        Analyse un flux de commentaires (pages d'une API, envoi NDJSON...)
+        en mémoire bornée, avec le même résultat que `analyze_comments`.
+        
+        Les commentaires sont analysés par lots de `batch_size` ; seuls des
+        agrégats sont conservés : sommes pour le sentiment et la qualité
+        d'engagement, résumés Space-Saving de `capacity` compteurs pour les
+        thèmes et emojis les plus fréquents (exacts tant que le nombre
+        d'éléments distincts ne dépasse pas `capacity`). La mémoire ne
+        dépend pas du nombre de commentaires.
+        
+        Comme dans `analyze_comments`, un lot d'au moins `process_threshold`
+        textes distincts est analysé dans le pool de processus ; un lot plus
+        petit l'est dans un thread, avec le mémo du processus. Dans les deux
+        cas la boucle d'événements continue de lire le flux et de servir les
+        autres requêtes pendant le calcul.
+        """
+        engine = resolve_engine(engine or self.engine)
+        totals = dict.fromkeys(
+            ('count', 'sentiment_sum', 'positive', 'negative',
+             'unique_texts', 'memo_hits', 'shared_hits', 'scored'), 0
+        )
+        themes = SpaceSaving(capacity)
+        emojis = SpaceSaving(capacity)
+        emoji_total, emoji_score = 0, 0.0
+        distinct_emojis = set()  # Borné par le répertoire Unicode des emojis
+        
+        async def fold(texts: List[str]) -> None:
+            nonlocal emoji_total, emoji_score
+            items = list(Counter(texts).items())
+            if len(items) < self.process_threshold:
+                loop = asyncio.get_running_loop()
+                partial = await loop.run_in_executor(None, self.analyze_counts, items, engine)
+            else:
+                partial, = await self._analyze_shards([items], engine)
+            for key in totals:
+                totals[key] += partial[key]
+            themes.update(partial['themes'])
+            emojis.update(partial['emojis'])
+            total, _, score = self._emoji_stats(partial['emojis'])
+            emoji_total += total
+            emoji_score += score
+            distinct_emojis.update(partial['emojis'])
+        
+        batch = []
+        async for comment in comments:
+            batch.append(comment.get('text', ''))
+            if len(batch) >= batch_size:
+                await fold(batch)
+                batch = []
+        if batch:
+            await fold(batch)
+        
+        if not (themes.exact and emojis.exact):
+            logger.info(
+                f"Analyse en flux de {totals['count']} commentaires : "
+                f"thèmes et emojis les plus fréquents approchés"
+            )
+        return self.summarize({
+            **totals,
+            'themes': themes,
+            'emojis': emojis,
+            'emoji_stats': (emoji_total, len(distinct_emojis), emoji_score),
+        })
+    
+    def analyze_texts(self, texts: Iterable[str], engine: Optional[str] = None) -> Dict:
+        """
+        Analyse un lot de textes et retourne un résultat partiel fusionnable
+        (voir `merge` et `summarize`).
+        """
+        return self.analyze_counts(list(Counter(texts).items()), engine)
     
-    async def analyze_comments(self, comments: List[Dict]) -> Dict:
-        """Analyse complète des commentaires avec sentiment et thèmes."""
-        sentiments = []
-        themes = []
-        emojis = []
+    def analyze_counts(self, items: List[Tuple[str, int]], engine: Optional[str] = None) -> Dict:
+        """
+        Analyse des textes distincts, chacun pondéré par son nombre
+        d'occurrences, et retourne un résultat partiel fusionnable.
+        """
+        polarities, memo_stats = self._polarities(items, resolve_engine(engine or self.engine))
         
-        for comment in comments:
-            text = comment.get('text', '')
+        partial = {
+            'count': 0, 'sentiment_sum': 0.0, 'positive': 0, 'negative': 0,
+            'themes': Counter(), 'emojis': Counter(),
+            'unique_texts': len(items),
+            **memo_stats,
+        }
+        themes, emojis = partial['themes'], partial['emojis']
+        for text, count in items:
+            # Emojis extraits une seule fois, pour le sentiment et la qualité d'engagement
+            comment_emojis = self._extract_emojis(text)
+            for token in comment_emojis:
+                emojis[token] += count
             
             # Analyse du sentiment
-            sentiment = self._get_sentiment(text)
-            sentiments.append(sentiment)
+            sentiment = self._get_sentiment(text, comment_emojis, polarities[text])
+            partial['count'] += count
+            partial['sentiment_sum'] += sentiment * count
+            if sentiment > 0.2:
+                partial['positive'] += count
+            elif sentiment < -0.2:
+                partial['negative'] += count
             
             # Extraction des thèmes
-            comment_themes = self._extract_themes(text)
-            themes.extend(comment_themes)
-            
-            # Analyse des emojis
-            comment_emojis = self._extract_emojis(text)
-            emojis.extend(comment_emojis)
+            for theme, occurrences in Counter(self._extract_themes(text)).items():
+                themes[theme] += occurrences * count
         
+        return partial
+    
+    def _polarities(self, items: List[Tuple[str, int]], engine: str) -> Tuple[Dict[str, float], Dict[str, int]]:
+        """Polarité du texte de chaque commentaire distinct, et statistiques du mémo."""
+        if engine != 'textblob':
+            # Moteur vectorisé : tout le lot en un appel, moins coûteux que le mémo
+            score_batch, _ = ENGINES[engine]
+            texts = [text for text, _ in items]
+            scores = score_batch([normalize_text(text) for text in texts])
+            return dict(zip(texts, scores)), {'memo_hits': 0, 'shared_hits': 0, 'scored': len(texts)}
+        
+        # TextBlob : mémo (local puis partagé), puis scoring des textes inconnus
+        keys = {text: memo_key(text) for text, _ in items}
+        found = self.memo.get_many(set(keys.values()))
+        polarities = {**found['local'], **found['shared']}
+        scored = {}
+        for text, key in keys.items():
+            if key not in polarities:
+                polarities[key] = scored[key] = self._text_polarity(normalize_text(text))
+        self.memo.set_many(scored)
+        return {text: polarities[key] for text, key in keys.items()}, {
+            'memo_hits': len(found['local']) + len(found['shared']),
+            'shared_hits': len(found['shared']),
+            'scored': len(scored),
+        }
+    
+    @staticmethod
+    def merge(partials: List[Dict]) -> Dict:
+        """Fusionne des résultats partiels, dans l'ordre des lots."""
+        merged = {
+            'count': 0, 'sentiment_sum': 0.0, 'positive': 0, 'negative': 0,
+            'themes': Counter(), 'emojis': Counter(),
+            'unique_texts': 0, 'memo_hits': 0, 'shared_hits': 0, 'scored': 0,
+        }
+        for partial in partials:
+            for key in ('count', 'sentiment_sum', 'positive', 'negative',
+                        'unique_texts', 'memo_hits', 'shared_hits', 'scored'):
+                merged[key] += partial.get(key, 0)
+            merged['themes'].update(partial['themes'])
+            merged['emojis'].update(partial['emojis'])
+        return merged
+    
+    def summarize(self, partial: Dict) -> Dict:
+        """Construit le résultat final d'`analyze_comments`."""
+        count = partial['count']
+        unique_texts = partial.get('unique_texts', count)
         return {
-            'sentiment_stats': self._calculate_sentiment_stats(sentiments),
-            'top_themes': self._get_top_items(themes, 5),
-            'top_emojis': self._get_top_items(emojis, 5),
-            'engagement_quality': self._calculate_engagement_quality(sentiments, emojis)
+            'sentiment_stats': self._sentiment_stats(partial),
+            'top_themes': partial['themes'].most_common(5),
+            'top_emojis': partial['emojis'].most_common(5),
+            'engagement_quality': self._engagement_quality(partial),
+            'dedupe_stats': {
+                'comments': count,
+                'unique_texts': unique_texts,
+                'duplicates': count - unique_texts,
+                'dedupe_ratio': (1 - unique_texts / count) if count else 0.0,
+                'memo_hits': partial.get('memo_hits', 0),
+                'shared_hits': partial.get('shared_hits', 0),
+                'scored': partial.get('scored', 0),
+            },
         }
     
-    def _get_sentiment(self, text: str) -> float:
+    def _get_sentiment(
+        self,
+        text: str,
+        emojis: Optional[List[str]] = None,
+        text_sentiment: Optional[float] = None,
+    ) -> float:
         """Calcule le sentiment d'un texte (-1 à 1)."""
-        # Analyse du texte
-        blob = TextBlob(text)
-        text_sentiment = blob.sentiment.polarity
+        # Analyse du texte (polarité déjà connue via le mémo le cas échéant)
+        if text_sentiment is None:
+            text_sentiment = self._text_polarity(text)
         
-        # Analyse des emojis
-        emojis = self._extract_emojis(text)
-        emoji_sentiment = sum(self.emoji_sentiment.get(e, 0) for e in emojis) / max(len(emojis), 1)
+        # Analyse des emojis (déjà extraits par l'appelant le cas échéant)
+        if emojis is None:
+            emojis = self._extract_emojis(text)
+        emoji_sentiment = sum(self._emoji_score(e) for e in emojis) / max(len(emojis), 1)
         
         # Combiner les deux scores (70% texte, 30% emoji)
         return 0.7 * text_sentiment + 0.3 * emoji_sentiment
     
+    @staticmethod
+    def _text_polarity(text: str) -> float:
+        return TextBlob(text).sentiment.polarity
+    
     def _extract_themes(self, text: str) -> List[str]:
         """Extrait les thèmes principaux d'un commentaire."""
         # Nettoyer le texte
@@ -70,23 +368,41 @@ class SentimentAnalyzer:
         return themes
     
     def _extract_emojis(self, text: str) -> List[str]:
-        """Extrait les emojis d'un texte."""
-        return [c for c in text if c in emoji.EMOJI_DATA]
+        """Extrait les emojis d'un texte (séquences ZWJ et modificateurs compris)."""
+        return extract_emojis(text)
+    
+    def _emoji_score(self, token: str) -> float:
+        return self._emoji_scores.get(emoji_key(token), 0)
+    
+    @staticmethod
+    def _partial(sentiments: List[float], emojis: List[str]) -> Dict:
+        return {
+            'count': len(sentiments),
+            'sentiment_sum': sum(sentiments),
+            'positive': sum(1 for s in sentiments if s > 0.2),
+            'negative': sum(1 for s in sentiments if s < -0.2),
+            'themes': Counter(),
+            'emojis': Counter(emojis),
+        }
     
     def _calculate_sentiment_stats(self, sentiments: List[float]) -> Dict:
         """Calcule les statistiques de sentiment."""
-        if not sentiments:
+        return self._sentiment_stats(self._partial(sentiments, []))
+    
+    def _sentiment_stats(self, partial: Dict) -> Dict:
+        count = partial['count']
+        if not count:
             return {'positive': 0, 'neutral': 0, 'negative': 0, 'average': 0}
         
-        positive = sum(1 for s in sentiments if s > 0.2)
-        negative = sum(1 for s in sentiments if s < -0.2)
-        neutral = len(sentiments) - positive - negative
+        positive = partial['positive']
+        negative = partial['negative']
+        neutral = count - positive - negative
         
         return {
-            'positive': (positive / len(sentiments)) * 100,
-            'neutral': (neutral / len(sentiments)) * 100,
-            'negative': (negative / len(sentiments)) * 100,
-            'average': sum(sentiments) / len(sentiments)
+            'positive': (positive / count) * 100,
+            'neutral': (neutral / count) * 100,
+            'negative': (negative / count) * 100,
+            'average': partial['sentiment_sum'] / count
         }
     
     def _get_top_items(self, items: List[str], n: int) -> List[Tuple[str, int]]:
@@ -96,13 +412,28 @@ class SentimentAnalyzer:
     
     def _calculate_engagement_quality(self, sentiments: List[float], emojis: List[str]) -> float:
         """Calcule un score de qualité d'engagement (0 à 100)."""
-        if not sentiments:
+        return self._engagement_quality(self._partial(sentiments, emojis))
+    
+    def _emoji_stats(self, emojis: Counter) -> Tuple[int, int, float]:
+        """(nombre d'emojis, emojis distincts, somme des scores)"""
+        return (
+            sum(emojis.values()),
+            len(emojis),
+            sum(self._emoji_score(e) * n for e, n in emojis.items()),
+        )
+    
+    def _engagement_quality(self, partial: Dict) -> float:
+        count = partial['count']
+        if not count:
             return 0
         
-        # Facteurs de qualité
-        sentiment_score = (sum(sentiments) / len(sentiments) + 1) * 50  # -1 à 1 -> 0 à 100
-        emoji_diversity = len(set(emojis)) / max(len(emojis), 1) * 100
-        emoji_positivity = sum(self.emoji_sentiment.get(e, 0) for e in emojis) / max(len(emojis), 1) * 50 + 50
+        # Facteurs de qualité (agrégats déjà calculés en flux le cas échéant)
+        total_emojis, distinct_emojis, emoji_score = (
+            partial.get('emoji_stats') or self._emoji_stats(partial['emojis'])
+        )
+        sentiment_score = (partial['sentiment_sum'] / count + 1) * 50  # -1 à 1 -> 0 à 100
+        emoji_diversity = distinct_emojis / max(total_emojis, 1) * 100
+        emoji_positivity = emoji_score / max(total_emojis, 1) * 50 + 50
         
         # Score final pondéré
         quality_score = (
@@ -0,0 +1,122 @@
+from typing import Dict, Iterable, Optional
+import logging
+import os
+from collections import OrderedDict
+from ..services.sentiment_scoring import normalize_text, text_hash, textblob_version
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'sentiment-memo'
+# Entrées du mémo local (SENTIMENT_MEMO_SIZE)
+DEFAULT_SIZE = int(os.environ.get('SENTIMENT_MEMO_SIZE', 100_000))
+# Durée de vie des entrées partagées dans Redis (SENTIMENT_MEMO_TTL, 7 jours)
+DEFAULT_TTL = int(os.environ.get('SENTIMENT_MEMO_TTL', 7 * 24 * 3600))
+
+def memo_key(text: str) -> str:
+    """Empreinte du texte normalisé (clé du mémo)."""
+    return text_hash(normalize_text(text))
+
+class SentimentMemo:
+    """
+    Mémo borné des polarités de texte, indexé par version de l'analyseur et
+    empreinte du texte normalisé.
+
+    Le mémo local (LRU, par processus) peut être complété par Redis pour
+    partager les scores entre workers : les clés absentes localement y sont
+    lues en un seul MGET, les nouveaux scores écrits en un pipeline. Si
+    Redis est indisponible, le mémo reste local.
+    """
+
+    def __init__(
+        self,
+        version: Optional[str] = None,
+        size: int = DEFAULT_SIZE,
+        client=None,
+        ttl: int = DEFAULT_TTL,
+    ):
+        """
+        Args:
+            version: Version de l'analyseur, partie de la clé (TextBlob par défaut)
+            size: Nombre d'entrées du mémo local
+            client: Client Redis partagé (None : mémo local uniquement)
+            ttl: Durée de vie des entrées Redis, en secondes
+        """
+        self.version = version or textblob_version()
+        self.size = size
+        self.client = client
+        self.ttl = ttl
+        self._local: 'OrderedDict[str, float]' = OrderedDict()
+
+    def _redis_key(self, key: str) -> str:
+        return f'{KEY_PREFIX}:{self.version}:{key}'
+
+    def _remember(self, key: str, score: float) -> None:
+        self._local[key] = score
+        self._local.move_to_end(key)
+        if len(self._local) > self.size:
+            self._local.popitem(last=False)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, float]]:
+        """
+        Recherche des empreintes.
+
+        Returns:
+            {'local': {empreinte: score}, 'shared': {empreinte: score}}
+            selon l'origine des scores trouvés
+        """
+        local, missing = {}, []
+        for key in keys:
+            score = self._local.get(key)
+            if score is None:
+                missing.append(key)
+            else:
+                self._local.move_to_end(key)
+                local[key] = score
+
+        shared = {}
+        if missing and self.client is not None:
+            try:
+                values = self.client.mget([self._redis_key(key) for key in missing])
+            except Exception as e:
+                logger.warning(f"Mémo de sentiment partagé indisponible: {str(e)}")
+                values = []
+            for key, value in zip(missing, values):
+                if value is not None:
+                    shared[key] = float(value)
+                    self._remember(key, shared[key])
+        return {'local': local, 'shared': shared}
+
+    def set_many(self, scores: Dict[str, float]) -> None:
+        """Enregistre de nouveaux scores (mémo local et, le cas échéant, Redis)."""
+        for key, score in scores.items():
+            self._remember(key, score)
+        if scores and self.client is not None:
+            try:
+                pipeline = self.client.pipeline(transaction=False)
+                for key, score in scores.items():
+                    pipeline.set(self._redis_key(key), repr(score), ex=self.ttl)
+                pipeline.execute()
+            except Exception as e:
+                logger.warning(f"Mémo de sentiment partagé indisponible: {str(e)}")
+
+    def __len__(self) -> int:
+        return len(self._local)
+
+_shared = None
+_shared_pid = None
+
+def shared_memo() -> SentimentMemo:
+    """
+    Mémo du processus. Il est partagé via Redis si SENTIMENT_MEMO_REDIS_URL
+    est défini.
+    """
+    global _shared, _shared_pid
+    if _shared is None or _shared_pid != os.getpid():
+        client = None
+        url = os.environ.get('SENTIMENT_MEMO_REDIS_URL')
+        if url:
+            import redis
+            client = redis.Redis.from_url(url)
+        _shared = SentimentMemo(client=client)
+        _shared_pid = os.getpid()
+    return _shared
@@ -0,0 +1,129 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+
+# Une caractéristique : (clé, normalisation, échelle, poids, valeur par défaut).
+# Normalisations :
+#   'cap'      min(x / échelle, 1)
+#   'polarity' (x + 1) / 2, pour un score de -1 à 1
+#   'log_max'  log(1 + x) / log(1 + max du lot)
+#   'identity' x
+Feature = Tuple[str, str, Optional[float], float, float]
+
+NORMALIZATIONS = ('cap', 'polarity', 'log_max', 'identity')
+
+class ViralityModel:
+    """
+    Score de viralité : somme pondérée de caractéristiques normalisées,
+    calculée en colonnes NumPy sur tout un lot.
+
+    Une valeur absente (None, NaN) prend la valeur par défaut de sa
+    caractéristique. `score_columns` est le chemin rapide (quelques
+    opérations vectorisées par colonne) ; `score_records` et `score`
+    construisent les colonnes à partir de dictionnaires.
+    """
+
+    def __init__(self, features: Sequence[Feature], scale: float = 1.0):
+        """
+        Args:
+            features: Caractéristiques (clé, normalisation, échelle, poids, défaut)
+            scale: Multiplicateur du score (100 pour un pourcentage)
+        """
+        for key, normalization, _, _, _ in features:
+            if normalization not in NORMALIZATIONS:
+                raise ValueError(f"Normalisation inconnue pour {key}: {normalization}")
+        self.features = tuple(features)
+        self.scale = scale
+
+    @property
+    def keys(self) -> List[str]:
+        return [key for key, *_ in self.features]
+
+    @staticmethod
+    def _column(values: Any, default: float, size: Optional[int]) -> np.ndarray:
+        if values is None:
+            return np.full(size or 0, default, dtype=float)
+        column = np.asarray(values, dtype=float)
+        if np.isnan(column).any():
+            column = np.where(np.isnan(column), default, column)
+        return column
+
+    def factors(self, columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Caractéristiques normalisées d'un lot en colonnes.
+
+        Args:
+            columns: {clé: valeurs} ; une clé absente prend sa valeur par défaut
+
+        Raises:
+            ValueError: Si les colonnes n'ont pas toutes la même longueur
+        """
+        sizes = {len(values) for values in columns.values() if values is not None}
+        if len(sizes) > 1:
+            raise ValueError(f"Colonnes de longueurs différentes: {sorted(sizes)}")
+        size = sizes.pop() if sizes else 0
+
+        factors = {}
+        for key, normalization, scale, _, default in self.features:
+            x = self._column(columns.get(key), default, size)
+            if normalization == 'cap':
+                factors[key] = np.minimum(x / scale, 1.0)
+            elif normalization == 'polarity':
+                factors[key] = (x + 1) / 2
+            elif normalization == 'log_max':
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    factors[key] = np.log1p(x) / np.log1p(x.max(initial=0))
+            else:
+                factors[key] = x
+        return factors
+
+    def combine(self, factors: Mapping[str, np.ndarray]) -> np.ndarray:
+        """Somme pondérée de caractéristiques déjà normalisées."""
+        score = None
+        for key, _, _, weight, _ in self.features:
+            term = weight * factors[key]
+            score = term if score is None else score + term
+        return score * self.scale
+
+    def score_columns(self, columns: Mapping[str, Any]) -> np.ndarray:
+        """Scores d'un lot en colonnes ({clé: tableau})."""
+        return self.combine(self.factors(columns))
+
+    def to_columns(self, records: Iterable[Mapping[str, Any]]) -> Dict[str, np.ndarray]:
+        """Colonnes des caractéristiques d'une liste de dictionnaires (None pour une clé absente)."""
+        records = records if isinstance(records, list) else list(records)
+        return {
+            key: np.array([record.get(key) for record in records], dtype=float)
+            for key in self.keys
+        }
+
+    def score_records(self, records: Iterable[Mapping[str, Any]]) -> np.ndarray:
+        """Scores d'une liste de dictionnaires."""
+        return self.score_columns(self.to_columns(records))
+
+    def score(self, record: Mapping[str, Any]) -> float:
+        """Score d'un élément isolé."""
+        return float(self.score_records([record])[0])
+
+# Potentiel viral d'un contenu publié (PerformanceAnalyzer), en %
+CONTENT_VIRALITY = ViralityModel((
+    ('engagement_rate', 'cap', 100, 0.4, 0.0),
+    ('view_count', 'cap', 1_000_000, 0.2, 0.0),
+    ('comment_count', 'cap', 10_000, 0.2, 0.0),
+    ('share_count', 'cap', 5_000, 0.2, 0.0),
+), scale=100)
+
+# Potentiel viral d'une tendance, de 0 à 1 (ingestion, ContentGenerator) ;
+# un sentiment inconnu est neutre
+TREND_VIRALITY = ViralityModel((
+    ('engagement', 'cap', 10_000, 0.4, 0.0),
+    ('sentiment_score', 'polarity', None, 0.3, 0.0),
+    ('growth_rate', 'cap', 100, 0.3, 0.0),
+))
+
+# Potentiel d'évolution d'une tendance (tasks.analysis.predict_trend_evolution) :
+# volume relatif au plus fort volume du lot
+TREND_EVOLUTION = ViralityModel((
+    ('growth_rate', 'identity', None, 0.4, 0.0),
+    ('sentiment_score', 'polarity', None, 0.3, 0.0),
+    ('volume', 'log_max', None, 0.3, 0.0),
+))
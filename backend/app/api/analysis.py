@@ -0,0 +1,55 @@
+from flask import Blueprint, Response, jsonify, request
+from flask_jwt_extended import jwt_required
+from app.services.analysis_store import decode_result, get_result, latest_result
+
+bp = Blueprint('analysis', __name__)
+
+def _serve(result) -> Response:
+    """
+    Sert un résultat précalculé avec son ETag : 304 si le client a déjà
+    cette version, sinon le JSON stocké, tel quel (gzip) si le client
+    l'accepte.
+    """
+    if result is None:
+        return jsonify({'error': 'Aucune analyse disponible'}), 404
+
+    if result.etag in request.if_none_match:
+        response = Response(status=304)
+    elif result.encoding == 'gzip' and 'gzip' in request.accept_encodings:
+        response = Response(result.payload, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(decode_result(result.payload, result.encoding), mimetype='application/json')
+
+    response.set_etag(result.etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.headers['X-Analysis-Version'] = str(result.version)
+    if result.created_at:
+        response.last_modified = result.created_at
+    return response
+
+@bp.route('/<kind>', methods=['GET'])
+@jwt_required()
+def get_latest_analysis(kind):
+    """Récupère la dernière analyse précalculée (sans la recalculer)."""
+    return _serve(latest_result(kind))
+
+@bp.route('/<kind>/<int:version>', methods=['GET'])
+@jwt_required()
+def get_analysis_version(kind, version):
+    """Récupère une version donnée d'une analyse."""
+    return _serve(get_result(kind, version))
+
+@bp.route('/<kind>/summary', methods=['GET'])
+@jwt_required()
+def get_analysis_summary(kind):
+    """Récupère la référence et le résumé de la dernière analyse."""
+    result = latest_result(kind)
+    if result is None:
+        return jsonify({'error': 'Aucune analyse disponible'}), 404
+
+    response = jsonify({**result.handle(), 'summary': result.summary})
+    response.set_etag(result.etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.trend import Trend
 from app.models.user import User
 from app.services.trend_analyzer import TrendAnalyzer
+from app.analytics.aggregation import TrendAggregator
 from app import db
 
 bp = Blueprint('trends', __name__)
@@ -25,14 +26,23 @@ async def analyze_trends():
         return jsonify({'error': 'Aucune plateforme spécifiée'}), 400
     
     try:
+        # Top 10 par engagement, sommes et catégories par plateforme, au fil de l'analyse
+        aggregator = TrendAggregator(
+            metric='engagement', k=10,
+            sum_fields={'total_engagement': 'engagement', 'total_volume': 'volume'},
+            category_field='category',
+        )
         all_trends = []
         for platform in platforms:
             trends = await trend_analyzer.analyze_platform_trends(platform)
+            aggregator.consume(trends)
             all_trends.extend(trends)
         
         return jsonify({
             'message': 'Analyse des tendances terminée',
-            'trends': all_trends
+            'trends': all_trends,
+            'platform_stats': aggregator.platform_stats(),
+            'global_stats': aggregator.global_stats(),
         }), 200
         
     except Exception as e:
@@ -82,8 +82,10 @@ async def get_optimal_schedule():
         return jsonify({'error': 'channel_id requis'}), 400
     try:
         collector = YouTubeCollector(os.getenv('YOUTUBE_API_KEY'))
-        schedule = await collector.get_optimal_schedule(channel_id)
+        schedule = await collector.get_optimal_schedule(channel_id, request.args.get('timezone', 'UTC'))
         return jsonify(schedule)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -24,6 +24,14 @@ def create_celery_app(app=None):
                 'task': 'app.tasks.analysis.analyze_global_trends',
                 'schedule': crontab(hour=0, minute=0),  # Tous les jours à minuit
             },
+            'analyze-trend-window-daily': {
+                'task': 'app.tasks.analysis.analyze_trend_window',
+                'schedule': crontab(hour=1, minute=0),  # Tous les jours à 1h
+            },
+            'rebuild-posting-histograms-hourly': {
+                'task': 'app.tasks.analysis.rebuild_posting_histograms',
+                'schedule': crontab(minute=30),  # Toutes les heures, après la collecte
+            },
             'update-metrics-realtime': {
                 'task': 'app.tasks.collectors.update_metrics',
                 'schedule': timedelta(minutes=5),  # Toutes les 5 minutes
@@ -49,18 +57,22 @@ def create_celery_app(app=None):
         # File d'attente par défaut
         task_default_queue='default',
         
-        # Files d'attente spécifiques
+        # Files d'attente spécifiques (échanges topic : les sous-tâches de collecte
+        # publient sur collectors.<plateforme>)
         task_queues={
             'collectors': {
                 'exchange': 'collectors',
+                'exchange_type': 'topic',
                 'routing_key': 'collectors.#',
             },
             'analysis': {
                 'exchange': 'analysis',
+                'exchange_type': 'topic',
                 'routing_key': 'analysis.#',
             },
             'metrics': {
                 'exchange': 'metrics',
+                'exchange_type': 'topic',
                 'routing_key': 'metrics.#',
             },
         },
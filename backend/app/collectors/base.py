@@ -1,14 +1,136 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+import asyncio
+import logging
+import aiohttp
+from ..analytics.keywords import KeywordSentiment, keyword_sentiment
+
+logger = logging.getLogger(__name__)
+
+class _BorrowedSession:
+    """Prête une session HTTP partagée à un bloc `async with` sans la fermer."""
+    
+    def __init__(self, session: aiohttp.ClientSession):
+        self.session = session
+        
+    async def __aenter__(self) -> aiohttp.ClientSession:
+        return self.session
+        
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
 
 class BaseCollector(ABC):
     """Classe de base pour tous les collecteurs de données des réseaux sociaux."""
     
+    # Lexiques de _analyze_sentiment, à redéfinir par collecteur
+    positive_words: Tuple[str, ...] = (
+        'love', 'great', 'amazing', 'awesome', 'excellent',
+        'perfect', 'beautiful', 'fantastic', 'wonderful', 'best',
+        'j\'adore', 'super', 'génial', 'incroyable', 'parfait'
+    )
+    negative_words: Tuple[str, ...] = (
+        'hate', 'bad', 'terrible', 'awful', 'horrible',
+        'worst', 'poor', 'disappointing', 'useless', 'waste',
+        'déteste', 'nul', 'mauvais', 'décevant'
+    )
+    # Occurrences de mots isolés plutôt que sous-chaînes (voir analytics.keywords)
+    sentiment_whole_words = False
+    
     def __init__(self, api_key: str):
         self.api_key = api_key
         self._cache = {}
         self._cache_duration = 3600  # 1 heure en secondes
+        # Session HTTP partagée, fournie par le runtime des workers (tasks.runtime)
+        self.http_session: Optional[aiohttp.ClientSession] = None
+        # Cartes de publication persistantes (services.posting_histograms) ;
+        # à défaut, celles du processus si une base est configurée
+        self.posting_histograms = None
+        
+    async def __aenter__(self):
+        """Entrée dans le contexte asynchrone."""
+        return self
+        
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Sortie du contexte asynchrone."""
+        pass
+        
+    def _client_session(self):
+        """
+        Retourne la session HTTP à utiliser dans un bloc `async with` :
+        la session partagée si elle est ouverte (elle n'est alors pas fermée
+        en sortie de bloc), sinon une session éphémère.
+        """
+        if self.http_session is not None and not self.http_session.closed:
+            return _BorrowedSession(self.http_session)
+        return aiohttp.ClientSession()
+        
+    def histogram_store(self):
+        """Cartes jour × heure des publications, None si aucune base n'est configurée."""
+        if self.posting_histograms is None:
+            from ..services.posting_histograms import shared_histograms
+            self.posting_histograms = shared_histograms()
+        return self.posting_histograms
+        
+    async def _record_posting_times(
+        self,
+        platform: str,
+        channel_id: str,
+        videos: List[Dict],
+        full_fetch: bool = False,
+    ) -> None:
+        """
+        Ajoute des publications aux cartes (voir PostingHistogramStore.record),
+        dans un thread pour ne pas bloquer la boucle d'événements ; une erreur
+        de la base n'interrompt pas la collecte.
+        """
+        store = self.histogram_store()
+        if store is None:
+            return
+        try:
+            await asyncio.to_thread(store.record, platform, channel_id, videos, full_fetch=full_fetch)
+        except Exception as e:
+            logger.warning(f"Cartes de publication non mises à jour ({platform}/{channel_id}): {e}")
+        
+    async def lookup_posting_times(self, platform: str, channel_id: str, tz: str = 'UTC') -> Optional[Dict]:
+        """
+        Cartes fraîches d'une chaîne dans le fuseau `tz` (voir
+        PostingHistogramStore.lookup, lue dans un thread), None si absentes,
+        périmées ou illisibles.
+        """
+        store = self.histogram_store()
+        if store is None:
+            return None
+        try:
+            heatmaps = await asyncio.to_thread(store.lookup, platform, channel_id, tz)
+        except ValueError:
+            raise  # Fuseau horaire inconnu
+        except Exception as e:
+            logger.warning(f"Cartes de publication indisponibles ({platform}/{channel_id}): {e}")
+            return None
+        if heatmaps is None or not heatmaps['views'].counts.any():
+            return None
+        return heatmaps
+        
+    @property
+    def sentiment_lexicon(self) -> KeywordSentiment:
+        """Analyseur des lexiques du collecteur (construit une fois par lexique)."""
+        return keyword_sentiment(self.positive_words, self.negative_words, self.sentiment_whole_words)
+        
+    def _analyze_sentiment(self, text: str) -> float:
+        """Analyse le sentiment d'un texte et retourne un score entre 0 et 1."""
+        return self.sentiment_lexicon.score(text)
+        
+    def _analyze_sentiments(self, texts: List[str]) -> List[float]:
+        """Analyse le sentiment d'un lot de textes (légendes, descriptions...)."""
+        return self.sentiment_lexicon.score_batch(texts)
+        
+    def _with_sentiments(self, items: List[Dict], field: str) -> List[Dict]:
+        """Ajoute à chaque élément le sentiment de son texte `field`, analysé en un lot."""
+        sentiments = self._analyze_sentiments([item.get(field) or '' for item in items])
+        for item, sentiment in zip(items, sentiments):
+            item['sentiment'] = sentiment
+        return items
         
     @abstractmethod
     async def get_trending_topics(self, max_results: int = 50) -> Dict:
@@ -35,6 +157,33 @@ class BaseCollector(ABC):
         """Génère des suggestions de contenu."""
         pass
         
+    async def get_engagement_metrics_batch(self, content_ids: List[str], concurrency: int = 10) -> Dict[str, Dict]:
+        """
+        Récupère les métriques d'engagement de plusieurs contenus.
+        
+        Par défaut, les appels unitaires à `get_engagement_metrics` sont lancés
+        en parallèle ; les collecteurs dont l'API accepte plusieurs identifiants
+        par requête surchargent cette méthode.
+        
+        Returns:
+            Dictionnaire {content_id: métriques}, sans les contenus en échec
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def fetch(content_id: str) -> Dict:
+            async with semaphore:
+                return await self.get_engagement_metrics(content_id)
+        
+        results = await asyncio.gather(*(fetch(c) for c in content_ids), return_exceptions=True)
+        
+        metrics = {}
+        for content_id, result in zip(content_ids, results):
+            if isinstance(result, Exception):
+                logger.error(f"Erreur lors de la récupération des métriques de {content_id}: {result}")
+                continue
+            metrics[content_id] = result
+        return metrics
+        
     def _cache_get(self, key: str) -> Optional[Dict]:
         """Récupère une valeur du cache."""
         if key in self._cache:
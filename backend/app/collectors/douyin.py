@@ -11,6 +11,15 @@ class DouyinCollector(BaseCollector):
     """Collecteur de données pour Douyin."""
 
     platform_name = 'douyin'
+    # Mots positifs et négatifs en chinois et en anglais
+    positive_words = (
+        '好', '棒', '喜欢', '爱', '赞', '精彩', '优秀', '完美',  # Chinois
+        'good', 'great', 'love', 'amazing', 'excellent', 'perfect'  # Anglais
+    )
+    negative_words = (
+        '差', '烂', '糟', '讨厌', '恨', '失望', '垃圾',  # Chinois
+        'bad', 'poor', 'terrible', 'hate', 'awful', 'horrible'  # Anglais
+    )
 
     def __init__(self, api_key: str):
         """Initialise le collecteur Douyin avec une clé API."""
@@ -30,7 +39,7 @@ class DouyinCollector(BaseCollector):
             response = await self._make_request(url)
             hashtags = response['data']['hashtags']
             
-            return [
+            return self._with_sentiments([
                 {
                     'id': hashtag['id'],
                     'title': hashtag['title'],
@@ -41,7 +50,7 @@ class DouyinCollector(BaseCollector):
                     }
                 }
                 for hashtag in hashtags
-            ]
+            ], 'description')
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des tendances: {e}")
             raise
@@ -276,32 +285,6 @@ class DouyinCollector(BaseCollector):
                 'is_trending': False
             }
 
-    def _analyze_sentiment(self, text: str) -> float:
-        """Analyse le sentiment d'un texte et retourne un score entre 0 et 1."""
-        # Liste de mots positifs et négatifs en chinois et en anglais
-        positive_words = [
-            '好', '棒', '喜欢', '爱', '赞', '精彩', '优秀', '完美',  # Chinois
-            'good', 'great', 'love', 'amazing', 'excellent', 'perfect'  # Anglais
-        ]
-        negative_words = [
-            '差', '烂', '糟', '讨厌', '恨', '失望', '垃圾',  # Chinois
-            'bad', 'poor', 'terrible', 'hate', 'awful', 'horrible'  # Anglais
-        ]
-
-        # Convertir le texte en minuscules pour la comparaison
-        text = text.lower()
-        
-        # Compter les mots positifs et négatifs
-        positive_count = sum(1 for word in positive_words if word in text)
-        negative_count = sum(1 for word in negative_words if word in text)
-        
-        # Calculer le score de sentiment
-        total_words = positive_count + negative_count
-        if total_words == 0:
-            return 0.5  # Neutre
-        
-        return positive_count / total_words
-
     def _is_peak_hour(self, hour: int) -> bool:
         """Détermine si une heure donnée est une heure de pointe."""
         # Heures de pointe typiques pour Douyin
@@ -681,7 +664,7 @@ class DouyinCollector(BaseCollector):
                         }
                     }
 
-            async with aiohttp.ClientSession() as session:
+            async with self._client_session() as session:
                 async with session.get(url, params=params) as response:
                     if response.status >= 400:
                         error_text = await response.text()
@@ -29,7 +29,9 @@ class FacebookCollector(BaseCollector):
             }
             
             response = await self._make_request(url, params)
-            return [self._transform_post(post) for post in response.get('data', [])]
+            return self._with_sentiments(
+                [self._transform_post(post) for post in response.get('data', [])], 'message'
+            )
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des tendances Facebook: {str(e)}")
             raise
@@ -174,34 +176,6 @@ class FacebookCollector(BaseCollector):
         peak_hours = {12, 13, 17, 18, 19, 20}  # Heures de pointe typiques
         return hour in peak_hours
 
-    def _analyze_sentiment(self, text: str) -> float:
-        """Analyse le sentiment d'un texte et retourne un score entre 0 et 1."""
-        # Liste de mots positifs et négatifs
-        positive_words = [
-            'love', 'great', 'amazing', 'awesome', 'excellent',
-            'perfect', 'beautiful', 'fantastic', 'wonderful', 'best',
-            'j\'adore', 'super', 'génial', 'incroyable', 'parfait'
-        ]
-        negative_words = [
-            'hate', 'bad', 'terrible', 'awful', 'horrible',
-            'worst', 'poor', 'disappointing', 'useless', 'waste',
-            'déteste', 'nul', 'horrible', 'mauvais', 'décevant'
-        ]
-
-        # Convertir le texte en minuscules pour la comparaison
-        text = text.lower()
-        
-        # Compter les mots positifs et négatifs
-        positive_count = sum(1 for word in positive_words if word in text)
-        negative_count = sum(1 for word in negative_words if word in text)
-        
-        # Calculer le score de sentiment
-        total_words = positive_count + negative_count
-        if total_words == 0:
-            return 0.5  # Neutre
-        
-        return positive_count / total_words
-
     async def get_content_analysis(self, post_id: str) -> Dict[str, Any]:
         """Analyse détaillée d'un post Facebook."""
         try:
@@ -353,7 +327,7 @@ class FacebookCollector(BaseCollector):
                     ]
                 }
 
-            async with aiohttp.ClientSession() as session:
+            async with self._client_session() as session:
                 async with session.get(url, params=params) as response:
                     if response.status >= 400:
                         error_text = await response.text()
@@ -43,7 +43,7 @@ class InstagramCollector(BaseCollector):
                 post['performance_level'] = performance_level
                 posts.append(post)
             
-            return posts
+            return self._with_sentiments(posts, 'caption')
             
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des tendances Instagram: {e}")
@@ -313,7 +313,7 @@ class InstagramCollector(BaseCollector):
                     ]
                 }
 
-            async with aiohttp.ClientSession() as session:
+            async with self._client_session() as session:
                 async with session.get(url, params=params) as response:
                     if response.status >= 400:
                         error_text = await response.text()
@@ -347,34 +347,6 @@ class InstagramCollector(BaseCollector):
         peak_hours = {12, 13, 17, 18, 19, 20}  # Heures de pointe typiques
         return hour in peak_hours
 
-    def _analyze_sentiment(self, text: str) -> float:
-        """Analyse le sentiment d'un texte et retourne un score entre 0 et 1."""
-        # Liste de mots positifs et négatifs
-        positive_words = [
-            'love', 'great', 'amazing', 'awesome', 'excellent',
-            'perfect', 'beautiful', 'fantastic', 'wonderful', 'best',
-            'j\'adore', 'super', 'génial', 'incroyable', 'parfait'
-        ]
-        negative_words = [
-            'hate', 'bad', 'terrible', 'awful', 'horrible',
-            'worst', 'poor', 'disappointing', 'useless', 'waste',
-            'déteste', 'nul', 'horrible', 'mauvais', 'décevant'
-        ]
-
-        # Convertir le texte en minuscules pour la comparaison
-        text = text.lower()
-        
-        # Compter les mots positifs et négatifs
-        positive_count = sum(1 for word in positive_words if word in text)
-        negative_count = sum(1 for word in negative_words if word in text)
-        
-        # Calculer le score de sentiment
-        total_words = positive_count + negative_count
-        if total_words == 0:
-            return 0.5  # Neutre
-        
-        return positive_count / total_words
-
     def _format_content_analysis(self, response: Dict[str, Any]) -> Dict[str, Any]:
         """Formate les données d'analyse de contenu."""
         # TODO: Implémenter la logique de formatage
@@ -1,30 +1,59 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, AsyncIterator
 import asyncio
+import inspect
 import logging
 from datetime import datetime
-from .tiktok import TikTokCollector
-from .youtube import YouTubeCollector
-from app.models.trend import Trend
-from app import db
+from .registry import CollectorPool
+from app.analytics.aggregation import TrendAggregator
+from app.services.ingest import IngestPipeline
 
 logger = logging.getLogger(__name__)
 
+# Champs d'un résultat de collecteur servant de mot-clé, par ordre de préférence
+KEYWORD_FIELDS = ('keyword', 'title', 'caption', 'description', 'message')
+
+def collection_params(collector: Any, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Paramètres acceptés par `get_trending_topics` d'un collecteur (instance
+    ou classe) parmi `params` ; les autres sont ignorés.
+    """
+    signature = inspect.signature(collector.get_trending_topics)
+    if any(p.kind is p.VAR_KEYWORD for p in signature.parameters.values()):
+        return dict(params)
+    return {name: value for name, value in params.items() if name in signature.parameters}
+
+def as_trend(platform: str, item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convertit un résultat de `get_trending_topics` en tendance pour le
+    pipeline d'ingestion : plateforme, mot-clé et vues (à défaut, somme des
+    interactions) ; les autres champs sont conservés.
+    """
+    metrics = item.get('metrics') or {}
+    views = item.get('views', metrics.get('views'))
+    if views is None:
+        views = sum(value for value in metrics.values() if isinstance(value, (int, float)))
+    return {
+        **item,
+        'platform': platform,
+        'keyword': next((item[field] for field in KEYWORD_FIELDS if item.get(field)), None),
+        'views': views,
+    }
+
 class CollectorManager:
     """Gestionnaire des collecteurs de données."""
     
-    def __init__(self, config: Dict[str, str]):
+    def __init__(self, config: Dict[str, str], http_session=None):
         """
         Initialise le gestionnaire avec les clés API.
         
         Args:
             config: Dictionnaire contenant les clés API pour chaque plateforme
                    {'tiktok': 'api_key', 'youtube': 'api_key', ...}
+            http_session: Session aiohttp partagée par les collecteurs (optionnelle)
         """
-        self.collectors = {
-            'tiktok': TikTokCollector(config.get('tiktok')),
-            'youtube': YouTubeCollector(config.get('youtube')),
-            # Ajoutez d'autres collecteurs ici
-        }
+        # Les collecteurs sont importés et instanciés au premier accès
+        # (voir collectors.registry pour en ajouter)
+        self.collectors = CollectorPool(config, http_session)
     
     async def collect_all_trends(self) -> List[Dict[str, Any]]:
         """Collecte les tendances de toutes les plateformes configurées."""
@@ -48,57 +77,101 @@ class CollectorManager:
         
         return all_trends
     
-    async def _collect_platform_trends(self, platform: str, collector: Any) -> List[Dict[str, Any]]:
+    async def iter_trends(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Produit les tendances au fil de l'eau, plateforme par plateforme,
+        dès que chaque collecte se termine.
+        """
+        tasks = [
+            asyncio.ensure_future(self._collect_platform_trends(platform, collector))
+            for platform, collector in self.collectors.items()
+            if collector.api_key
+        ]
+        
+        try:
+            for future in asyncio.as_completed(tasks):
+                try:
+                    platform_trends = await future
+                except Exception as e:
+                    logger.error(f"Erreur lors de la collecte: {str(e)}")
+                    continue
+                
+                for trend in platform_trends:
+                    yield trend
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    def _platform_collector(self, platform: str) -> Any:
+        collector = self.collectors.get(platform)
+        if collector is None:
+            raise ValueError(f"Plateforme non configurée: {platform}")
+        return collector
+    
+    async def collect_platform(self, platform: str, **params) -> List[Dict[str, Any]]:
+        """
+        Collecte les tendances d'une seule plateforme.
+        
+        Args:
+            platform: Nom de la plateforme
+            **params: Paramètres transmis au collecteur (région, requête...)
+        """
+        return await self._collect_platform_trends(platform, self._platform_collector(platform), **params)
+    
+    async def iter_platform(self, platform: str, **params) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Produit les tendances d'une seule plateforme au fil de la collecte
+        (voir `collect_platform`).
+        """
+        collector = self._platform_collector(platform)
+        async for trend in self._iter_platform_trends(platform, collector, **params):
+            yield trend
+    
+    async def _collect_platform_trends(self, platform: str, collector: Any, **params) -> List[Dict[str, Any]]:
         """Collecte les tendances d'une plateforme spécifique."""
+        return [trend async for trend in self._iter_platform_trends(platform, collector, **params)]
+    
+    async def _iter_platform_trends(self, platform: str, collector: Any, **params) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Produit les tendances d'une plateforme spécifique.
+        
+        Un collecteur qui pagine expose `iter_trending_topics` (mêmes
+        paramètres que `get_trending_topics`) : chaque page est transmise
+        avant que la suivante soit demandée. Les paramètres que le collecteur
+        ne prend pas en charge (une région pour une API sans découpage
+        régional, par exemple) sont ignorés.
+        """
         try:
+            supported = collection_params(collector, params)
+            if len(supported) < len(params):
+                logger.debug(f"Paramètres ignorés pour {platform}: {sorted(set(params) - set(supported))}")
+            count = 0
             async with collector:
                 logger.info(f"Début de la collecte pour {platform}")
-                trends = await collector.collect_data()
-                logger.info(f"Collecte terminée pour {platform}: {len(trends)} tendances trouvées")
-                return trends
+                iter_topics = getattr(collector, 'iter_trending_topics', None)
+                if iter_topics is not None:
+                    async for item in iter_topics(**supported):
+                        count += 1
+                        yield as_trend(platform, item)
+                else:
+                    for item in await collector.get_trending_topics(**supported) or []:
+                        count += 1
+                        yield as_trend(platform, item)
+            logger.info(f"Collecte terminée pour {platform}: {count} tendances trouvées")
                 
         except Exception as e:
             logger.error(f"Erreur lors de la collecte pour {platform}: {str(e)}")
             raise
     
-    async def update_database(self) -> None:
-        """Met à jour la base de données avec les nouvelles tendances."""
+    async def update_database(self) -> Dict[str, Any]:
+        """
+        Met à jour la base de données avec les nouvelles tendances.
+        
+        Les tendances passent, au fil de la collecte, par le pipeline
+        d'ingestion (normalisation, enrichissement, upsert en masse).
+        """
         try:
-            # Collecte toutes les tendances
-            trends = await self.collect_all_trends()
-            
-            # Prépare les objets Trend
-            trend_objects = []
-            for trend_data in trends:
-                try:
-                    trend = Trend(
-                        platform=trend_data['platform'],
-                        keyword=trend_data['keyword'],
-                        category=trend_data.get('type', 'general'),
-                        volume=trend_data.get('volume', 0),
-                        engagement=trend_data.get('views', 0),
-                        growth_rate=trend_data.get('growth_rate', 0.0),
-                        sentiment_score=0.0,  # À calculer séparément
-                        hashtags=trend_data.get('hashtags', []),
-                        related_keywords=trend_data.get('related_keywords', []),
-                        peak_hours=trend_data.get('peak_hours', {})
-                    )
-                    trend_objects.append(trend)
-                    
-                except Exception as e:
-                    logger.error(f"Erreur lors de la création de l'objet Trend: {str(e)}")
-                    continue
-            
-            # Sauvegarde en base de données
-            try:
-                db.session.add_all(trend_objects)
-                db.session.commit()
-                logger.info(f"Base de données mise à jour avec {len(trend_objects)} nouvelles tendances")
-                
-            except Exception as e:
-                db.session.rollback()
-                logger.error(f"Erreur lors de la sauvegarde en base de données: {str(e)}")
-                raise
+            return await IngestPipeline().run_async(self.iter_trends())
                 
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour de la base de données: {str(e)}")
@@ -107,50 +180,15 @@ class CollectorManager:
     async def analyze_trends(self) -> Dict[str, Any]:
         """Analyse les tendances collectées."""
         try:
-            trends = await self.collect_all_trends()
-            
-            # Analyse par plateforme
-            platform_stats = {}
-            for trend in trends:
-                platform = trend['platform']
-                if platform not in platform_stats:
-                    platform_stats[platform] = {
-                        'total_trends': 0,
-                        'total_engagement': 0,
-                        'categories': set(),
-                        'top_trends': [],
-                    }
-                
-                stats = platform_stats[platform]
-                stats['total_trends'] += 1
-                stats['total_engagement'] += trend.get('views', 0)
-                stats['categories'].add(trend.get('type', 'general'))
-                
-                # Garde les 10 meilleures tendances par engagement
-                stats['top_trends'].append(trend)
-                stats['top_trends'].sort(key=lambda x: x.get('views', 0), reverse=True)
-                stats['top_trends'] = stats['top_trends'][:10]
-            
-            # Convertit les ensembles en listes pour la sérialisation JSON
-            for platform in platform_stats:
-                platform_stats[platform]['categories'] = list(
-                    platform_stats[platform]['categories']
-                )
+            # Agrégation en flux : top 10 par engagement, sommes et catégories
+            aggregator = TrendAggregator(metric='views', k=10)
+            await aggregator.consume_async(self.iter_trends())
             
             return {
                 'timestamp': datetime.utcnow().isoformat(),
-                'total_platforms': len(platform_stats),
-                'platform_stats': platform_stats,
-                'global_stats': {
-                    'total_trends': sum(
-                        stats['total_trends']
-                        for stats in platform_stats.values()
-                    ),
-                    'total_engagement': sum(
-                        stats['total_engagement']
-                        for stats in platform_stats.values()
-                    ),
-                }
+                'total_platforms': len(aggregator.groups),
+                'platform_stats': aggregator.platform_stats(),
+                'global_stats': aggregator.global_stats(),
             }
             
         except Exception as e:
@@ -0,0 +1,108 @@
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple, Type
+import importlib
+import logging
+import os
+from .base import BaseCollector
+
+logger = logging.getLogger(__name__)
+
+# Nom de la plateforme -> (module relatif au paquet collectors, classe).
+# Les modules ne sont importés qu'à la première utilisation.
+_COLLECTORS: Dict[str, Tuple[str, str]] = {
+    'youtube': ('.youtube', 'YouTubeCollector'),
+    'tiktok': ('.tiktok', 'TikTokCollector'),
+    'douyin': ('.douyin', 'DouyinCollector'),
+    'facebook': ('.facebook', 'FacebookCollector'),
+    'instagram': ('.instagram', 'InstagramCollector'),
+    'linkedin': ('.linkedin', 'LinkedInCollector'),
+    'twitter': ('.twitter', 'TwitterCollector'),
+}
+_loaded: Dict[str, Type[BaseCollector]] = {}
+
+def register_collector(name: str, module: str, class_name: str) -> None:
+    """
+    Enregistre un collecteur sans l'importer.
+
+    Args:
+        name: Nom de la plateforme
+        module: Chemin du module (absolu, ou relatif au paquet collectors s'il commence par '.')
+        class_name: Nom de la classe du collecteur
+    """
+    _COLLECTORS[name] = (module, class_name)
+    _loaded.pop(name, None)
+
+def available_collectors() -> List[str]:
+    """Retourne les noms des plateformes enregistrées."""
+    return list(_COLLECTORS)
+
+def get_collector_class(name: str) -> Type[BaseCollector]:
+    """Retourne la classe du collecteur, en important son module au premier appel."""
+    collector_class = _loaded.get(name)
+    if collector_class is None:
+        if name not in _COLLECTORS:
+            raise ValueError(f"Plateforme non supportée: {name}")
+        module_name, class_name = _COLLECTORS[name]
+        module = importlib.import_module(module_name, __package__)
+        collector_class = getattr(module, class_name)
+        _loaded[name] = collector_class
+        logger.debug(f"Collecteur {name} chargé depuis {module.__name__}")
+    return collector_class
+
+def get_api_key(name: str) -> Optional[str]:
+    """Lit la clé API d'une plateforme dans l'environnement ({PLATEFORME}_API_KEY)."""
+    return os.environ.get(f'{name.upper()}_API_KEY')
+
+def create_collector(name: str, api_key: Optional[str] = None) -> BaseCollector:
+    """
+    Instancie le collecteur d'une plateforme.
+
+    Args:
+        name: Nom de la plateforme
+        api_key: Clé API (lue dans l'environnement si absente)
+
+    Raises:
+        ValueError: Si la plateforme est inconnue ou si aucune clé n'est configurée
+    """
+    api_key = api_key or get_api_key(name)
+    if not api_key:
+        raise ValueError(f"Clé API non configurée pour {name}")
+    return get_collector_class(name)(api_key)
+
+class CollectorPool(Mapping):
+    """
+    Ensemble de collecteurs instanciés à la demande.
+
+    Seules les plateformes enregistrées et disposant d'une clé API sont
+    exposées ; chaque collecteur est créé (et son module importé) au
+    premier accès, puis réutilisé.
+    """
+
+    def __init__(self, config: Dict[str, Optional[str]], http_session=None):
+        """
+        Args:
+            config: Dictionnaire contenant les clés API pour chaque plateforme
+                   {'tiktok': 'api_key', 'youtube': 'api_key', ...}
+            http_session: Session aiohttp partagée par les collecteurs créés (optionnelle)
+        """
+        self.config = {
+            name: api_key for name, api_key in config.items()
+            if api_key and name in _COLLECTORS
+        }
+        self.http_session = http_session
+        self._instances: Dict[str, BaseCollector] = {}
+
+    def __getitem__(self, name: str) -> BaseCollector:
+        if name not in self.config:
+            raise KeyError(name)
+        collector = self._instances.get(name)
+        if collector is None:
+            collector = create_collector(name, self.config[name])
+            collector.http_session = self.http_session
+            self._instances[name] = collector
+        return collector
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.config)
+
+    def __len__(self) -> int:
+        return len(self.config)
@@ -46,7 +46,7 @@ class TikTokCollector(BaseCollector):
                     ]
                 }
 
-            async with aiohttp.ClientSession() as session:
+            async with self._client_session() as session:
                 headers = {
                     'Authorization': f'Bearer {self.api_key}',
                     'Content-Type': 'application/json',
@@ -86,7 +86,7 @@ class TikTokCollector(BaseCollector):
                 raise Exception("Format de réponse invalide")
             
             videos = response['data']
-            return [{
+            return self._with_sentiments([{
                 'id': video['id'],
                 'description': video.get('desc', ''),
                 'create_time': video.get('create_time', ''),
@@ -108,7 +108,7 @@ class TikTokCollector(BaseCollector):
                         video['statistics'].get('play_count', 0)
                     )
                 )
-            } for video in videos]
+            } for video in videos], 'description')
             
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des tendances TikTok: {e}")
@@ -124,7 +124,7 @@ class TikTokCollector(BaseCollector):
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with self._client_session() as session:
                 async with session.post(url, json=data) as response:
                     if response.status >= 400:
                         error_text = await response.text()
@@ -521,34 +521,6 @@ class TikTokCollector(BaseCollector):
         """Extrait les hashtags (#hashtag) d'un texte."""
         return [word for word in text.split() if word.startswith('#')]
 
-    def _analyze_sentiment(self, text: str) -> float:
-        """Analyse le sentiment d'un texte et retourne un score entre 0 et 1."""
-        # Liste de mots positifs et négatifs
-        positive_words = [
-            'love', 'great', 'amazing', 'awesome', 'excellent',
-            'perfect', 'beautiful', 'fantastic', 'wonderful', 'best',
-            'j\'adore', 'super', 'génial', 'incroyable', 'parfait'
-        ]
-        negative_words = [
-            'hate', 'bad', 'terrible', 'awful', 'horrible',
-            'worst', 'poor', 'disappointing', 'useless', 'waste',
-            'déteste', 'nul', 'horrible', 'mauvais', 'décevant'
-        ]
-
-        # Convertir le texte en minuscules pour la comparaison
-        text = text.lower()
-        
-        # Compter les mots positifs et négatifs
-        positive_count = sum(1 for word in positive_words if word in text)
-        negative_count = sum(1 for word in negative_words if word in text)
-        
-        # Calculer le score de sentiment
-        total_words = positive_count + negative_count
-        if total_words == 0:
-            return 0.5  # Neutre
-        
-        return positive_count / total_words
-
     async def __aenter__(self):
         """Entrée dans le contexte asynchrone."""
         return self
@@ -10,6 +10,11 @@ logger = logging.getLogger(__name__)
 class TwitterCollector(BaseCollector):
     """Collecteur de données pour Twitter."""
 
+    # Mots positifs et négatifs (à étendre), comptés comme mots isolés
+    positive_words = ('great', 'good', 'awesome', 'amazing', 'excellent', 'happy', 'love', 'best')
+    negative_words = ('bad', 'poor', 'terrible', 'awful', 'worst', 'hate', 'sad', 'disappointed')
+    sentiment_whole_words = True
+
     def __init__(self, api_key: str):
         """Initialise le collecteur Twitter."""
         super().__init__(api_key)
@@ -47,7 +52,7 @@ class TwitterCollector(BaseCollector):
                     logger.warning(f"Erreur lors du traitement de la tendance: {e}")
                     continue
 
-            return trends
+            return self._with_sentiments(trends, 'description')
 
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des tendances Twitter: {e}")
@@ -239,14 +244,14 @@ class TwitterCollector(BaseCollector):
 
     def _analyze_sentiment(self, text: str) -> str:
         """Analyse simple du sentiment du texte."""
-        # Liste de mots positifs et négatifs (à étendre)
-        positive_words = {'great', 'good', 'awesome', 'amazing', 'excellent', 'happy', 'love', 'best'}
-        negative_words = {'bad', 'poor', 'terrible', 'awful', 'worst', 'hate', 'sad', 'disappointed'}
-        
-        words = text.lower().split()
-        positive_count = sum(1 for word in words if word in positive_words)
-        negative_count = sum(1 for word in words if word in negative_words)
-        
+        return self._sentiment_label(*self.sentiment_lexicon.counts(text))
+
+    def _analyze_sentiments(self, texts: List[str]) -> List[str]:
+        """Analyse simple du sentiment d'un lot de textes."""
+        return [self._sentiment_label(*counts) for counts in self.sentiment_lexicon.counts_batch(texts)]
+
+    @staticmethod
+    def _sentiment_label(positive_count: int, negative_count: int) -> str:
         if positive_count > negative_count:
             return 'positive'
         elif negative_count > positive_count:
@@ -1,11 +1,11 @@
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any, Optional
+import asyncio
 import json
 from datetime import datetime, timedelta
 from .base import BaseCollector
 import logging
 import aiohttp
-from collections import Counter
-from googleapiclient.discovery import build
+from collections import Counter, defaultdict
 
 logger = logging.getLogger(__name__)
 
@@ -61,7 +61,7 @@ class YouTubeCollector(BaseCollector):
                 else:
                     raise Exception("Invalid endpoint")
 
-            async with aiohttp.ClientSession() as session:
+            async with self._client_session() as session:
                 async with session.get(url, params=params) as response:
                     if response.status >= 400:
                         error_text = await response.text()
@@ -77,49 +77,141 @@ class YouTubeCollector(BaseCollector):
             logger.error(f"Erreur lors de la requête YouTube: {e}")
             raise
 
-    async def get_trending_topics(self) -> List[Dict[str, Any]]:
-        """Récupère les vidéos tendance sur YouTube."""
+    async def get_trending_topics(self, region: str = 'FR', max_results: int = 10) -> List[Dict[str, Any]]:
+        """
+        Récupère les vidéos tendance sur YouTube.
+        
+        Args:
+            region: Code pays ISO 3166-1 du classement (FR par défaut)
+            max_results: Nombre de vidéos
+        """
         try:
-            url = "https://www.googleapis.com/youtube/v3/videos"
-            params = {
-                "part": "snippet,statistics",
-                "chart": "mostPopular",
-                "regionCode": "FR",
-                "maxResults": 10,
-                "key": self.api_key
-            }
-
-            response = await self._make_request(url, params)
-            videos = []
-            
-            for item in response.get('items', []):
-                stats = item['statistics']
-                engagement_rate = self._calculate_engagement_rate(
-                    int(stats.get('likeCount', 0)),
-                    int(stats.get('commentCount', 0)),
-                    int(stats.get('viewCount', 0))
-                )
-                
-                videos.append({
-                    'id': item['id'],
-                    'title': item['snippet']['title'],
-                    'description': item['snippet']['description'],
-                    'published_at': item['snippet']['publishedAt'],
-                    'engagement_rate': engagement_rate,
-                    'performance_level': self._get_performance_level(engagement_rate),
-                    'metrics': {
-                        'views': int(stats.get('viewCount', 0)),
-                        'likes': int(stats.get('likeCount', 0)),
-                        'comments': int(stats.get('commentCount', 0))
-                    }
-                })
-            
-            return videos
+            return [video async for video in self.iter_trending_topics(region, max_results)]
             
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des tendances YouTube: {e}")
             raise
 
+    async def iter_trending_topics(self, region: str = 'FR', max_results: int = 10) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Parcourt les vidéos tendance page par page (50 au plus par page) :
+        une page est transmise avant que la suivante soit demandée.
+        """
+        url = "https://www.googleapis.com/youtube/v3/videos"
+        params = {
+            "part": "snippet,statistics",
+            "chart": "mostPopular",
+            "regionCode": region,
+            "maxResults": min(50, max_results),
+            "key": self.api_key
+        }
+        count = 0
+        while count < max_results:
+            response = await self._make_request(url, params)
+            for item in response.get('items', [])[:max_results - count]:
+                count += 1
+                yield self._trending_video(item)
+            
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+            params = {**params, 'pageToken': page_token, 'maxResults': min(50, max_results - count)}
+
+    def _trending_video(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Convertit une vidéo du classement mostPopular."""
+        stats = item['statistics']
+        engagement_rate = self._calculate_engagement_rate(
+            int(stats.get('likeCount', 0)),
+            int(stats.get('commentCount', 0)),
+            int(stats.get('viewCount', 0))
+        )
+        return {
+            'id': item['id'],
+            'title': item['snippet']['title'],
+            'description': item['snippet']['description'],
+            'published_at': item['snippet']['publishedAt'],
+            'engagement_rate': engagement_rate,
+            'performance_level': self._get_performance_level(engagement_rate),
+            'metrics': {
+                'views': int(stats.get('viewCount', 0)),
+                'likes': int(stats.get('likeCount', 0)),
+                'comments': int(stats.get('commentCount', 0))
+            }
+        }
+
+    async def get_engagement_metrics_batch(self, video_ids: List[str], concurrency: int = 10) -> Dict[str, Dict]:
+        """Récupère les statistiques de plusieurs vidéos (50 identifiants par requête)."""
+        url = f"{self.base_url}/videos"
+        chunks = [video_ids[i:i + 50] for i in range(0, len(video_ids), 50)]
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def fetch(chunk: List[str]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._make_request(url, {
+                    'part': 'statistics',
+                    'id': ','.join(chunk),
+                    'key': self.api_key
+                })
+        
+        responses = await asyncio.gather(*(fetch(c) for c in chunks), return_exceptions=True)
+        
+        metrics = {}
+        for response in responses:
+            if isinstance(response, Exception):
+                logger.error(f"Erreur lors de la récupération des statistiques YouTube: {response}")
+                continue
+            
+            for item in response.get('items', []):
+                stats = item.get('statistics', {})
+                views = int(stats.get('viewCount', 0))
+                likes = int(stats.get('likeCount', 0))
+                comments = int(stats.get('commentCount', 0))
+                metrics[item['id']] = {
+                    'views': views,
+                    'likes': likes,
+                    'comments': comments,
+                    'engagement': likes + comments,
+                    'engagement_rate': self._calculate_engagement_rate(likes, comments, views)
+                }
+        
+        return metrics
+
+    async def iter_comments(self, video_id: str, max_comments: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Parcourt les commentaires d'une vidéo, page par page (commentThreads,
+        100 par page), sans les charger tous en mémoire.
+        
+        Args:
+            video_id: Identifiant de la vidéo
+            max_comments: Nombre maximal de commentaires (tous par défaut)
+        """
+        url = f"{self.base_url}/commentThreads"
+        params = {
+            'part': 'snippet',
+            'videoId': video_id,
+            'maxResults': 100,
+            'textFormat': 'plainText',
+            'key': self.api_key
+        }
+        count = 0
+        while True:
+            response = await self._make_request(url, params)
+            for item in response.get('items', []):
+                snippet = item['snippet']['topLevelComment']['snippet']
+                yield {
+                    'text': snippet.get('textDisplay', ''),
+                    'likes': int(snippet.get('likeCount', 0)),
+                    'published_at': snippet.get('publishedAt')
+                }
+                count += 1
+                if max_comments is not None and count >= max_comments:
+                    return
+            
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return
+            params = {**params, 'pageToken': page_token}
+
     def _calculate_engagement_rate(self, likes: int, comments: int, views: int) -> float:
         """Calcule le taux d'engagement d'une vidéo."""
         if views == 0:
@@ -205,7 +297,7 @@ class YouTubeCollector(BaseCollector):
             return {}
             
         # Analyser les horaires optimaux
-        time_stats = self._analyze_upload_times(videos)
+        time_stats = await self._analyze_upload_times(videos)
         
         # Analyser les mots-clés populaires
         keywords = []
@@ -272,39 +364,46 @@ class YouTubeCollector(BaseCollector):
                 
         return videos
         
-    def _analyze_upload_times(self, videos: List[Dict]) -> List[Dict]:
-        """Analyse les meilleurs moments de publication."""
-        time_stats = {}
+    async def _analyze_upload_times(self, videos: List[Dict], timezone: str = 'UTC') -> List[Dict]:
+        """Analyse les meilleurs moments de publication (engagement moyen par heure)."""
+        from ..analytics.heatmap import EngagementHeatmap
         
+        published, engagement = [], []
+        by_channel = defaultdict(list)
         for video in videos:
-            try:
-                published_at = datetime.strptime(
-                    video['snippet']['publishedAt'],
-                    '%Y-%m-%dT%H:%M:%SZ'
-                )
-                hour = published_at.hour
-                
-                if hour not in time_stats:
-                    time_stats[hour] = {
-                        'total_engagement': 0,
-                        'count': 0
-                    }
-                
-                engagement = self._calculate_engagement_rate(video['statistics'])
-                time_stats[hour]['total_engagement'] += engagement
-                time_stats[hour]['count'] += 1
-                
-            except Exception as e:
-                logger.error(f"Erreur lors de l'analyse des horaires: {e}")
-                continue
-                
+            stats = video.get('statistics', {})
+            snippet = video.get('snippet', {})
+            views = int(stats.get('viewCount', 0))
+            published.append(snippet.get('publishedAt'))
+            engagement.append(self._calculate_engagement_rate(
+                int(stats.get('likeCount', 0)),
+                int(stats.get('commentCount', 0)),
+                views
+            ))
+            if snippet.get('channelId'):
+                by_channel[snippet['channelId']].append({
+                    'id': video.get('id'),
+                    'published_at': published[-1],
+                    'views': views,
+                    'engagement': engagement[-1]
+                })
+        
+        # Les vidéos collectées alimentent les cartes persistantes de leur chaîne
+        for channel_id, channel_videos in by_channel.items():
+            await self._record_posting_times('youtube', channel_id, channel_videos)
+        
+        # Carte jour × heure en une passe ; les vidéos sans date sont ignorées
+        heatmap = EngagementHeatmap(timezone)
+        heatmap.add(published, engagement)
+        hour_counts = heatmap.counts.sum(axis=0)
+        hour_means = heatmap.hour_means()
         return [
             {
                 'hour': hour,
-                'engagement': stats['total_engagement'] / stats['count']
+                'engagement': float(hour_means[hour])
             }
-            for hour, stats in time_stats.items()
-            if stats['count'] > 0
+            for hour in range(len(hour_counts))
+            if hour_counts[hour] > 0
         ]
         
     def _analyze_engagement_patterns(self, videos: List[Dict]) -> Dict:
@@ -540,9 +639,21 @@ class YouTubeCollector(BaseCollector):
             logger.error(f"Erreur lors de l'analyse des mots-clés: {e}")
             raise
 
-    async def get_optimal_schedule(self, channel_id: str) -> Dict[str, Any]:
-        """Détermine les meilleurs moments pour publier."""
+    async def get_optimal_schedule(self, channel_id: str, timezone: str = 'UTC') -> Dict[str, Any]:
+        """
+        Détermine les meilleurs moments pour publier : vues moyennes des
+        dernières vidéos par jour et par heure de publication (fuseau `timezone`).
+        
+        La carte persistante de la chaîne est lue si elle est fraîche (voir
+        services.posting_histograms) ; sinon les dernières vidéos sont
+        récupérées sur l'API puis ajoutées à la carte.
+        """
+        from ..analytics.heatmap import EngagementHeatmap
         try:
+            heatmaps = await self.lookup_posting_times('youtube', channel_id, timezone)
+            if heatmaps is not None:
+                return self._schedule_from_heatmap(heatmaps['views'])
+            
             url = f"{self.base_url}/search"
             params = {
                 "part": "snippet",
@@ -553,63 +664,55 @@ class YouTubeCollector(BaseCollector):
             }
             
             data = await self._make_request(url, params)
-            videos = data.get('items', [])
-            
-            # Analyse des horaires de publication
-            publish_times = []
-            day_stats = {i: {'views': 0, 'count': 0} for i in range(7)}  # 0 = Lundi
-            hour_stats = {i: {'views': 0, 'count': 0} for i in range(24)}
-            
-            for video in videos:
-                published_at = datetime.strptime(
-                    video['snippet']['publishedAt'], 
-                    '%Y-%m-%dT%H:%M:%SZ'
-                )
-                day_of_week = published_at.weekday()
-                hour = published_at.hour
-                
-                # Récupérer les statistiques de la vidéo
-                video_details = await self._get_videos_details([video['id']['videoId']])
-                if video_details:
-                    views = int(video_details[0]['statistics'].get('viewCount', 0))
-                    day_stats[day_of_week]['views'] += views
-                    day_stats[day_of_week]['count'] += 1
-                    hour_stats[hour]['views'] += views
-                    hour_stats[hour]['count'] += 1
-            
-            # Calculer les moyennes
-            best_days = []
-            best_hours = []
-            
-            for day, stats in day_stats.items():
-                if stats['count'] > 0:
-                    avg_views = stats['views'] / stats['count']
-                    best_days.append({
-                        'day': ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche'][day],
-                        'avg_views': avg_views
-                    })
-            
-            for hour, stats in hour_stats.items():
-                if stats['count'] > 0:
-                    avg_views = stats['views'] / stats['count']
-                    best_hours.append({
-                        'hour': f"{hour:02d}:00",
-                        'avg_views': avg_views
-                    })
-            
-            # Trier par vues moyennes
-            best_days.sort(key=lambda x: x['avg_views'], reverse=True)
-            best_hours.sort(key=lambda x: x['avg_views'], reverse=True)
-            
-            return {
-                'best_days': best_days[:3],
-                'best_hours': best_hours[:3],
-                'recommendations': self._generate_schedule_recommendations(best_days, best_hours)
-            }
+            videos = [v for v in data.get('items', []) if v.get('id', {}).get('videoId')]
+            
+            # Statistiques de toutes les vidéos en une requête (50 identifiants par requête)
+            metrics = await self.get_engagement_metrics_batch([v['id']['videoId'] for v in videos])
+            videos = [v for v in videos if v['id']['videoId'] in metrics]
+            
+            # Analyse des horaires de publication sur une carte jour × heure
+            heatmap = EngagementHeatmap(timezone)
+            heatmap.add(
+                [v['snippet']['publishedAt'] for v in videos],
+                [metrics[v['id']['videoId']]['views'] for v in videos]
+            )
+            # Dernières vidéos de la chaîne : la carte persistante redevient fraîche
+            await self._record_posting_times('youtube', channel_id, [
+                {
+                    'id': v['id']['videoId'],
+                    'published_at': v['snippet']['publishedAt'],
+                    'views': metrics[v['id']['videoId']]['views'],
+                    'engagement': metrics[v['id']['videoId']]['engagement_rate']
+                }
+                for v in videos
+            ], full_fetch=True)
+            return self._schedule_from_heatmap(heatmap)
             
         except Exception as e:
             logger.error(f"Erreur lors de la détermination du planning optimal: {e}")
             raise
+            
+    def _schedule_from_heatmap(self, heatmap) -> Dict[str, Any]:
+        """Planning optimal d'une carte des vues : jours et heures triés par vues moyennes."""
+        day_means = heatmap.day_means()
+        hour_means = heatmap.hour_means()
+        
+        day_names = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche']
+        best_days = [
+            {'day': day_names[day], 'avg_views': float(day_means[day])}
+            for day in heatmap.best_days(len(day_names))
+        ]
+        best_hours = [
+            {'hour': f"{hour:02d}:00", 'avg_views': float(hour_means[hour])}
+            for hour in heatmap.best_hours_overall(len(hour_means))
+        ]
+        
+        return {
+            'best_days': best_days[:3],
+            'best_hours': best_hours[:3],
+            'recommendations': self._generate_schedule_recommendations(best_days, best_hours),
+            'heatmap': heatmap.to_dict()
+        }
 
     async def analyze_thumbnails(self, channel_id: str) -> Dict[str, Any]:
         """Analyse les miniatures des vidéos les plus performantes."""
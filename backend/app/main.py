@@ -1,13 +1,9 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Dict, Optional
-import os
 from dotenv import load_dotenv
-from .collectors.youtube import YouTubeCollector
-from .collectors.facebook import FacebookCollector
-from .collectors.douyin import DouyinCollector
-from .analytics.performance import PerformanceAnalyzer
-from .analytics.sentiment import SentimentAnalyzer
+from .collectors.base import BaseCollector
+from .collectors.registry import available_collectors, create_collector
 from .generators.content import ContentGenerator
 from pydantic import BaseModel
 
@@ -29,46 +25,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Dépendances pour les collecteurs
-def get_youtube_collector():
-    api_key = os.getenv("YOUTUBE_API_KEY")
-    if not api_key:
-        raise HTTPException(status_code=500, detail="YouTube API key not configured")
-    return YouTubeCollector(api_key)
-
-def get_facebook_collector():
-    api_key = os.getenv("FACEBOOK_API_KEY")
-    if not api_key:
-        raise HTTPException(status_code=500, detail="Facebook API key not configured")
-    return FacebookCollector(api_key)
-
-def get_douyin_collector():
-    api_key = os.getenv("DOUYIN_API_KEY")
-    if not api_key:
-        raise HTTPException(status_code=500, detail="Douyin API key not configured")
-    return DouyinCollector(api_key)
+@app.on_event("shutdown")
+def shutdown_process_pools():
+    """Arrête le pool de processus de l'analyse des commentaires."""
+    from .analytics.sentiment import shutdown_process_pool
+    shutdown_process_pool()
+
+# Dépendance pour les collecteurs : le module de la plateforme n'est importé
+# qu'à la première requête qui la concerne
+def get_collector(platform: str) -> BaseCollector:
+    if platform not in available_collectors():
+        raise HTTPException(status_code=400, detail=f"Platform {platform} not supported")
+    try:
+        return create_collector(platform)
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Routes pour l'analyse des tendances
 @app.get("/trends/{platform}", response_model=Dict)
 async def get_trends(
     platform: str,
     max_results: int = 50,
-    youtube: Optional[YouTubeCollector] = Depends(get_youtube_collector),
-    facebook: Optional[FacebookCollector] = Depends(get_facebook_collector),
-    douyin: Optional[DouyinCollector] = Depends(get_douyin_collector)
+    collector: BaseCollector = Depends(get_collector)
 ):
     """Récupère les tendances pour une plateforme donnée."""
-    collectors = {
-        'youtube': youtube,
-        'facebook': facebook,
-        'douyin': douyin
-    }
-    
-    if platform not in collectors:
-        raise HTTPException(status_code=400, detail=f"Platform {platform} not supported")
-        
     try:
-        return await collectors[platform].get_trending_topics(max_results)
+        return await collector.get_trending_topics(max_results)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -77,22 +59,11 @@ async def get_trends(
 async def analyze_content(
     platform: str,
     content_id: str,
-    youtube: Optional[YouTubeCollector] = Depends(get_youtube_collector),
-    facebook: Optional[FacebookCollector] = Depends(get_facebook_collector),
-    douyin: Optional[DouyinCollector] = Depends(get_douyin_collector)
+    collector: BaseCollector = Depends(get_collector)
 ):
     """Analyse un contenu spécifique."""
-    collectors = {
-        'youtube': youtube,
-        'facebook': facebook,
-        'douyin': douyin
-    }
-    
-    if platform not in collectors:
-        raise HTTPException(status_code=400, detail=f"Platform {platform} not supported")
-        
     try:
-        return await collectors[platform].get_content_analysis(content_id)
+        return await collector.get_content_analysis(content_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -101,22 +72,11 @@ async def analyze_content(
 async def analyze_competitor(
     platform: str,
     competitor_id: str,
-    youtube: Optional[YouTubeCollector] = Depends(get_youtube_collector),
-    facebook: Optional[FacebookCollector] = Depends(get_facebook_collector),
-    douyin: Optional[DouyinCollector] = Depends(get_douyin_collector)
+    collector: BaseCollector = Depends(get_collector)
 ):
     """Analyse un concurrent spécifique."""
-    collectors = {
-        'youtube': youtube,
-        'facebook': facebook,
-        'douyin': douyin
-    }
-    
-    if platform not in collectors:
-        raise HTTPException(status_code=400, detail=f"Platform {platform} not supported")
-        
     try:
-        return await collectors[platform].get_competitor_analysis(competitor_id)
+        return await collector.get_competitor_analysis(competitor_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -125,22 +85,11 @@ async def analyze_competitor(
 async def get_audience_insights(
     platform: str,
     content_ids: List[str],
-    youtube: Optional[YouTubeCollector] = Depends(get_youtube_collector),
-    facebook: Optional[FacebookCollector] = Depends(get_facebook_collector),
-    douyin: Optional[DouyinCollector] = Depends(get_douyin_collector)
+    collector: BaseCollector = Depends(get_collector)
 ):
     """Analyse l'audience d'un ensemble de contenus."""
-    collectors = {
-        'youtube': youtube,
-        'facebook': facebook,
-        'douyin': douyin
-    }
-    
-    if platform not in collectors:
-        raise HTTPException(status_code=400, detail=f"Platform {platform} not supported")
-        
     try:
-        return await collectors[platform].get_audience_insights(content_ids)
+        return await collector.get_audience_insights(content_ids)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -149,22 +98,11 @@ async def get_audience_insights(
 async def get_content_suggestions(
     platform: str,
     category: str,
-    youtube: Optional[YouTubeCollector] = Depends(get_youtube_collector),
-    facebook: Optional[FacebookCollector] = Depends(get_facebook_collector),
-    douyin: Optional[DouyinCollector] = Depends(get_douyin_collector)
+    collector: BaseCollector = Depends(get_collector)
 ):
     """Génère des suggestions de contenu pour une catégorie donnée."""
-    collectors = {
-        'youtube': youtube,
-        'facebook': facebook,
-        'douyin': douyin
-    }
-    
-    if platform not in collectors:
-        raise HTTPException(status_code=400, detail=f"Platform {platform} not supported")
-        
     try:
-        return await collectors[platform].generate_content_suggestions(category)
+        return await collector.generate_content_suggestions(category)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -173,11 +111,15 @@ async def get_content_suggestions(
 async def get_best_posting_times(
     platform: str,
     collector: BaseCollector = Depends(get_collector),
-    days: int = Query(default=30, ge=1, le=90)
+    days: int = Query(default=30, ge=1, le=90),
+    timezone: str = Query(default='UTC')
 ):
+    from .analytics.performance import PerformanceAnalyzer
     analyzer = PerformanceAnalyzer(collector)
-    content_data = await collector.get_content_history(days)
-    return await analyzer.analyze_best_posting_times(content_data, days)
+    try:
+        return await analyzer.best_posting_times(platform, days, timezone)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/{platform}/performance/virality")
 async def predict_virality(
@@ -185,28 +127,96 @@ async def predict_virality(
     content_data: Dict,
     collector: BaseCollector = Depends(get_collector)
 ):
+    from .analytics.performance import PerformanceAnalyzer
     analyzer = PerformanceAnalyzer(collector)
     return {"virality_score": await analyzer.predict_virality(content_data)}
 
+@app.post("/{platform}/performance/virality/batch")
+async def predict_virality_batch(
+    platform: str,
+    payload: Dict,
+    collector: BaseCollector = Depends(get_collector)
+):
+    """
+    Potentiel viral d'un lot : {"records": [{...}, ...]} ou, plus rapide,
+    {"columns": {"engagement_rate": [...], "view_count": [...], ...}}.
+    """
+    from .analytics.performance import PerformanceAnalyzer
+    analyzer = PerformanceAnalyzer(collector)
+    try:
+        scores = await analyzer.predict_virality_batch(payload.get('records'), payload.get('columns'))
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"virality_scores": scores.tolist()}
+
 @app.post("/{platform}/performance/calendar")
 async def generate_content_calendar(
     platform: str,
     topics: List[str],
     frequency: int = Query(default=3, ge=1, le=7),
+    days: int = Query(default=30, ge=1, le=92),
+    timezone: str = Query(default='UTC'),
+    seed: Optional[int] = Query(default=None),
     collector: BaseCollector = Depends(get_collector)
 ):
+    """Calendrier de publication, tiré sur la carte d'engagement de la plateforme (reproductible avec `seed`)."""
+    from .analytics.performance import PerformanceAnalyzer
     analyzer = PerformanceAnalyzer(collector)
-    return await analyzer.generate_content_calendar(topics, frequency)
+    try:
+        return await analyzer.generate_content_calendar(topics, frequency, platform, days, timezone, seed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # Nouveaux endpoints pour l'analyse des sentiments
 @app.post("/{platform}/sentiment/comments")
 async def analyze_comments(
     platform: str,
     comments: List[Dict],
+    engine: Optional[str] = Query(default=None, enum=["textblob", "lexicon"]),
+    collector: BaseCollector = Depends(get_collector)
+):
+    from .analytics.sentiment import SentimentAnalyzer
+    analyzer = SentimentAnalyzer()
+    try:
+        return await analyzer.analyze_comments(comments, engine)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/{platform}/sentiment/comments/stream")
+async def analyze_comment_stream(
+    platform: str,
+    request: Request,
+    engine: Optional[str] = Query(default=None, enum=["textblob", "lexicon"]),
     collector: BaseCollector = Depends(get_collector)
 ):
+    """Analyse un envoi NDJSON de commentaires (un objet {"text": ...} par ligne), en flux."""
+    from .analytics.sentiment import SentimentAnalyzer, iter_ndjson
     analyzer = SentimentAnalyzer()
-    return await analyzer.analyze_comments(comments)
+    try:
+        return await analyzer.analyze_comment_stream(iter_ndjson(request.stream()), engine=engine)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/{platform}/sentiment/content/{content_id}")
+async def analyze_content_comments(
+    platform: str,
+    content_id: str,
+    max_comments: Optional[int] = Query(default=None, ge=1),
+    engine: Optional[str] = Query(default=None, enum=["textblob", "lexicon"]),
+    collector: BaseCollector = Depends(get_collector)
+):
+    """Analyse les commentaires d'un contenu, lus page par page sur la plateforme."""
+    iter_comments = getattr(collector, 'iter_comments', None)
+    if iter_comments is None:
+        raise HTTPException(status_code=400, detail=f"Comments not available for {platform}")
+    from .analytics.sentiment import SentimentAnalyzer
+    analyzer = SentimentAnalyzer()
+    try:
+        return await analyzer.analyze_comment_stream(iter_comments(content_id, max_comments), engine=engine)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Nouveaux endpoints pour la génération de contenu
 @app.post("/{platform}/content/brief")
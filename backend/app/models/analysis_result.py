@@ -0,0 +1,30 @@
+from datetime import datetime
+from app import db
+
+class AnalysisResult(db.Model):
+    """Résultat précalculé d'une analyse (JSON compressé, une version par exécution)."""
+    __tablename__ = 'analysis_result'
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'version', name='uq_analysis_result_kind_version'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(64), nullable=False, index=True)  # Type d'analyse ('global_trends', ...)
+    version = db.Column(db.Integer, nullable=False)  # Croissante par type d'analyse
+    etag = db.Column(db.String(64), nullable=False)  # SHA-256 du JSON, horodatage exclu
+    encoding = db.Column(db.String(16), nullable=False, default='gzip')
+    payload = db.Column(db.LargeBinary, nullable=False)  # JSON compressé
+    size = db.Column(db.Integer)  # Taille du JSON non compressé (octets)
+    summary = db.Column(db.JSON)  # Résumé affichable sans décompresser le résultat
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def handle(self):
+        """Référence légère vers le résultat, renvoyée par les tâches Celery."""
+        return {
+            'kind': self.kind,
+            'version': self.version,
+            'etag': self.etag,
+            'size': self.size,
+            'compressed_size': len(self.payload) if self.payload else 0,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
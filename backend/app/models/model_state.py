@@ -0,0 +1,20 @@
+from datetime import datetime
+from app import db
+
+class ModelState(db.Model):
+    """État persistant d'un modèle entraîné au fil des exécutions (segmentation, ...)."""
+    __tablename__ = 'model_state'
+
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)  # Incrémentée à chaque sauvegarde
+    payload = db.Column(db.LargeBinary)  # Estimateurs sérialisés
+    summary = db.Column(db.JSON)  # Paramètres lisibles (centres, échelles, dernière réestimation)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'version': self.version,
+            'summary': self.summary,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
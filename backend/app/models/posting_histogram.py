@@ -0,0 +1,32 @@
+from datetime import datetime
+from app import db
+
+class PostingHistogram(db.Model):
+    """
+    Carte jour × heure (UTC) des publications d'une chaîne, maintenue au fil
+    des collectes (cf. services.posting_histograms).
+    """
+    __tablename__ = 'posting_histogram'
+
+    platform = db.Column(db.String(32), primary_key=True)
+    channel_id = db.Column(db.String(128), primary_key=True)  # '' : toute la plateforme
+    views_sums = db.Column(db.JSON)  # 7 × 24, pondérées par l'âge des publications
+    views_counts = db.Column(db.JSON)
+    engagement_sums = db.Column(db.JSON)
+    engagement_counts = db.Column(db.JSON)
+    videos = db.Column(db.Integer, nullable=False, default=0)  # Publications ajoutées (sans pondération)
+    decayed_at = db.Column(db.DateTime)  # Date de référence de la pondération
+    fetched_at = db.Column(db.DateTime)  # Dernière collecte complète (chaîne) ou reconstruction (plateforme)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class PostingHistogramVideo(db.Model):
+    """
+    Publication déjà comptée dans la carte d'une chaîne : une publication
+    n'est comptée qu'une fois par plateforme.
+    """
+    __tablename__ = 'posting_histogram_video'
+
+    platform = db.Column(db.String(32), primary_key=True)
+    video_id = db.Column(db.String(256), primary_key=True)  # À défaut d'identifiant : chaîne@date
+    channel_id = db.Column(db.String(128), nullable=False)
+    published_at = db.Column(db.DateTime, index=True)  # Oubliée après POSTING_HISTOGRAM_ID_RETENTION_DAYS
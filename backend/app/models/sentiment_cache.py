@@ -0,0 +1,12 @@
+from datetime import datetime
+from app import db
+
+class SentimentCache(db.Model):
+    """Score de sentiment déjà calculé pour un texte normalisé et une version de modèle."""
+    __tablename__ = 'sentiment_cache'
+
+    model_version = db.Column(db.String(64), primary_key=True)
+    text_hash = db.Column(db.String(64), primary_key=True)  # SHA-256 du texte normalisé
+    text = db.Column(db.Text)
+    score = db.Column(db.Float, nullable=False)  # Score de sentiment (-1 à 1)
+    scored_at = db.Column(db.DateTime, default=datetime.utcnow)
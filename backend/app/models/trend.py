@@ -2,15 +2,27 @@ from datetime import datetime
 from app import db
 
 class Trend(db.Model):
+    __table_args__ = (
+        # Une ligne par plateforme, mot-clé et tranche horaire (cf. services.trend_store)
+        db.UniqueConstraint('platform', 'keyword', 'time_bucket', name='uq_trend_platform_keyword_bucket'),
+        # Percentiles et top N par plateforme (cf. services.trend_queries)
+        db.Index('ix_trend_platform_engagement', 'platform', 'engagement'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     platform = db.Column(db.String(32), nullable=False)
     keyword = db.Column(db.String(128), nullable=False)
+    content_id = db.Column(db.String(128))  # Identifiant du contenu représentatif sur la plateforme
     category = db.Column(db.String(64))
+    segment = db.Column(db.String(32), index=True)  # Segment de comportement (cf. analytics.segmentation)
     volume = db.Column(db.Integer)  # Nombre de posts/vidéos
     engagement = db.Column(db.Integer)  # Likes + commentaires + partages
     growth_rate = db.Column(db.Float)  # Taux de croissance en %
     sentiment_score = db.Column(db.Float)  # Score de sentiment (-1 à 1)
-    detected_at = db.Column(db.DateTime, default=datetime.utcnow)
+    virality_score = db.Column(db.Float)  # Potentiel viral estimé à l'ingestion (0 à 1)
+    detected_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    time_bucket = db.Column(db.DateTime, index=True)  # Début de la tranche horaire d'observation
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)  # Dernière observation
     
     # Métadonnées supplémentaires
     hashtags = db.Column(db.JSON)  # Liste des hashtags associés
@@ -23,10 +35,12 @@ class Trend(db.Model):
             'platform': self.platform,
             'keyword': self.keyword,
             'category': self.category,
+            'segment': self.segment,
             'volume': self.volume,
             'engagement': self.engagement,
             'growth_rate': self.growth_rate,
             'sentiment_score': self.sentiment_score,
+            'virality_score': self.virality_score,
             'hashtags': self.hashtags,
             'related_keywords': self.related_keywords,
             'peak_hours': self.peak_hours,
@@ -0,0 +1,149 @@
+from typing import Any, Dict, Optional, Tuple
+import gzip
+import hashlib
+import json
+import logging
+import math
+import os
+from datetime import date, datetime
+
+logger = logging.getLogger(__name__)
+
+# Nombre de versions conservées par type d'analyse
+DEFAULT_KEEP = int(os.environ.get('ANALYSIS_RESULTS_KEEP', 30))
+# Clés de premier niveau propres à une exécution, exclues de l'ETag
+VOLATILE_KEYS = ('timestamp',)
+
+def to_jsonable(value: Any) -> Any:
+    """
+    Convertit un résultat d'analyse en structure JSON stricte : scalaires
+    numpy en types natifs, NaN et infinis en null, dates en ISO 8601.
+    """
+    if isinstance(value, dict):
+        return {
+            (k if isinstance(k, str) else str(to_jsonable(k))): to_jsonable(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if hasattr(value, 'item') and callable(value.item) and not isinstance(value, (str, bytes)):
+        try:
+            value = value.item()  # Scalaire numpy
+        except (TypeError, ValueError):
+            return str(value)
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def _canonical_json(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+def encode_result(results: Any) -> Tuple[bytes, str, int]:
+    """
+    Sérialise et compresse un résultat.
+
+    L'ETag ne tient pas compte des clés de `VOLATILE_KEYS` (l'horodatage
+    de l'exécution) : deux exécutions au contenu identique ont le même ETag.
+
+    Returns:
+        (JSON compressé en gzip, ETag = SHA-256 du JSON, taille du JSON)
+    """
+    results = to_jsonable(results)
+    raw = _canonical_json(results)
+    if isinstance(results, dict) and any(key in results for key in VOLATILE_KEYS):
+        stable = _canonical_json({k: v for k, v in results.items() if k not in VOLATILE_KEYS})
+    else:
+        stable = raw
+    return gzip.compress(raw, compresslevel=6), hashlib.sha256(stable).hexdigest(), len(raw)
+
+def decode_result(payload: bytes, encoding: str = 'gzip') -> bytes:
+    """Retourne le JSON (octets) d'un résultat stocké."""
+    if encoding == 'gzip':
+        return gzip.decompress(payload)
+    if encoding == 'identity':
+        return payload
+    raise ValueError(f"Encodage non supporté: {encoding}")
+
+def load_result(result) -> Any:
+    """Désérialise un `AnalysisResult`."""
+    return json.loads(decode_result(result.payload, result.encoding))
+
+def latest_result(kind: str, session=None):
+    """Dernière version d'une analyse (None si aucune)."""
+    from app import db
+    from app.models.analysis_result import AnalysisResult
+
+    session = session or db.session
+    return session.query(AnalysisResult).filter_by(kind=kind).order_by(
+        AnalysisResult.version.desc()
+    ).first()
+
+def get_result(kind: str, version: int, session=None):
+    """Version donnée d'une analyse (None si elle n'existe pas ou plus)."""
+    from app import db
+    from app.models.analysis_result import AnalysisResult
+
+    session = session or db.session
+    return session.query(AnalysisResult).filter_by(kind=kind, version=version).first()
+
+def save_result(
+    kind: str,
+    results: Any,
+    summary: Optional[Dict[str, Any]] = None,
+    session=None,
+    keep: int = DEFAULT_KEEP,
+):
+    """
+    Enregistre le résultat d'une exécution sous une nouvelle version, puis
+    valide la transaction.
+
+    Un résultat identique à la dernière version n'en crée pas de nouvelle.
+    Seules les `keep` dernières versions sont conservées.
+
+    Returns:
+        L'`AnalysisResult` enregistré (voir `handle()` pour la référence à
+        renvoyer par une tâche Celery)
+    """
+    from app import db
+    from app.models.analysis_result import AnalysisResult
+
+    session = session or db.session
+    payload, etag, size = encode_result(results)
+    try:
+        latest = latest_result(kind, session)
+        if latest is not None and latest.etag == etag:
+            logger.info(f"Analyse {kind} inchangée (version {latest.version})")
+            return latest
+
+        result = AnalysisResult(
+            kind=kind,
+            version=(latest.version + 1) if latest is not None else 1,
+            etag=etag,
+            encoding='gzip',
+            payload=payload,
+            size=size,
+            summary=to_jsonable(summary) if summary is not None else None,
+            created_at=datetime.utcnow(),
+        )
+        session.add(result)
+        session.flush()
+
+        if keep:
+            session.query(AnalysisResult).filter(
+                AnalysisResult.kind == kind,
+                AnalysisResult.version <= result.version - keep,
+            ).delete(synchronize_session=False)
+
+        session.commit()
+        logger.info(
+            f"Analyse {kind} enregistrée (version {result.version}, "
+            f"{size} octets, {len(payload)} compressés)"
+        )
+        return result
+
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Erreur lors de l'enregistrement de l'analyse {kind}: {str(e)}")
+        raise
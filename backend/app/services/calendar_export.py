@@ -0,0 +1,144 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+import gzip
+import json
+import logging
+import os
+import re
+import time
+from sqlalchemy import Table, select
+from ..analytics.calendar_engine import PLATFORMS
+
+logger = logging.getLogger(__name__)
+
+# Publications par jour d'un créateur sans fréquence lisible
+DEFAULT_FREQUENCY = float(os.environ.get('CALENDAR_DEFAULT_FREQUENCY', 1))
+# Poids d'une idée dont le potentiel viral n'est pas estimé, et poids minimal
+DEFAULT_IDEA_WEIGHT = 0.5
+MIN_IDEA_WEIGHT = 0.01
+
+# Jours par période, pour les fréquences saisies par les créateurs
+PERIOD_DAYS = {
+    'day': 1, 'daily': 1, 'jour': 1, 'quotidien': 1, 'quotidienne': 1, 'j': 1, 'd': 1,
+    'week': 7, 'weekly': 7, 'semaine': 7, 'hebdo': 7, 'hebdomadaire': 7, 'sem': 7, 'w': 7,
+    'month': 30, 'monthly': 30, 'mois': 30, 'mensuel': 30, 'mensuelle': 30, 'm': 30,
+}
+# « 3 », « 2.5 », « daily », « 3/week », « 3 per week », « 2 fois par semaine »...
+FREQUENCY_PATTERN = re.compile(
+    r'^(?:(?P<count>\d+(?:[.,]\d+)?)\s*(?:x|fois|times|posts?|publications?)?\s*'
+    r'(?:/|per|par|a|an|une?|each|every|chaque)?\s*)?(?P<period>[a-zé]+)?$'
+)
+
+def _frequency(value: Any) -> float:
+    """
+    Publications par jour d'une fréquence saisie en texte libre : un nombre
+    (par jour), une période (« daily », « weekly »...) ou un nombre par
+    période (« 3/week », « 2 fois par semaine »). DEFAULT_FREQUENCY si la
+    valeur est absente ou illisible.
+    """
+    text = str(value or '').strip().lower()
+    match = FREQUENCY_PATTERN.match(text)
+    period = match['period'] if match else None
+    if not match or not (match['count'] or period) or (period is not None and period not in PERIOD_DAYS):
+        if text:
+            logger.debug(f"Fréquence de publication illisible: {value!r}")
+        return DEFAULT_FREQUENCY
+    count = float(match['count'].replace(',', '.')) if match['count'] else 1.0
+    return count / PERIOD_DAYS.get(period, 1)
+
+def iter_creators(
+    session,
+    heatmap_for: Optional[Callable[[str], Any]] = None,
+    chunk_size: int = 1000,
+    user_table: Optional[Table] = None,
+    idea_table: Optional[Table] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Créateurs actifs, pour CalendarEngine.iter_calendars, lus par tranches
+    d'identifiants.
+
+    Les sujets d'un créateur sont ses idées de contenu non utilisées,
+    pondérées par leur potentiel viral ; à défaut, sa niche.
+
+    Args:
+        session: Session SQLAlchemy
+        heatmap_for: Carte d'heures d'une plateforme (la première plateforme
+                     préférée du créateur), None pour les horaires par défaut
+        chunk_size: Nombre de créateurs par tranche
+        user_table: Table des utilisateurs (`user` par défaut)
+        idea_table: Table des idées (`content_idea` par défaut)
+    """
+    if user_table is None or idea_table is None:
+        from app.models.user import User
+        from app.models.trend import ContentIdea
+        user_table = user_table if user_table is not None else User.__table__
+        idea_table = idea_table if idea_table is not None else ContentIdea.__table__
+
+    last_id = None
+    while True:
+        query = select(
+            user_table.c.id, user_table.c.content_niche,
+            user_table.c.preferred_platforms, user_table.c.posting_frequency,
+        ).where(user_table.c.is_active.is_(True)).order_by(user_table.c.id).limit(chunk_size)
+        if last_id is not None:
+            query = query.where(user_table.c.id > last_id)
+        users = session.execute(query).all()
+        if not users:
+            return
+        last_id = users[-1].id
+
+        topics: Dict[int, Dict[str, float]] = {}
+        ideas = session.execute(
+            select(idea_table.c.user_id, idea_table.c.title, idea_table.c.estimated_virality).where(
+                idea_table.c.user_id.in_([user.id for user in users]),
+                idea_table.c.is_used.isnot(True),
+            )
+        )
+        for user_id, title, virality in ideas:
+            weights = topics.setdefault(user_id, {})
+            weight = DEFAULT_IDEA_WEIGHT if virality is None else max(virality, MIN_IDEA_WEIGHT)
+            weights[title] = weights.get(title, 0.0) + weight
+
+        for user in users:
+            user_topics = topics.get(user.id) or ({user.content_niche: 1.0} if user.content_niche else None)
+            if not user_topics:
+                logger.debug(f"Créateur {user.id} sans idée ni niche, ignoré")
+                continue
+            platforms = [p for p in (user.preferred_platforms or []) if p in PLATFORMS] or list(PLATFORMS)
+            yield {
+                'user_id': user.id,
+                'topics': user_topics,
+                'platforms': platforms,
+                'frequency': _frequency(user.posting_frequency),
+                'heatmap': heatmap_for(platforms[0]) if heatmap_for else None,
+            }
+
+def write_calendars(calendars: Iterable[Dict[str, Any]], path: str) -> Dict[str, Any]:
+    """
+    Écrit des calendriers en NDJSON compressé (un créateur par ligne), au fil
+    de l'eau ; le fichier n'apparaît qu'une fois complet.
+
+    Returns:
+        Statistiques {'path', 'creators', 'entries', 'bytes', 'elapsed'}
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    start = time.perf_counter()
+    creators = entries = 0
+    try:
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+            for calendar in calendars:
+                f.write(json.dumps(calendar, ensure_ascii=False, separators=(',', ':')) + '\n')
+                creators += 1
+                entries += len(calendar['entries'])
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return {
+        'path': path,
+        'creators': creators,
+        'entries': entries,
+        'bytes': os.path.getsize(path),
+        'elapsed': time.perf_counter() - start,
+    }
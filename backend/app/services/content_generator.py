@@ -2,6 +2,7 @@ from typing import Dict, List
 import openai
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
+from app.analytics.virality import TREND_VIRALITY
 from app.models.trend import ContentIdea
 from app import db
 
@@ -148,21 +149,7 @@ class ContentGenerator:
     
     def _estimate_virality(self, trend: Dict) -> float:
         """Estime le potentiel viral d'une idée."""
-        engagement_weight = 0.4
-        sentiment_weight = 0.3
-        growth_weight = 0.3
-        
-        normalized_engagement = min(trend['engagement'] / 10000, 1)
-        normalized_sentiment = (trend['sentiment_score'] + 1) / 2
-        normalized_growth = min(trend['growth_rate'] / 100, 1)
-        
-        virality_score = (
-            engagement_weight * normalized_engagement +
-            sentiment_weight * normalized_sentiment +
-            growth_weight * normalized_growth
-        )
-        
-        return round(virality_score, 2)
+        return round(TREND_VIRALITY.score(trend), 2)
     
     def _generate_tags(self, title: str, description: str, trend: Dict) -> List[str]:
         """Génère des tags optimisés pour le référencement."""
@@ -0,0 +1,223 @@
+from typing import Any, AsyncIterable, Dict, Iterable, Iterator, List, Optional
+import asyncio
+import logging
+import re
+import time
+from sqlalchemy import Table
+from .trend_store import bulk_upsert, trend_row
+from ..analytics.segmentation import assign_segments, load_segmenter
+from ..analytics.virality import TREND_VIRALITY
+
+logger = logging.getLogger(__name__)
+
+STOP_WORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'le', 'la', 'les', 'un', 'une', 'des', 'et', 'ou', 'de', 'du', 'en', 'au', 'aux', 'pour',
+}
+_WORD = re.compile(r'\w+')
+
+def extract_keywords(text: str) -> List[str]:
+    """Extrait les mots-clés d'un texte (mots alphanumériques hors mots vides)."""
+    return [
+        word for word in _WORD.findall(text.lower())
+        if word not in STOP_WORDS and len(word) > 2
+    ]
+
+def estimate_virality(row: Dict[str, Any]) -> float:
+    """Estime le potentiel viral d'une tendance (0 à 1), comme ContentGenerator."""
+    return TREND_VIRALITY.score(row)
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Regroupe un itérable en lots de `size` éléments au plus."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class IngestPipeline:
+    """
+    Pipeline d'ingestion des tendances collectées : normalisation,
+    enrichissement (sentiment, mots-clés, potentiel viral, segment) et
+    enregistrement.
+
+    Les étapes s'enchaînent en flux, par lots de `batch_size` : un lot n'est
+    tiré de la source que lorsque le précédent est enregistré, si bien que
+    la mémoire reste bornée quel que soit le volume collecté. Chaque tendance
+    est normalisée, enrichie puis écrite une seule fois ; chaque lot est
+    validé dans sa propre transaction.
+    """
+
+    def __init__(
+        self,
+        session=None,
+        table: Optional[Table] = None,
+        scorer=None,
+        segmenter=None,
+        batch_size: int = 500,
+    ):
+        """
+        Args:
+            session: Session SQLAlchemy (db.session par défaut)
+            table: Table cible (`trend` par défaut)
+            scorer: Service de sentiment (services.sentiment_scoring, partagé par défaut)
+            segmenter: Modèle de segmentation (modèle persistant par défaut)
+            batch_size: Nombre de tendances par lot
+        """
+        if session is None or table is None:
+            from app import db
+            from app.models.trend import Trend
+            session = session or db.session
+            table = table if table is not None else Trend.__table__
+        if scorer is None:
+            from .sentiment_scoring import shared_scorer
+            scorer = shared_scorer()
+        if segmenter is None:
+            segmenter = load_segmenter(session)
+
+        self.session = session
+        self.table = table
+        self.scorer = scorer
+        self.segmenter = segmenter
+        self.batch_size = batch_size
+        self.stats = {
+            'received': 0, 'rejected': 0, 'scored': 0,
+            'inserted': 0, 'updated': 0, 'batches': 0,
+        }
+
+    def normalize(self, trend_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Convertit une tendance brute en ligne `trend` ; None si elle est invalide."""
+        self.stats['received'] += 1
+        try:
+            keyword = ' '.join(str(trend_data['keyword'] or '').split())
+            platform = str(trend_data['platform']).strip().lower()
+            if not keyword or not platform:
+                raise ValueError("plateforme ou mot-clé vide")
+            return trend_row({**trend_data, 'keyword': keyword[:128], 'platform': platform})
+
+        except Exception as e:
+            self.stats['rejected'] += 1
+            logger.error(f"Tendance rejetée à la normalisation: {str(e)}")
+            return None
+
+    def enrich(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Complète un lot : sentiment, mots-clés connexes, potentiel viral, segment."""
+        unscored = [row for row in rows if row['sentiment_score'] is None]
+        if unscored:
+            try:
+                from .sentiment_scoring import normalize_text
+                scores = self.scorer.score_texts(
+                    (row['keyword'] for row in unscored), self.session
+                )
+                for row in unscored:
+                    row['sentiment_score'] = scores[normalize_text(row['keyword'])]
+                self.stats['scored'] += len(unscored)
+
+            except Exception as e:
+                # Le score reste NULL : analyze_sentiment le calculera plus tard
+                logger.error(f"Erreur lors du scoring du sentiment: {str(e)}")
+
+        # Potentiel viral de tout le lot en une passe vectorisée
+        virality = TREND_VIRALITY.score_records(rows).tolist()
+        for row, score in zip(rows, virality):
+            if not row['related_keywords']:
+                row['related_keywords'] = [
+                    word for word in extract_keywords(row['keyword'])
+                    if word != row['keyword'].lower()
+                ]
+            row['virality_score'] = score
+        if self.segmenter is not None:
+            assign_segments(rows, self.segmenter)
+
+        return rows
+
+    def persist(self, rows: List[Dict[str, Any]]) -> None:
+        """Enregistre un lot et valide sa transaction."""
+        try:
+            result = bulk_upsert(self.session, self.table, rows)
+            self.session.commit()
+
+        except Exception:
+            self.session.rollback()
+            raise
+
+        self.stats['inserted'] += result['inserted']
+        self.stats['updated'] += result['updated']
+        self.stats['batches'] += 1
+
+    def process(self, batch: List[Dict[str, Any]]) -> None:
+        """Normalise, enrichit et enregistre un lot de tendances brutes."""
+        rows = [row for row in map(self.normalize, batch) if row is not None]
+        if rows:
+            self.persist(self.enrich(rows))
+
+    def _result(self, start: float) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Ingestion terminée: {self.stats['inserted']} insérées, "
+            f"{self.stats['updated']} mises à jour, {self.stats['rejected']} rejetées"
+        )
+        return {
+            **self.stats,
+            'elapsed': elapsed,
+            'rows_per_second': self.stats['received'] / elapsed if elapsed else 0.0,
+        }
+
+    def run(self, trends: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Ingère un flux de tendances brutes (itérable synchrone, consommé
+        au rythme de l'enregistrement).
+
+        Returns:
+            Statistiques de l'ingestion
+        """
+        start = time.perf_counter()
+        for batch in batched(trends, self.batch_size):
+            self.process(batch)
+        return self._result(start)
+
+    async def run_async(self, trends: AsyncIterable[Dict[str, Any]], max_pending: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Ingère un flux asynchrone de tendances.
+
+        La source alimente une file bornée (`max_pending`, deux lots par
+        défaut) : lorsque l'enregistrement prend du retard, la collecte est
+        suspendue jusqu'à ce que la file se vide. Chaque lot est traité dans
+        un thread (`asyncio.to_thread`, qui propage le contexte de
+        l'application) : la boucle continue de collecter pendant les
+        écritures. Les lots restent traités l'un après l'autre, la session
+        n'est jamais utilisée par deux threads à la fois.
+        """
+        start = time.perf_counter()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending or 2 * self.batch_size)
+        done = object()
+
+        async def produce():
+            try:
+                async for trend in trends:
+                    await queue.put(trend)
+            finally:
+                await queue.put(done)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            batch = []
+            while True:
+                trend = await queue.get()
+                if trend is done:
+                    break
+                batch.append(trend)
+                if len(batch) >= self.batch_size:
+                    await asyncio.to_thread(self.process, batch)
+                    batch = []
+            if batch:
+                await asyncio.to_thread(self.process, batch)
+            await producer  # Fait remonter une éventuelle erreur de la source
+
+        finally:
+            producer.cancel()
+
+        return self._result(start)
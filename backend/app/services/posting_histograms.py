@@ -0,0 +1,385 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import Table, and_, delete, select, update
+from .trend_store import bulk_upsert
+from ..analytics.heatmap import EngagementHeatmap
+
+logger = logging.getLogger(__name__)
+
+# Demi-vie du poids d'une publication (POSTING_HISTOGRAM_HALF_LIFE_DAYS)
+HALF_LIFE_DAYS = float(os.environ.get('POSTING_HISTOGRAM_HALF_LIFE_DAYS', 30))
+# Au-delà de cet âge, une carte n'est plus servie sans nouvelle collecte
+MAX_AGE_HOURS = float(os.environ.get('POSTING_HISTOGRAM_MAX_AGE_HOURS', 6))
+# Identifiants de publications conservés pour la déduplication, en jours
+# (POSTING_HISTOGRAM_ID_RETENTION_DAYS) : au-delà, le poids d'une
+# publication comptée à nouveau est négligeable
+ID_RETENTION_DAYS = float(os.environ.get('POSTING_HISTOGRAM_ID_RETENTION_DAYS', 365))
+# Identifiant de chaîne de la carte de toute la plateforme
+PLATFORM_WIDE = ''
+METRICS = ('views', 'engagement')
+# Colonnes lues et écrites : jamais plus d'une ligne de taille fixe par carte
+MAP_COLUMNS = (
+    'views_sums', 'views_counts', 'engagement_sums', 'engagement_counts',
+    'videos', 'decayed_at', 'fetched_at',
+)
+UPDATE_COLUMNS = (*MAP_COLUMNS, 'updated_at')
+
+def _utc(moment: Optional[datetime] = None) -> datetime:
+    """Date UTC naïve (convention des colonnes DateTime)."""
+    moment = moment or datetime.now(timezone.utc)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+class PostingHistogramStore:
+    """
+    Cartes jour × heure des publications, par chaîne et par plateforme,
+    maintenues en base au fil des collectes.
+
+    Chaque collecte n'ajoute à la carte d'une chaîne que les publications
+    pas encore comptées sur la plateforme : leurs identifiants sont
+    réservés dans une table dédiée (clé unique plateforme × publication),
+    interrogée pour les seuls identifiants reçus. La carte n'est jamais
+    recalculée. Le poids d'une publication décroît avec son âge (demi-vie
+    `half_life_days`) ; la carte enregistrée est vieillie d'un seul facteur
+    à chaque mise à jour, ce qui revient au même sans relire les
+    publications. Les cartes sont stockées en UTC et converties dans le
+    fuseau demandé à la lecture : répondre à « quand publier ? » ne coûte
+    plus que la lecture d'une ligne de taille fixe.
+
+    Seule la ligne de la chaîne est verrouillée (SELECT ... FOR UPDATE)
+    pendant la mise à jour : les collectes de chaînes différentes ne
+    s'attendent pas. La carte de la plateforme est la somme des cartes de
+    ses chaînes, reconstruite périodiquement par `rebuild_platform` ; une
+    publication n'étant comptée que pour une chaîne, elle n'y figure qu'une
+    fois.
+
+    Une carte de chaîne n'est servie par `lookup` qu'après une collecte
+    complète de la chaîne (`record(..., full_fetch=True)`) : les vidéos
+    croisées au fil d'autres collectes l'enrichissent sans la rendre
+    fraîche. La carte de la plateforme est fraîche après sa reconstruction.
+
+    Les méthodes sont bloquantes (requêtes SQL) : depuis du code asynchrone,
+    les appeler dans un thread (`asyncio.to_thread`).
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        table: Optional[Table] = None,
+        video_table: Optional[Table] = None,
+        half_life_days: float = HALF_LIFE_DAYS,
+        max_age_hours: float = MAX_AGE_HOURS,
+        id_retention_days: float = ID_RETENTION_DAYS,
+    ):
+        """
+        Args:
+            session_factory: Fabrique de sessions SQLAlchemy (ex. `sessionmaker`)
+            table: Table des cartes (`posting_histogram` par défaut)
+            video_table: Table des publications comptées (`posting_histogram_video` par défaut)
+            half_life_days: Demi-vie du poids d'une publication, en jours
+            max_age_hours: Âge maximal d'une carte servie par `lookup`
+            id_retention_days: Âge au-delà duquel `rebuild_platform` oublie
+                               les identifiants de publications
+        """
+        if table is None or video_table is None:
+            from app.models.posting_histogram import PostingHistogram, PostingHistogramVideo
+            table = table if table is not None else PostingHistogram.__table__
+            video_table = video_table if video_table is not None else PostingHistogramVideo.__table__
+        self.session_factory = session_factory
+        self.table = table
+        self.video_table = video_table
+        self.half_life_days = half_life_days
+        self.max_age_hours = max_age_hours
+        self.id_retention_days = id_retention_days
+
+    def _decay_factor(self, since: Optional[datetime], now: datetime) -> float:
+        if since is None or now <= since:
+            return 1.0
+        return 0.5 ** ((now - since) / timedelta(days=self.half_life_days))
+
+    def _select(self):
+        return select(self.table.c.channel_id, *(self.table.c[column] for column in MAP_COLUMNS))
+
+    def _load(self, session, platform: str, channel_id: str, lock: bool = False) -> Optional[Dict[str, Any]]:
+        query = self._select().where(
+            self.table.c.platform == platform,
+            self.table.c.channel_id == channel_id,
+        )
+        if lock:
+            query = query.with_for_update()
+        row = session.execute(query).mappings().first()
+        return dict(row) if row is not None else None
+
+    @staticmethod
+    def _video_key(channel_id: str, video: Dict[str, Any]) -> Optional[str]:
+        """Identifiant d'une publication (à défaut, sa chaîne et sa date de publication)."""
+        if video.get('id'):
+            return str(video['id'])
+        if video.get('published_at'):
+            return f"{channel_id}@{video['published_at']}"
+        return None
+
+    def _claim(self, session, rows: List[Dict[str, Any]]) -> Set[str]:
+        """
+        Réserve des publications pour une chaîne ; retourne les identifiants
+        qui n'étaient pas encore comptés sur la plateforme.
+        """
+        if not rows:
+            return set()
+        table = self.video_table
+        dialect = session.get_bind().dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            if dialect == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            result = session.execute(
+                insert(table)
+                .on_conflict_do_nothing(index_elements=['platform', 'video_id'])
+                .returning(table.c.video_id),
+                rows,
+            )
+            return {video_id for video_id, in result}
+
+        existing = set(session.execute(
+            select(table.c.video_id).where(
+                table.c.platform == rows[0]['platform'],
+                table.c.video_id.in_([row['video_id'] for row in rows]),
+            )
+        ).scalars())
+        new_rows = [row for row in rows if row['video_id'] not in existing]
+        if new_rows:
+            session.execute(table.insert(), new_rows)
+        return {row['video_id'] for row in new_rows}
+
+    @staticmethod
+    def _heatmaps(row: Optional[Dict[str, Any]]) -> Dict[str, EngagementHeatmap]:
+        if row is None or row.get('views_sums') is None:
+            return {metric: EngagementHeatmap() for metric in METRICS}
+        return {
+            metric: EngagementHeatmap.from_arrays(row[f'{metric}_sums'], row[f'{metric}_counts'])
+            for metric in METRICS
+        }
+
+    def record(
+        self,
+        platform: str,
+        channel_id: str,
+        videos: Iterable[Dict[str, Any]],
+        now: Optional[datetime] = None,
+        full_fetch: bool = False,
+    ) -> int:
+        """
+        Ajoute les nouvelles publications d'une chaîne à ses cartes.
+
+        Args:
+            platform: Plateforme
+            channel_id: Chaîne
+            videos: Publications {'id', 'published_at', 'views', 'engagement'} ;
+                    une valeur absente n'est pas comptée dans la carte
+                    correspondante, une publication sans 'id' est identifiée
+                    par sa date
+            now: Date de référence de la pondération (maintenant par défaut)
+            full_fetch: `videos` sont les dernières publications de la chaîne,
+                        lues pour elle : sa carte devient fraîche
+
+        Returns:
+            Nombre de publications ajoutées
+
+        Raises:
+            ValueError: Si `channel_id` désigne la carte de la plateforme
+        """
+        import pandas as pd  # Importé à la première utilisation
+
+        if channel_id == PLATFORM_WIDE:
+            raise ValueError("La carte de la plateforme est reconstruite par rebuild_platform")
+        videos = list(videos)
+        if not videos and not full_fetch:
+            return 0
+        now = _utc(now)
+        published = pd.to_datetime(
+            pd.Series([video.get('published_at') for video in videos], dtype=object),
+            utc=True, errors='coerce', format='ISO8601',
+        )
+
+        # Publications datées, une fois chacune
+        candidates: Dict[str, int] = {}
+        for index, (video, dated) in enumerate(zip(videos, published.notna())):
+            key = self._video_key(channel_id, video)
+            if dated and key is not None:
+                candidates.setdefault(key, index)
+
+        try:
+            with self.session_factory() as session:
+                # La ligne de la chaîne existe avant d'être verrouillée
+                bulk_upsert(
+                    session, self.table,
+                    [{'platform': platform, 'channel_id': channel_id, 'videos': 0, 'updated_at': now}],
+                    key_columns=('platform', 'channel_id'), update_columns=(),
+                )
+                row = self._load(session, platform, channel_id, lock=True)
+
+                new_ids = self._claim(session, [
+                    {
+                        'platform': platform,
+                        'video_id': key,
+                        'channel_id': channel_id,
+                        'published_at': _utc(published[index].to_pydatetime()),
+                    }
+                    for key, index in candidates.items()
+                ])
+                selected = [index for key, index in candidates.items() if key in new_ids]
+                if not selected:
+                    if full_fetch:
+                        # Rien de nouveau, mais la carte reflète la chaîne
+                        session.execute(update(self.table).where(
+                            self.table.c.platform == platform,
+                            self.table.c.channel_id == channel_id,
+                        ).values(fetched_at=now))
+                    session.commit()
+                    return 0
+
+                timestamps = published[selected].tolist()
+                factor = self._decay_factor(row.get('decayed_at'), now)
+                heatmaps = self._heatmaps(row)
+                values = {}
+                for metric in METRICS:
+                    delta = EngagementHeatmap()
+                    delta.add(
+                        timestamps, [videos[index].get(metric) for index in selected],
+                        half_life_days=self.half_life_days, now=now,
+                    )
+                    sums, counts = heatmaps[metric].decay(factor).merge(delta).to_arrays()
+                    values[f'{metric}_sums'] = sums
+                    values[f'{metric}_counts'] = counts
+
+                session.execute(update(self.table).where(
+                    self.table.c.platform == platform,
+                    self.table.c.channel_id == channel_id,
+                ).values(
+                    **values,
+                    videos=(row.get('videos') or 0) + len(selected),
+                    decayed_at=now,
+                    fetched_at=now if full_fetch else row.get('fetched_at'),
+                    updated_at=now,
+                ))
+                session.commit()
+        except Exception as e:
+            logger.error(f"Erreur lors de la mise à jour des cartes de publication: {e}")
+            raise
+
+        logger.debug(f"{len(selected)} publications ajoutées aux cartes {platform}/{channel_id}")
+        return len(selected)
+
+    def platforms(self) -> List[str]:
+        """Plateformes ayant au moins une carte de chaîne."""
+        with self.session_factory() as session:
+            return list(session.execute(
+                select(self.table.c.platform).distinct().order_by(self.table.c.platform)
+            ).scalars())
+
+    def rebuild_platform(self, platform: str, now: Optional[datetime] = None) -> int:
+        """
+        Reconstruit la carte de la plateforme en sommant celles de ses
+        chaînes, vieillies à `now`, puis oublie les identifiants de
+        publications plus anciens que `id_retention_days`.
+
+        Returns:
+            Nombre de cartes de chaînes sommées
+        """
+        now = _utc(now)
+        try:
+            with self.session_factory() as session:
+                totals = {metric: EngagementHeatmap() for metric in METRICS}
+                channels = videos = 0
+                rows = session.execute(self._select().where(
+                    self.table.c.platform == platform,
+                    self.table.c.channel_id != PLATFORM_WIDE,
+                    self.table.c.views_sums.isnot(None),
+                ).execution_options(yield_per=1000)).mappings()
+                for row in rows:
+                    factor = self._decay_factor(row['decayed_at'], now)
+                    for metric, heatmap in self._heatmaps(row).items():
+                        totals[metric] = totals[metric].merge(heatmap.decay(factor))
+                    channels += 1
+                    videos += row['videos'] or 0
+
+                values = {}
+                for metric in METRICS:
+                    values[f'{metric}_sums'], values[f'{metric}_counts'] = totals[metric].to_arrays()
+                bulk_upsert(session, self.table, [{
+                    'platform': platform,
+                    'channel_id': PLATFORM_WIDE,
+                    **values,
+                    'videos': videos,
+                    'decayed_at': now,
+                    'fetched_at': now,
+                    'updated_at': now,
+                }], key_columns=('platform', 'channel_id'), update_columns=UPDATE_COLUMNS)
+
+                session.execute(delete(self.video_table).where(and_(
+                    self.video_table.c.platform == platform,
+                    self.video_table.c.published_at < now - timedelta(days=self.id_retention_days),
+                )))
+                session.commit()
+        except Exception as e:
+            logger.error(f"Erreur lors de la reconstruction de la carte {platform}: {e}")
+            raise
+
+        logger.debug(f"Carte {platform} reconstruite à partir de {channels} chaînes")
+        return channels
+
+    def lookup(
+        self,
+        platform: str,
+        channel_id: str = PLATFORM_WIDE,
+        tz: str = 'UTC',
+        now: Optional[datetime] = None,
+        max_age_hours: Optional[float] = None,
+    ) -> Optional[Dict[str, EngagementHeatmap]]:
+        """
+        Cartes d'une chaîne (ou de la plateforme), dans le fuseau `tz`.
+
+        Returns:
+            {'views': carte, 'engagement': carte}, ou None si la chaîne n'a
+            pas de carte ou si sa dernière collecte complète (pour la
+            plateforme : sa dernière reconstruction) date de plus de
+            `max_age_hours` (`self.max_age_hours` par défaut)
+        """
+        now = _utc(now)
+        max_age = self.max_age_hours if max_age_hours is None else max_age_hours
+        with self.session_factory() as session:
+            row = self._load(session, platform, channel_id)
+        if row is None or row.get('views_sums') is None:
+            return None
+        if row['fetched_at'] is None or (now - row['fetched_at']) / timedelta(hours=1) > max_age:
+            return None
+
+        factor = self._decay_factor(row.get('decayed_at'), now)
+        at = now.replace(tzinfo=timezone.utc)
+        return {
+            metric: heatmap.decay(factor).to_timezone(tz, at)
+            for metric, heatmap in self._heatmaps(row).items()
+        }
+
+_shared: Optional[PostingHistogramStore] = None
+_shared_pid: Optional[int] = None
+
+def shared_histograms() -> Optional[PostingHistogramStore]:
+    """
+    Cartes du processus, dans la base POSTING_HISTOGRAMS_DATABASE_URL (à
+    défaut DATABASE_URL). None si aucune base n'est configurée.
+    """
+    global _shared, _shared_pid
+    url = os.environ.get('POSTING_HISTOGRAMS_DATABASE_URL') or os.environ.get('DATABASE_URL')
+    if not url:
+        return None
+    if _shared is None or _shared_pid != os.getpid():
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        _shared = PostingHistogramStore(sessionmaker(create_engine(url, pool_pre_ping=True)))
+        _shared_pid = os.getpid()
+    return _shared
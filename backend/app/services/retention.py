@@ -0,0 +1,222 @@
+from typing import Any, Dict, List, Optional
+import gzip
+import json
+import logging
+import os
+import re
+import time
+from datetime import date, datetime, timezone
+from sqlalchemy import Table, column, func, select, table as table_clause, text
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMATS = ('jsonl.zst', 'jsonl.gz', 'parquet')
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable: {type(value).__name__}")
+
+class TrendArchiver:
+    """
+    Écrit les lignes expirées dans des fichiers compressés partitionnés par jour :
+    `<archive_dir>/<table>/day=AAAA-MM-JJ/part-<premier_id>-<dernier_id>.<format>`.
+    """
+
+    def __init__(self, archive_dir: str, fmt: str = 'jsonl.zst', date_column: str = 'detected_at'):
+        if fmt not in ARCHIVE_FORMATS:
+            raise ValueError(f"Format d'archive non supporté: {fmt}")
+        if fmt == 'jsonl.zst':
+            try:
+                import zstandard  # noqa: F401
+            except ImportError:
+                logger.warning("zstandard n'est pas installé, archivage en jsonl.gz")
+                fmt = 'jsonl.gz'
+        self.archive_dir = archive_dir
+        self.fmt = fmt
+        self.date_column = date_column
+        self.files_written = 0
+        self.bytes_written = 0
+
+    def write(self, table_name: str, rows: List[Dict[str, Any]]) -> List[str]:
+        """Archive un lot de lignes ; retourne les chemins des fichiers écrits."""
+        by_day: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            day = row[self.date_column].date().isoformat() if row.get(self.date_column) else 'unknown'
+            by_day.setdefault(day, []).append(row)
+
+        paths = []
+        for day, day_rows in by_day.items():
+            directory = os.path.join(self.archive_dir, table_name, f'day={day}')
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(
+                directory, f"part-{day_rows[0]['id']}-{day_rows[-1]['id']}.{self.fmt}"
+            )
+            self._write_file(path, day_rows)
+            self.files_written += 1
+            self.bytes_written += os.path.getsize(path)
+            paths.append(path)
+        return paths
+
+    def _write_file(self, path: str, rows: List[Dict[str, Any]]) -> None:
+        # Écriture dans un fichier temporaire puis renommage : pas d'archive tronquée
+        tmp_path = f'{path}.tmp'
+        if self.fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            pq.write_table(pa.Table.from_pylist(rows), tmp_path, compression='zstd')
+        else:
+            payload = ''.join(
+                json.dumps(row, default=_json_default, ensure_ascii=False) + '\n' for row in rows
+            ).encode('utf-8')
+            if self.fmt == 'jsonl.zst':
+                import zstandard
+                payload = zstandard.ZstdCompressor(level=3).compress(payload)
+            else:
+                payload = gzip.compress(payload)
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+        os.replace(tmp_path, path)
+
+def purge_expired(
+    session,
+    table: Table,
+    cutoff: datetime,
+    chunk_size: int = 10000,
+    archiver: Optional[TrendArchiver] = None,
+    date_column: str = 'detected_at',
+) -> Dict[str, Any]:
+    """
+    Supprime les lignes antérieures à `cutoff` par tranches d'identifiants.
+
+    Chaque tranche de `chunk_size` identifiants est (optionnellement) archivée,
+    supprimée puis validée dans sa propre transaction, ce qui borne la durée
+    des verrous et le volume de WAL par transaction.
+
+    Returns:
+        Statistiques {'deleted', 'archived', 'chunks', 'elapsed', 'rows_per_second'}
+    """
+    id_column = table.c.id
+    expired = table.c[date_column] < cutoff
+    start = time.perf_counter()
+    stats = {'deleted': 0, 'archived': 0, 'chunks': 0}
+
+    low, high = session.execute(select(func.min(id_column), func.max(id_column)).where(expired)).one()
+    session.commit()
+
+    if low is not None:
+        for window_start in range(low, high + 1, chunk_size):
+            window = id_column.between(window_start, window_start + chunk_size - 1)
+            try:
+                if archiver is not None:
+                    rows = [
+                        dict(row._mapping)
+                        for row in session.execute(
+                            select(table).where(window, expired).order_by(id_column)
+                        )
+                    ]
+                    if rows:
+                        archiver.write(table.name, rows)
+                        stats['archived'] += len(rows)
+
+                result = session.execute(table.delete().where(window, expired))
+                session.commit()
+
+            except Exception:
+                session.rollback()
+                raise
+
+            stats['deleted'] += result.rowcount
+            stats['chunks'] += 1
+
+    stats['elapsed'] = time.perf_counter() - start
+    stats['rows_per_second'] = stats['deleted'] / stats['elapsed'] if stats['elapsed'] else 0.0
+    return stats
+
+_RANGE_BOUND = re.compile(r"FOR VALUES FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+def expired_partitions(session, parent: str, cutoff: datetime) -> List[str]:
+    """
+    Liste les partitions (PostgreSQL, partitionnement par intervalle de dates)
+    dont la borne supérieure est antérieure ou égale à `cutoff`.
+    """
+    result = session.execute(text("""
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :parent AND parent.relkind = 'p'
+    """), {'parent': parent})
+
+    partitions = []
+    for name, bound in result:
+        match = _RANGE_BOUND.search(bound or '')
+        if not match:
+            continue  # Bornes MINVALUE/MAXVALUE ou partition par défaut
+        try:
+            upper = datetime.fromisoformat(match.group(2))
+        except ValueError:
+            continue
+        if upper.tzinfo:
+            upper = upper.astimezone(timezone.utc).replace(tzinfo=None)
+        if upper <= cutoff:
+            partitions.append(name)
+    return partitions
+
+def drop_expired_partitions(
+    session,
+    table: Table,
+    cutoff: datetime,
+    chunk_size: int = 10000,
+    archiver: Optional[TrendArchiver] = None,
+) -> Dict[str, Any]:
+    """
+    Détache puis supprime les partitions entièrement expirées (PostgreSQL),
+    après les avoir archivées si un archiveur est fourni.
+
+    Returns:
+        Statistiques {'partitions', 'deleted', 'archived', 'elapsed', 'rows_per_second'}
+    """
+    start = time.perf_counter()
+    stats = {'partitions': [], 'deleted': 0, 'archived': 0}
+
+    for name in expired_partitions(session, table.name, cutoff):
+        partition = table_clause(name, *[column(c.name) for c in table.columns])
+        count = session.execute(select(func.count()).select_from(partition)).scalar()
+
+        if archiver is not None:
+            last_id = None
+            while True:
+                query = select(partition).order_by(partition.c.id).limit(chunk_size)
+                if last_id is not None:
+                    query = query.where(partition.c.id > last_id)
+                rows = [dict(row._mapping) for row in session.execute(query)]
+                if not rows:
+                    break
+                archiver.write(table.name, rows)
+                stats['archived'] += len(rows)
+                last_id = rows[-1]['id']
+
+        try:
+            session.execute(text(f'ALTER TABLE "{table.name}" DETACH PARTITION "{name}"'))
+            session.execute(text(f'DROP TABLE "{name}"'))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        stats['partitions'].append(name)
+        stats['deleted'] += count
+        logger.info(f"Partition {name} supprimée ({count} lignes)")
+
+    stats['elapsed'] = time.perf_counter() - start
+    stats['rows_per_second'] = stats['deleted'] / stats['elapsed'] if stats['elapsed'] else 0.0
+    return stats
+
+def is_partitioned(session, table_name: str) -> bool:
+    """Indique si la table est partitionnée (PostgreSQL uniquement)."""
+    if session.get_bind().dialect.name != 'postgresql':
+        return False
+    return bool(session.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE relname = :name"), {'name': table_name}
+    ).scalar())
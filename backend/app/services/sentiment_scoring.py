@@ -0,0 +1,209 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+import hashlib
+import logging
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime
+from sqlalchemy import Table, select
+from .trend_store import bulk_upsert
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+
+# Moteur de sentiment par défaut : 'textblob' ou 'lexicon' (SENTIMENT_ENGINE)
+DEFAULT_ENGINE = os.environ.get('SENTIMENT_ENGINE', 'textblob')
+
+def normalize_text(text: Optional[str]) -> str:
+    """Normalise un texte pour le cache (Unicode NFKC, minuscules, espaces réduits)."""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFKC', text or '')).strip().lower()
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def textblob_batch(texts: Sequence[str]) -> List[float]:
+    """Scorer par défaut : polarité TextBlob de chaque texte."""
+    from textblob import TextBlob
+    return [TextBlob(text).sentiment.polarity for text in texts]
+
+def textblob_version() -> str:
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return f"textblob-{version('textblob')}"
+    except PackageNotFoundError:
+        return 'textblob'
+
+def lexicon_batch(texts: Sequence[str]) -> List[float]:
+    """Scorer lexical vectorisé (analytics.lexicon), tout le lot en un produit matriciel."""
+    from ..analytics.lexicon import shared_lexicon
+    return shared_lexicon().score_batch(texts).tolist()
+
+def lexicon_version() -> str:
+    from ..analytics.lexicon import LEXICON_VERSION
+    return LEXICON_VERSION
+
+ENGINES = {
+    'textblob': (textblob_batch, textblob_version),
+    'lexicon': (lexicon_batch, lexicon_version),
+}
+
+def resolve_engine(engine: Optional[str] = None) -> str:
+    """Nom du moteur à utiliser (SENTIMENT_ENGINE par défaut)."""
+    engine = engine or DEFAULT_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Moteur de sentiment inconnu: {engine}")
+    return engine
+
+class SentimentScorer:
+    """
+    Service de scoring de sentiment avec cache persistant.
+
+    Les textes sont normalisés et dédupliqués, puis recherchés dans un cache
+    mémoire (par processus) et dans la table `sentiment_cache`, indexée par
+    version du modèle et empreinte du texte normalisé. Seuls les textes
+    absents sont scorés, par lots, et ajoutés au cache en une écriture groupée.
+    Changer de modèle (ou de version) invalide naturellement le cache.
+    """
+
+    def __init__(
+        self,
+        score_batch: Optional[Callable[[Sequence[str]], List[float]]] = None,
+        model_version: Optional[str] = None,
+        batch_size: int = 500,
+        chunk_size: int = 1000,
+        memory_size: int = 100000,
+        engine: Optional[str] = None,
+    ):
+        """
+        Args:
+            score_batch: Fonction qui score un lot de textes (celle du moteur par défaut)
+            model_version: Version du modèle, partie de la clé du cache
+            batch_size: Nombre de textes scorés par appel à `score_batch`
+            chunk_size: Nombre de clés par requête de lecture du cache
+            memory_size: Nombre d'entrées du cache mémoire (LRU)
+            engine: Moteur de sentiment ('textblob' ou 'lexicon', SENTIMENT_ENGINE par défaut),
+                    ignoré si `score_batch` est fourni
+        """
+        engine_batch, engine_version = ENGINES[resolve_engine(engine)]
+        self.score_batch = score_batch or engine_batch
+        self.model_version = model_version or (
+            engine_version() if score_batch is None else getattr(score_batch, '__name__', 'custom')
+        )
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.memory_size = memory_size
+        self._memory: 'OrderedDict[str, float]' = OrderedDict()
+        self.stats: Dict[str, Any] = {}
+
+    def _remember(self, key: str, score: float) -> None:
+        self._memory[key] = score
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _load_cached(self, session, table: Table, keys: List[str]) -> Dict[str, float]:
+        found = {}
+        for start in range(0, len(keys), self.chunk_size):
+            chunk = keys[start:start + self.chunk_size]
+            result = session.execute(
+                select(table.c.text_hash, table.c.score).where(
+                    table.c.model_version == self.model_version,
+                    table.c.text_hash.in_(chunk),
+                )
+            )
+            found.update({key: score for key, score in result})
+        return found
+
+    def score_texts(self, texts: Iterable[str], session=None, table: Optional[Table] = None) -> Dict[str, float]:
+        """
+        Score des textes.
+
+        Args:
+            texts: Textes à scorer (doublons autorisés)
+            session: Session SQLAlchemy (la validation reste à l'appelant)
+            table: Table du cache (`sentiment_cache` par défaut)
+
+        Returns:
+            Dictionnaire {texte normalisé: score} ; les statistiques de
+            l'exécution sont disponibles dans `self.stats`.
+        """
+        if session is None or table is None:
+            from app import db
+            from app.models.sentiment_cache import SentimentCache
+            session = session or db.session
+            table = table if table is not None else SentimentCache.__table__
+
+        start = time.perf_counter()
+        total = 0
+        unique: Dict[str, str] = {}  # empreinte -> texte normalisé
+        for text in texts:
+            total += 1
+            normalized = normalize_text(text)
+            unique.setdefault(text_hash(normalized), normalized)
+
+        scores: Dict[str, float] = {}
+        memory_hits = 0
+        for key in unique:
+            score = self._memory.get(key)
+            if score is not None:
+                scores[key] = score
+                memory_hits += 1
+
+        pending = [key for key in unique if key not in scores]
+        cached = self._load_cached(session, table, pending)
+        scores.update(cached)
+
+        misses = [key for key in pending if key not in cached]
+        new_rows = []
+        for batch_start in range(0, len(misses), self.batch_size):
+            batch = misses[batch_start:batch_start + self.batch_size]
+            batch_scores = self.score_batch([unique[key] for key in batch])
+            now = datetime.utcnow()
+            for key, score in zip(batch, batch_scores):
+                scores[key] = float(score)
+                new_rows.append({
+                    'model_version': self.model_version,
+                    'text_hash': key,
+                    'text': unique[key],
+                    'score': float(score),
+                    'scored_at': now,
+                })
+
+        if new_rows:
+            bulk_upsert(
+                session, table, new_rows,
+                key_columns=('model_version', 'text_hash'),
+                update_columns=('score', 'scored_at'),
+            )
+
+        for key, score in scores.items():
+            self._remember(key, score)
+
+        elapsed = time.perf_counter() - start
+        hits = memory_hits + len(cached)
+        self.stats = {
+            'texts': total,
+            'unique_texts': len(unique),
+            'cache_hits': hits,
+            'cache_misses': len(misses),
+            'hit_ratio': hits / len(unique) if unique else 0.0,
+            'elapsed': elapsed,
+            'rows_per_second': total / elapsed if elapsed else 0.0,
+        }
+        return {unique[key]: score for key, score in scores.items()}
+
+    def score(self, text: str, session=None, table: Optional[Table] = None) -> float:
+        """Score d'un texte isolé (passe par le cache)."""
+        return self.score_texts([text], session, table)[normalize_text(text)]
+
+_shared: Dict[str, SentimentScorer] = {}
+
+def shared_scorer(engine: Optional[str] = None) -> SentimentScorer:
+    """Service d'un moteur, partagé dans le processus (cache mémoire commun aux tâches)."""
+    engine = resolve_engine(engine)
+    if engine not in _shared:
+        _shared[engine] = SentimentScorer(engine=engine)
+    return _shared[engine]
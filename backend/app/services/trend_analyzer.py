@@ -1,8 +1,9 @@
 from typing import List, Dict
+from datetime import datetime
 import numpy as np
 from transformers import pipeline
 from app.models.trend import Trend
-from app import db
+from app.services.trend_store import time_bucket, upsert_trends
 
 class TrendAnalyzer:
     def __init__(self):
@@ -106,11 +107,16 @@ class TrendAnalyzer:
         return {"morning": 9, "evening": 18}
     
     def _save_trends(self, trends: List[Trend]):
-        """Sauvegarde les tendances en base de données."""
+        """Sauvegarde les tendances en base de données (upsert en masse)."""
+        columns = [c.name for c in Trend.__table__.columns if c.name != 'id']
+        rows = []
+        for trend in trends:
+            trend.detected_at = trend.detected_at or datetime.utcnow()
+            trend.time_bucket = time_bucket(trend.detected_at)
+            trend.updated_at = trend.detected_at
+            rows.append({column: getattr(trend, column) for column in columns})
+        
         try:
-            for trend in trends:
-                db.session.add(trend)
-            db.session.commit()
+            upsert_trends(rows)
         except Exception as e:
-            db.session.rollback()
             print(f"Erreur lors de la sauvegarde des tendances: {str(e)}")
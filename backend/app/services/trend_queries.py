@@ -0,0 +1,181 @@
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+import math
+from datetime import datetime
+from sqlalchemy import Table, and_, func, select
+
+logger = logging.getLogger(__name__)
+
+QUARTILES = (0.25, 0.75)
+
+def _trend_table(table: Optional[Table]) -> Table:
+    if table is not None:
+        return table
+    from app.models.trend import Trend
+    return Trend.__table__
+
+def _window(table: Table, since: Optional[datetime]):
+    return table.c.detected_at >= since if since is not None else True
+
+def _top_trends(session, table: Table, since: Optional[datetime], limit: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Top `limit` par engagement et par plateforme (fonction de fenêtrage)."""
+    rank = func.row_number().over(
+        partition_by=table.c.platform,
+        order_by=(table.c.engagement.desc(), table.c.id),
+    ).label('rank')
+    ranked = select(
+        table.c.platform, table.c.keyword, table.c.engagement, table.c.growth_rate, rank
+    ).where(_window(table, since), table.c.engagement.isnot(None)).subquery()
+
+    top: Dict[str, List[Dict[str, Any]]] = {}
+    result = session.execute(
+        select(ranked.c.platform, ranked.c.keyword, ranked.c.engagement, ranked.c.growth_rate)
+        .where(ranked.c.rank <= limit)
+        .order_by(ranked.c.platform, ranked.c.rank)
+    )
+    for platform, keyword, engagement, growth_rate in result:
+        top.setdefault(platform, []).append({
+            'keyword': keyword,
+            'engagement': engagement,
+            'growth_rate': growth_rate,
+        })
+    return top
+
+def _postgres_stats(session, table: Table, since: Optional[datetime]) -> Dict[str, Dict[str, Any]]:
+    """Moyennes, écart-type et percentiles en une seule requête GROUP BY."""
+    engagement = table.c.engagement
+    percentiles = [
+        func.percentile_cont(q).within_group(engagement).label(f'p{int(q * 100)}')
+        for q in (0.5, *QUARTILES)
+    ]
+    result = session.execute(
+        select(
+            table.c.platform,
+            func.avg(engagement), func.avg(table.c.growth_rate), func.avg(table.c.sentiment_score),
+            func.stddev_samp(engagement),
+            *percentiles,
+        ).where(_window(table, since)).group_by(table.c.platform)
+    )
+    stats = {}
+    for platform, avg_engagement, avg_growth, avg_sentiment, std, median, q1, q3 in result:
+        stats[platform] = {
+            'avg_engagement': avg_engagement,
+            'avg_growth_rate': avg_growth,
+            'avg_sentiment': avg_sentiment,
+            'std': std,
+            'median': median,
+            'quartiles': {0.25: q1, 0.75: q3},
+        }
+    return stats
+
+def _interpolate(values: Sequence[float], position: float) -> float:
+    """Interpolation linéaire entre deux valeurs consécutives triées."""
+    lower = values[0]
+    upper = values[1] if len(values) > 1 else lower
+    return lower + (upper - lower) * (position - math.floor(position))
+
+def _generic_stats(session, table: Table, since: Optional[datetime]) -> Dict[str, Dict[str, Any]]:
+    """
+    Repli sans percentile_cont ni stddev (SQLite) : agrégats GROUP BY, puis
+    pour chaque percentile les deux valeurs encadrantes, lues par
+    ORDER BY / LIMIT 2 OFFSET k. Le volume transféré reste proportionnel au
+    nombre de plateformes.
+    """
+    engagement = table.c.engagement
+    window = _window(table, since)
+    averages = select(
+        table.c.platform,
+        func.avg(engagement).label('avg_engagement'),
+        func.avg(table.c.growth_rate).label('avg_growth_rate'),
+        func.avg(table.c.sentiment_score).label('avg_sentiment'),
+        func.count(engagement).label('n'),
+    ).where(window).group_by(table.c.platform).subquery()
+
+    # Somme des carrés des écarts à la moyenne (plus stable que E[x²] - E[x]²)
+    deviation = engagement - averages.c.avg_engagement
+    result = session.execute(
+        select(
+            averages.c.platform, averages.c.avg_engagement, averages.c.avg_growth_rate,
+            averages.c.avg_sentiment, averages.c.n,
+            func.sum(deviation * deviation),
+        ).select_from(
+            averages.outerjoin(table, and_(table.c.platform == averages.c.platform, window))
+        ).group_by(
+            averages.c.platform, averages.c.avg_engagement, averages.c.avg_growth_rate,
+            averages.c.avg_sentiment, averages.c.n,
+        )
+    )
+
+    stats = {}
+    for platform, avg_engagement, avg_growth, avg_sentiment, n, squares in result:
+        quantiles = {}
+        for q in (0.5, *QUARTILES):
+            if not n:
+                quantiles[q] = None
+                continue
+            position = q * (n - 1)
+            values = session.execute(
+                select(engagement)
+                .where(window, table.c.platform == platform, engagement.isnot(None))
+                .order_by(engagement)
+                .limit(2).offset(int(math.floor(position)))
+            ).scalars().all()
+            quantiles[q] = float(_interpolate(values, position))
+
+        stats[platform] = {
+            'avg_engagement': avg_engagement,
+            'avg_growth_rate': avg_growth,
+            'avg_sentiment': avg_sentiment,
+            'std': math.sqrt(squares / (n - 1)) if n and n > 1 and squares is not None else None,
+            'median': quantiles[0.5],
+            'quartiles': {q: quantiles[q] for q in QUARTILES},
+        }
+    return stats
+
+def platform_performance(
+    session,
+    since: Optional[datetime] = None,
+    table: Optional[Table] = None,
+    top_n: int = 5,
+) -> Dict[str, Any]:
+    """
+    Performances par plateforme calculées dans la base.
+
+    Même résultat que `tasks.analysis.analyze_platform_performance`, sans
+    charger les tendances : moyennes, écart-type et percentiles par
+    GROUP BY (percentile_cont sur PostgreSQL), top N par fonction de
+    fenêtrage.
+
+    Args:
+        session: Session SQLAlchemy
+        since: Ne considère que les tendances détectées depuis cette date
+        table: Table des tendances (`trend` par défaut)
+        top_n: Nombre de tendances les plus engageantes par plateforme
+    """
+    table = _trend_table(table)
+    if session.get_bind().dialect.name == 'postgresql':
+        stats = _postgres_stats(session, table, since)
+    else:
+        stats = _generic_stats(session, table, since)
+    top = _top_trends(session, table, since, top_n)
+
+    def number(value):
+        return float(value) if value is not None else math.nan
+
+    platform_stats = {}
+    for platform, s in stats.items():
+        platform_stats[platform] = {
+            'metrics': {
+                'avg_engagement': number(s['avg_engagement']),
+                'avg_growth_rate': number(s['avg_growth_rate']),
+                'avg_sentiment': number(s['avg_sentiment']),
+            },
+            'top_trends': top.get(platform, []),
+            'engagement_distribution': {
+                'mean': number(s['avg_engagement']),
+                'median': number(s['median']),
+                'std': number(s['std']),
+                'quartiles': {q: number(v) for q, v in s['quartiles'].items()},
+            },
+        }
+    return platform_stats
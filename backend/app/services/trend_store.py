@@ -0,0 +1,199 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import logging
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import Table, bindparam, func, select, tuple_, update
+
+logger = logging.getLogger(__name__)
+
+# Une tendance est identifiée par (plateforme, mot-clé, tranche horaire)
+BUCKET_SECONDS = 3600
+EPOCH = datetime(1970, 1, 1)
+KEY_COLUMNS = ('platform', 'keyword', 'time_bucket')
+UPDATE_COLUMNS = (
+    'content_id', 'category', 'segment', 'volume', 'engagement', 'growth_rate', 'sentiment_score',
+    'virality_score', 'hashtags', 'related_keywords', 'peak_hours', 'updated_at',
+)
+# Colonnes dont la nouvelle valeur ne remplace l'ancienne que si elle est renseignée
+COALESCE_COLUMNS = ('sentiment_score', 'virality_score', 'segment')
+
+def time_bucket(timestamp: datetime, seconds: int = BUCKET_SECONDS) -> datetime:
+    """Tronque un horodatage (UTC) au début de sa tranche."""
+    if timestamp.tzinfo:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp - (timestamp - EPOCH) % timedelta(seconds=seconds)
+
+def _content_id(trend_data: Dict[str, Any]) -> Optional[str]:
+    """Identifiant du contenu sur la plateforme, utilisé pour rafraîchir ses métriques."""
+    content_id = trend_data.get('content_id', trend_data.get('id'))
+    return str(content_id) if content_id is not None else None
+
+def trend_row(trend_data: Dict[str, Any], detected_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """Convertit une tendance issue d'un collecteur en ligne de la table `trend`."""
+    detected_at = detected_at or trend_data.get('detected_at') or datetime.utcnow()
+    return {
+        'platform': trend_data['platform'],
+        'keyword': trend_data['keyword'],
+        'content_id': _content_id(trend_data),
+        'category': trend_data.get('type', 'general'),
+        'segment': None,  # Affecté à l'ingestion (services.ingest)
+        'volume': trend_data.get('volume', 0),
+        'engagement': trend_data.get('views', 0),
+        'growth_rate': trend_data.get('growth_rate', 0.0),
+        'sentiment_score': trend_data.get('sentiment_score'),  # Calculé à l'ingestion (services.ingest)
+        'hashtags': trend_data.get('hashtags', []),
+        'related_keywords': trend_data.get('related_keywords', []),
+        'peak_hours': trend_data.get('peak_hours', {}),
+        'detected_at': detected_at,
+        'time_bucket': time_bucket(detected_at),
+        'updated_at': detected_at,
+    }
+
+def _dedupe(rows: Iterable[Dict[str, Any]], key_columns: Sequence[str]) -> List[Dict[str, Any]]:
+    """Fusionne les doublons d'un lot : la dernière observation l'emporte."""
+    merged = {}
+    for row in rows:
+        key = tuple(row[c] for c in key_columns)
+        previous = merged.get(key)
+        if previous is not None:
+            # Conserve la première détection et les valeurs déjà renseignées
+            row = {**previous, **{k: v for k, v in row.items() if v is not None}}
+            row['detected_at'] = previous.get('detected_at', row.get('detected_at'))
+        merged[key] = row
+    return list(merged.values())
+
+def _existing_keys(session, table: Table, key_columns: Sequence[str], keys: List[tuple]) -> set:
+    """Retourne les clés du lot déjà présentes en base."""
+    columns = [table.c[c] for c in key_columns]
+    result = session.execute(select(*columns).where(tuple_(*columns).in_(keys)))
+    return {tuple(row) for row in result}
+
+def _native_upsert(session, table: Table, rows: List[Dict[str, Any]],
+                   key_columns: Sequence[str], update_columns: Sequence[str]) -> int:
+    """
+    INSERT ... ON CONFLICT natif (PostgreSQL, SQLite), en executemany.
+
+    Les lignes sont d'abord insérées avec ON CONFLICT DO NOTHING RETURNING,
+    qui renvoie les clés réellement insérées ; seules les autres sont
+    ensuite fusionnées par ON CONFLICT DO UPDATE. Retourne le nombre de
+    lignes insérées.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    result = session.execute(
+        insert(table)
+        .on_conflict_do_nothing(index_elements=list(key_columns))
+        .returning(*[table.c[c] for c in key_columns]),
+        rows,
+    )
+    inserted = {tuple(row) for row in result}
+    conflicts = [r for r in rows if tuple(r[c] for c in key_columns) not in inserted]
+
+    if conflicts and update_columns:
+        stmt = insert(table)
+        set_ = {}
+        for column in update_columns:
+            if column in COALESCE_COLUMNS:
+                set_[column] = func.coalesce(stmt.excluded[column], table.c[column])
+            else:
+                set_[column] = stmt.excluded[column]
+        stmt = stmt.on_conflict_do_update(index_elements=list(key_columns), set_=set_)
+        session.execute(stmt, conflicts)
+    return len(inserted)
+
+def _generic_upsert(session, table: Table, rows: List[Dict[str, Any]], existing: set,
+                    key_columns: Sequence[str], update_columns: Sequence[str]) -> None:
+    """Repli pour les autres dialectes : INSERT et UPDATE séparés, en executemany."""
+    new_rows = [r for r in rows if tuple(r[c] for c in key_columns) not in existing]
+    old_rows = [r for r in rows if tuple(r[c] for c in key_columns) in existing]
+
+    if new_rows:
+        session.execute(table.insert(), new_rows)
+    if old_rows:
+        stmt = update(table).where(
+            *[table.c[c] == bindparam(f'key_{c}') for c in key_columns]
+        ).values({
+            c: (func.coalesce(bindparam(f'val_{c}'), table.c[c]) if c in COALESCE_COLUMNS
+                else bindparam(f'val_{c}'))
+            for c in update_columns
+        })
+        session.execute(stmt, [
+            {**{f'key_{c}': r[c] for c in key_columns},
+             **{f'val_{c}': r.get(c) for c in update_columns}}
+            for r in old_rows
+        ])
+
+def bulk_upsert(
+    session,
+    table: Table,
+    rows: Iterable[Dict[str, Any]],
+    key_columns: Sequence[str] = KEY_COLUMNS,
+    update_columns: Sequence[str] = UPDATE_COLUMNS,
+    chunk_size: int = 5000,
+) -> Dict[str, int]:
+    """
+    Insère ou met à jour des lignes en masse via SQLAlchemy Core.
+
+    Les doublons sont fusionnés par clé avant l'écriture, puis chaque lot est
+    écrit en executemany. Sur PostgreSQL et SQLite, la fusion utilise
+    `INSERT ... ON CONFLICT` et les comptes viennent de RETURNING ; les autres
+    dialectes lisent d'abord les clés existantes puis passent par un INSERT et
+    un UPDATE séparés. La table doit porter une contrainte unique
+    sur `key_columns`.
+
+    Args:
+        session: Session SQLAlchemy (la validation reste à l'appelant)
+        table: Table cible
+        rows: Lignes à écrire
+        key_columns: Colonnes identifiant une ligne
+        update_columns: Colonnes remplacées en cas de conflit
+        chunk_size: Taille des lots
+
+    Returns:
+        Dictionnaire {'inserted': n, 'updated': n}
+    """
+    rows = _dedupe(rows, key_columns)
+    update_columns = [c for c in update_columns if c in table.c]
+    native = session.get_bind().dialect.name in ('postgresql', 'sqlite')
+    stats = {'inserted': 0, 'updated': 0}
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        if native:
+            inserted = _native_upsert(session, table, chunk, key_columns, update_columns)
+        else:
+            keys = [tuple(r[c] for c in key_columns) for r in chunk]
+            existing = _existing_keys(session, table, key_columns, keys)
+            _generic_upsert(session, table, chunk, existing, key_columns, update_columns)
+            inserted = len(chunk) - len(existing)
+
+        stats['inserted'] += inserted
+        stats['updated'] += len(chunk) - inserted
+
+    return stats
+
+def upsert_trends(trends: Iterable[Dict[str, Any]], session=None) -> Dict[str, int]:
+    """
+    Enregistre des tendances (au format de la table `trend`) en dédupliquant
+    par plateforme, mot-clé et tranche horaire, puis valide la transaction.
+    """
+    from app import db
+    from app.models.trend import Trend
+
+    session = session or db.session
+    try:
+        stats = bulk_upsert(session, Trend.__table__, trends)
+        session.commit()
+        logger.info(
+            f"Tendances enregistrées: {stats['inserted']} insérées, "
+            f"{stats['updated']} mises à jour"
+        )
+        return stats
+
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Erreur lors de l'enregistrement des tendances: {str(e)}")
+        raise
@@ -1,53 +1,70 @@
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
 from celery import shared_task
-from app.collectors.manager import CollectorManager
+from app.tasks.runtime import runtime
+from app.tasks.locks import single_instance
+from app.analytics import chunked
+from app.analytics.segmentation import FEATURES, TrendSegmenter, load_segmenter, save_segmenter
+from app.analytics.virality import TREND_EVOLUTION
+from app.services.sentiment_scoring import normalize_text, shared_scorer
+from app.services.analysis_store import save_result
+from app.services.calendar_export import iter_creators, write_calendars
+from app.services.trend_queries import platform_performance
 from app.models.trend import Trend
 from app import db
+import copy
 import logging
-from datetime import datetime, timedelta
-import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-from textblob import TextBlob
-import pandas as pd
+import os
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import update
+
+# numpy, pandas, scikit-learn et TextBlob sont importés dans les fonctions
+# qui les utilisent pour ne pas alourdir le démarrage des workers
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Colonnes chargées pour l'analyse globale
+TREND_COLUMNS = ['id', 'platform', 'keyword', 'volume', 'engagement', 'growth_rate', 'sentiment_score']
+
 @shared_task(
+    bind=True,
     name='app.tasks.analysis.analyze_global_trends',
     queue='analysis',
 )
-def analyze_global_trends():
-    """Analyse globale des tendances sur toutes les plateformes."""
+@single_instance('analyze_global_trends', ttl=1800, policy='skip')
+def analyze_global_trends(self):
+    """
+    Analyse globale des tendances sur toutes les plateformes.
+    
+    Le résultat complet est enregistré dans `analysis_result` (servi par
+    l'API /api/analysis) ; la tâche ne renvoie que sa référence.
+    """
     try:
-        # Récupère les tendances des dernières 24h
-        trends = Trend.query.filter(
-            Trend.detected_at >= datetime.utcnow() - timedelta(days=1)
+        # Récupère les tendances des dernières 24h (colonnes seulement, sans objets ORM)
+        since = datetime.utcnow() - timedelta(days=1)
+        rows = db.session.query(
+            *(getattr(Trend, column) for column in TREND_COLUMNS)
+        ).filter(
+            Trend.detected_at >= since
         ).all()
         
-        # Prépare les données pour l'analyse
-        trend_data = []
-        for trend in trends:
-            trend_data.append({
-                'id': trend.id,
-                'platform': trend.platform,
-                'keyword': trend.keyword,
-                'volume': trend.volume,
-                'engagement': trend.engagement,
-                'growth_rate': trend.growth_rate,
-                'sentiment_score': trend.sentiment_score,
-            })
-        
-        if not trend_data:
+        if not rows:
             logger.warning("Aucune tendance à analyser")
             return
         
-        df = pd.DataFrame(trend_data)
+        import pandas as pd
+        df = pd.DataFrame.from_records(rows, columns=TREND_COLUMNS)
         
-        # Analyse par plateforme
-        platform_analysis = analyze_platform_performance(df)
+        # Analyse par plateforme (agrégée dans la base, cf. services.trend_queries)
+        platform_analysis = platform_performance(db.session, since)
         
-        # Segmentation des tendances
-        trend_segments = segment_trends(df)
+        # Segmentation des tendances (modèle incrémental persistant). Le modèle
+        # partagé du processus n'est pas modifié : une copie est mise à jour,
+        # puis rechargée depuis la base une fois la transaction validée
+        segmenter = copy.deepcopy(load_segmenter(db.session))
+        trend_segments = segment_trends(df, segmenter)
         
         # Analyse des corrélations
         correlation_analysis = analyze_correlations(df)
@@ -55,7 +72,7 @@ def analyze_global_trends():
         # Prédiction des tendances futures
         future_predictions = predict_trend_evolution(df)
         
-        # Sauvegarde les résultats
+        # Résultats complets (stockés en base, voir services.analysis_store)
         analysis_results = {
             'timestamp': datetime.utcnow().isoformat(),
             'platform_analysis': platform_analysis,
@@ -64,31 +81,83 @@ def analyze_global_trends():
             'future_predictions': future_predictions,
         }
         
-        # Met à jour la base de données
-        for trend in trends:
-            segment = next(
-                (s for s in trend_segments if trend.id in s['trend_ids']),
-                None
-            )
-            if segment:
-                trend.category = segment['name']
-                trend.insights = {
-                    'segment': segment['characteristics'],
-                    'predicted_growth': next(
-                        (p for p in future_predictions if p['trend_id'] == trend.id),
-                        {}
-                    ),
-                }
-        
-        db.session.commit()
+        # Met à jour le segment de chaque tendance (index id -> segment, UPDATE groupé)
+        updates = segment_updates(trend_segments)
+        try:
+            if updates:
+                db.session.execute(update(Trend), updates)
+            if segmenter.fitted:
+                save_segmenter(segmenter, db.session)
+            db.session.commit()
+            
+        except Exception:
+            db.session.rollback()
+            raise
         
-        return analysis_results
+        # Seule une référence au résultat transite par le backend Celery
+        stored = save_result('global_trends', analysis_results, summary={
+            'trends': len(df),
+            'platforms': sorted(platform_analysis),
+            'segments': len(trend_segments),
+            'significant_correlations': len(correlation_analysis['significant_correlations']),
+        })
+        return stored.handle()
         
     except Exception as e:
         logger.error(f"Erreur lors de l'analyse globale des tendances: {str(e)}")
         raise
 
-def analyze_platform_performance(df: pd.DataFrame) -> Dict[str, Any]:
+@shared_task(
+    bind=True,
+    name='app.tasks.analysis.analyze_trend_window',
+    queue='analysis',
+)
+@single_instance('analyze_trend_window', ttl=3600, policy='skip')
+def analyze_trend_window(self, days: Optional[int] = None):
+    """
+    Analyse des performances et corrélations sur une longue fenêtre.
+    
+    Les performances par plateforme sont agrégées dans la base
+    (`platform_performance`, comme pour l'analyse globale) ; les
+    corrélations sont calculées sur des lots de tendances
+    (analytics.chunked). La mémoire du worker reste bornée quel que soit
+    le volume de la fenêtre.
+    
+    Args:
+        days: Durée de la fenêtre en jours (TREND_ANALYSIS_DAYS, 30 par défaut)
+    """
+    try:
+        if days is None:
+            days = int(os.environ.get('TREND_ANALYSIS_DAYS', 30))
+        since = datetime.utcnow() - timedelta(days=days)
+        analysis = chunked.analyze_trend_window(db.session, since)
+        
+        if not analysis.rows:
+            db.session.rollback()
+            logger.warning("Aucune tendance à analyser")
+            return
+        
+        platform_analysis = platform_performance(db.session, since)
+        db.session.rollback()  # Termine la transaction de lecture
+        correlation_analysis = analysis.correlation_analysis()
+        stored = save_result('trend_window', {
+            'timestamp': datetime.utcnow().isoformat(),
+            'window_days': days,
+            'platform_analysis': platform_analysis,
+            'correlation_analysis': correlation_analysis,
+        }, summary={
+            'trends': analysis.rows,
+            'window_days': days,
+            'platforms': sorted(platform_analysis),
+            'significant_correlations': len(correlation_analysis['significant_correlations']),
+        })
+        return stored.handle()
+        
+    except Exception as e:
+        logger.error(f"Erreur lors de l'analyse de la fenêtre de tendances: {str(e)}")
+        raise
+
+def analyze_platform_performance(df: 'pd.DataFrame') -> Dict[str, Any]:
     """Analyse les performances par plateforme."""
     try:
         platform_stats = {}
@@ -130,47 +199,64 @@ def analyze_platform_performance(df: pd.DataFrame) -> Dict[str, Any]:
         logger.error(f"Erreur lors de l'analyse des performances par plateforme: {str(e)}")
         raise
 
-def segment_trends(df: pd.DataFrame) -> List[Dict[str, Any]]:
-    """Segmente les tendances en clusters."""
+def segment_updates(trend_segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Lignes de l'UPDATE groupé {'id', 'segment'} des tendances segmentées."""
+    return [
+        {'id': trend_id, 'segment': segment['name']}
+        for segment in trend_segments
+        for trend_id in segment['trend_ids']
+    ]
+
+def segment_trends(
+    df: 'pd.DataFrame',
+    segmenter: Optional[TrendSegmenter] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Segmente les tendances en clusters.
+    
+    Avec un modèle persistant (`segmenter`), la fenêtre est intégrée par mise
+    à jour incrémentale et les segments gardent leur numéro d'une exécution
+    à l'autre ; sans modèle, un modèle neuf est entraîné sur la fenêtre.
+    """
     try:
-        # Prépare les features pour le clustering
-        features = ['volume', 'engagement', 'growth_rate', 'sentiment_score']
-        X = df[features].values
-        
-        # Normalise les données
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-        
-        # Détermine le nombre optimal de clusters
-        n_clusters = min(5, len(df))
-        
-        # Applique K-means
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-        clusters = kmeans.fit_predict(X_scaled)
+        features = list(FEATURES)
+        segmenter = segmenter if segmenter is not None else TrendSegmenter()
+        X = segmenter.matrix(df)
+        
+        if segmenter.fitted or len(df) >= segmenter.n_clusters:
+            segmenter.update(X)
+            n_clusters = segmenter.n_clusters
+            clusters = segmenter.predict(X)
+        else:
+            # Trop peu de tendances pour un premier entraînement : une par segment
+            n_clusters = len(df)
+            clusters = list(range(n_clusters))
+        
+        # Analyse chaque segment (agrégations groupées, un seul passage par colonne)
+        frame = df.assign(segment=clusters)
+        grouped = frame.groupby('segment')
+        sizes = grouped.size()
+        characteristics = grouped[features].mean()
+        trend_ids = {i: ids.tolist() for i, ids in grouped['id']}
+        
+        # Tendances représentatives : les 3 plus engageantes de chaque segment
+        top = frame.sort_values('engagement', ascending=False, kind='stable').groupby('segment').head(3)
+        representatives = {
+            i: group[['id', 'keyword', 'platform']].to_dict('records')
+            for i, group in top.groupby('segment')
+        }
         
-        # Analyse chaque segment
         segments = []
         for i in range(n_clusters):
-            cluster_mask = clusters == i
-            cluster_df = df[cluster_mask]
-            
-            # Caractéristiques moyennes du segment
-            characteristics = {
-                feature: cluster_df[feature].mean()
-                for feature in features
-            }
-            
-            # Tendances représentatives
-            representative_trends = cluster_df.nlargest(3, 'engagement')[
-                ['id', 'keyword', 'platform']
-            ].to_dict('records')
-            
             segments.append({
-                'name': f"Segment {i+1}",
-                'size': len(cluster_df),
-                'characteristics': characteristics,
-                'representative_trends': representative_trends,
-                'trend_ids': cluster_df['id'].tolist(),
+                'name': TrendSegmenter.segment_name(i),
+                'size': int(sizes.get(i, 0)),
+                'characteristics': (
+                    characteristics.loc[i].to_dict() if i in characteristics.index
+                    else {feature: float('nan') for feature in features}
+                ),
+                'representative_trends': representatives.get(i, []),
+                'trend_ids': trend_ids.get(i, []),
             })
         
         return segments
@@ -179,7 +265,7 @@ def segment_trends(df: pd.DataFrame) -> List[Dict[str, Any]]:
         logger.error(f"Erreur lors de la segmentation des tendances: {str(e)}")
         raise
 
-def analyze_correlations(df: pd.DataFrame) -> Dict[str, Any]:
+def analyze_correlations(df: 'pd.DataFrame') -> Dict[str, Any]:
     """Analyse les corrélations entre les métriques."""
     try:
         # Calcule la matrice de corrélation
@@ -208,51 +294,61 @@ def analyze_correlations(df: pd.DataFrame) -> Dict[str, Any]:
         logger.error(f"Erreur lors de l'analyse des corrélations: {str(e)}")
         raise
 
-def predict_trend_evolution(df: pd.DataFrame) -> List[Dict[str, Any]]:
+# Catégorie de prédiction -> (libellé, croissance attendue), par score décroissant
+PREDICTION_LABELS = [
+    ("forte_croissance", ">100%"),
+    ("croissance_moderee", "50-100%"),
+    ("stable", "0-50%"),
+    ("declin", "<0%"),
+]
+
+def predict_trend_evolution(df: 'pd.DataFrame') -> List[Dict[str, Any]]:
     """Prédit l'évolution future des tendances."""
+    import numpy as np
+    
     try:
-        predictions = []
+        # Facteurs de prédiction et score composite, calculés colonne par colonne
+        factors = TREND_EVOLUTION.factors({
+            column: df[column].to_numpy(dtype=float)
+            for column in TREND_EVOLUTION.keys
+        })
+        potential_score = TREND_EVOLUTION.combine(factors)
+        engagement_momentum = factors['growth_rate']
+        sentiment_factor = factors['sentiment_score']
+        volume_factor = factors['volume']
+        
+        # Catégorise les prédictions
+        category = np.select(
+            [potential_score > 0.7, potential_score > 0.5, potential_score > 0.3],
+            [0, 1, 2],
+            default=3,
+        )
         
-        for _, trend in df.iterrows():
-            # Facteurs de prédiction
-            engagement_momentum = trend['growth_rate']
-            sentiment_factor = (trend['sentiment_score'] + 1) / 2  # Normalise entre 0 et 1
-            volume_factor = np.log1p(trend['volume']) / np.log1p(df['volume'].max())
-            
-            # Score composite
-            potential_score = (
-                0.4 * engagement_momentum +
-                0.3 * sentiment_factor +
-                0.3 * volume_factor
-            )
-            
-            # Catégorise la prédiction
-            if potential_score > 0.7:
-                prediction = "forte_croissance"
-                expected_growth = ">100%"
-            elif potential_score > 0.5:
-                prediction = "croissance_moderee"
-                expected_growth = "50-100%"
-            elif potential_score > 0.3:
-                prediction = "stable"
-                expected_growth = "0-50%"
-            else:
-                prediction = "declin"
-                expected_growth = "<0%"
-            
-            predictions.append({
-                'trend_id': trend['id'],
-                'keyword': trend['keyword'],
-                'platform': trend['platform'],
-                'prediction': prediction,
-                'expected_growth': expected_growth,
-                'confidence_score': potential_score,
+        predictions = [
+            {
+                'trend_id': trend_id,
+                'keyword': keyword,
+                'platform': platform,
+                'prediction': PREDICTION_LABELS[c][0],
+                'expected_growth': PREDICTION_LABELS[c][1],
+                'confidence_score': score,
                 'factors': {
-                    'engagement_momentum': engagement_momentum,
-                    'sentiment_factor': sentiment_factor,
-                    'volume_factor': volume_factor,
+                    'engagement_momentum': momentum,
+                    'sentiment_factor': sentiment,
+                    'volume_factor': volume_f,
                 },
-            })
+            }
+            for trend_id, keyword, platform, c, score, momentum, sentiment, volume_f in zip(
+                df['id'].tolist(),
+                df['keyword'].tolist(),
+                df['platform'].tolist(),
+                category.tolist(),
+                potential_score.tolist(),
+                engagement_momentum.tolist(),
+                sentiment_factor.tolist(),
+                volume_factor.tolist(),
+            )
+        ]
         
         return predictions
         
@@ -267,13 +363,8 @@ def predict_trend_evolution(df: pd.DataFrame) -> List[Dict[str, Any]]:
 def analyze_content_performance(content_id: str, platform: str):
     """Analyse approfondie des performances d'un contenu."""
     try:
-        # Initialise le gestionnaire
-        manager = CollectorManager({
-            'tiktok': os.environ.get('TIKTOK_API_KEY'),
-            'youtube': os.environ.get('YOUTUBE_API_KEY'),
-            'instagram': os.environ.get('INSTAGRAM_API_KEY'),
-            'facebook': os.environ.get('FACEBOOK_API_KEY'),
-        })
+        # Gestionnaire partagé pendant la vie du worker
+        manager = runtime.collector_manager()
         
         # Récupère le collecteur approprié
         collector = manager.collectors.get(platform)
@@ -281,8 +372,7 @@ def analyze_content_performance(content_id: str, platform: str):
             raise ValueError(f"Plateforme non supportée: {platform}")
         
         # Analyse le contenu
-        loop = asyncio.get_event_loop()
-        analysis = loop.run_until_complete(
+        analysis = runtime.run(
             collector.analyze_content_performance(content_id)
         )
         
@@ -301,40 +391,160 @@ def analyze_content_performance(content_id: str, platform: str):
     name='app.tasks.analysis.analyze_sentiment',
     queue='analysis',
 )
-def analyze_sentiment():
-    """Analyse le sentiment des tendances actives."""
+def analyze_sentiment(engine: Optional[str] = None):
+    """
+    Analyse le sentiment des tendances actives.
+    
+    Les mots-clés sont dédupliqués et scorés via le cache de sentiment ;
+    les scores sont ensuite écrits en un seul UPDATE groupé.
+    
+    Args:
+        engine: Moteur de sentiment, 'textblob' ou 'lexicon' (SENTIMENT_ENGINE par défaut)
+    """
     try:
         # Récupère les tendances sans score de sentiment
-        trends = Trend.query.filter(
+        rows = db.session.query(Trend.id, Trend.keyword).filter(
             Trend.sentiment_score.is_(None),
             Trend.detected_at >= datetime.utcnow() - timedelta(days=1)
         ).all()
         
-        for trend in trends:
-            try:
-                # Analyse le sentiment du mot-clé
-                blob = TextBlob(trend.keyword)
-                sentiment_score = blob.sentiment.polarity
-                
-                # Met à jour le score
-                trend.sentiment_score = sentiment_score
-                
-            except Exception as e:
-                logger.error(f"Erreur lors de l'analyse du sentiment pour {trend.id}: {str(e)}")
-                continue
-        
-        # Sauvegarde les modifications
+        start = time.perf_counter()
+        sentiment_scorer = shared_scorer(engine)
+        scores = sentiment_scorer.score_texts(keyword for _, keyword in rows)
+        updates = [
+            {'id': trend_id, 'sentiment_score': scores[normalize_text(keyword)]}
+            for trend_id, keyword in rows
+        ]
+        
+        # Sauvegarde les scores (et les nouvelles entrées du cache)
         try:
+            if updates:
+                db.session.execute(update(Trend), updates)
             db.session.commit()
-            logger.info(f"Sentiment analysé pour {len(trends)} tendances")
             
         except Exception as e:
             db.session.rollback()
             logger.error(f"Erreur lors de la sauvegarde des scores de sentiment: {str(e)}")
             raise
         
-        return {'analyzed_trends': len(trends)}
+        elapsed = time.perf_counter() - start
+        stats = {
+            **sentiment_scorer.stats,
+            'model_version': sentiment_scorer.model_version,
+            'analyzed_trends': len(rows),
+            'elapsed': elapsed,
+            'rows_per_second': len(rows) / elapsed if elapsed else 0.0,
+        }
+        logger.info(
+            f"Sentiment analysé pour {len(rows)} tendances "
+            f"(cache: {stats['hit_ratio']:.0%}, {stats['rows_per_second']:.0f} lignes/s)"
+        )
+        return stats
         
     except Exception as e:
         logger.error(f"Erreur lors de l'analyse du sentiment: {str(e)}")
         raise
+
+@shared_task(
+    bind=True,
+    name='app.tasks.analysis.generate_calendars',
+    queue='analysis',
+)
+@single_instance('generate_calendars', ttl=7200, policy='skip')
+def generate_calendars(
+    self,
+    start: Optional[str] = None,
+    days: Optional[int] = None,
+    seed: int = 0,
+    output_dir: Optional[str] = None,
+):
+    """
+    Génère en un lot les calendriers de publication de tous les créateurs
+    actifs (analytics.calendar_engine).
+    
+    Les créateurs sont lus et planifiés par tranches, et les calendriers
+    écrits au fil de l'eau dans
+    `<output_dir>/calendars-<début>-<jours>d-seed<graine>.jsonl.gz` : la
+    mémoire du worker reste bornée quel que soit le nombre de créateurs.
+    Les heures sont tirées sur la carte persistante de la plateforme
+    préférée de chaque créateur (services.posting_histograms), à défaut
+    sur les horaires par défaut. À graine égale, l'export est identique.
+    
+    Args:
+        start: Premier jour, AAAA-MM-JJ (demain par défaut)
+        days: Nombre de jours (CALENDAR_DAYS, 91 par défaut : un trimestre)
+        seed: Graine des tirages
+        output_dir: Répertoire de l'export (CALENDAR_EXPORT_DIR)
+    """
+    from app.analytics.calendar_engine import CalendarEngine
+    from app.services.posting_histograms import PLATFORM_WIDE, shared_histograms
+    
+    try:
+        first_day = date.fromisoformat(start) if start else date.today() + timedelta(days=1)
+        if days is None:
+            days = int(os.environ.get('CALENDAR_DAYS', 91))
+        output_dir = output_dir or os.environ.get('CALENDAR_EXPORT_DIR')
+        if not output_dir:
+            raise ValueError("Aucun répertoire d'export (CALENDAR_EXPORT_DIR)")
+        
+        # Une carte par plateforme, lue une fois pour tout le lot
+        store = shared_histograms()
+        heatmaps: Dict[str, Any] = {}
+        
+        def heatmap_for(platform: str):
+            if platform not in heatmaps:
+                found = None
+                if store is not None:
+                    try:
+                        found = store.lookup(platform, PLATFORM_WIDE, max_age_hours=float('inf'))
+                    except Exception as e:
+                        logger.warning(f"Carte de publication {platform} indisponible: {e}")
+                heatmaps[platform] = found['engagement'] if found else None
+            return heatmaps[platform]
+        
+        engine = CalendarEngine(seed=seed)
+        path = os.path.join(output_dir, f'calendars-{first_day.isoformat()}-{days}d-seed{seed}.jsonl.gz')
+        stats = write_calendars(
+            engine.iter_calendars(iter_creators(db.session, heatmap_for, engine.chunk_size), first_day, days),
+            path,
+        )
+        db.session.rollback()  # Termine la transaction de lecture
+        
+        logger.info(
+            f"{stats['creators']} calendriers ({stats['entries']} publications) "
+            f"générés en {stats['elapsed']:.2f}s dans {path}"
+        )
+        return {**stats, 'start': first_day.isoformat(), 'days': days, 'seed': seed}
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Erreur lors de la génération des calendriers: {str(e)}")
+        raise
+
+@shared_task(
+    bind=True,
+    name='app.tasks.analysis.rebuild_posting_histograms',
+    queue='analysis',
+)
+@single_instance('rebuild_posting_histograms', ttl=1800, policy='skip')
+def rebuild_posting_histograms(self):
+    """
+    Reconstruit la carte de publication de chaque plateforme à partir des
+    cartes de ses chaînes (services.posting_histograms) : les collectes ne
+    verrouillent que la ligne de leur chaîne.
+    """
+    from app.services.posting_histograms import shared_histograms
+    
+    store = shared_histograms()
+    if store is None:
+        logger.warning("Aucune base configurée pour les cartes de publication")
+        return {}
+    
+    try:
+        channels = {platform: store.rebuild_platform(platform) for platform in store.platforms()}
+        logger.info(f"Cartes de publication reconstruites: {channels}")
+        return channels
+        
+    except Exception as e:
+        logger.error(f"Erreur lors de la reconstruction des cartes de publication: {str(e)}")
+        raise
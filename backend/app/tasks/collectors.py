@@ -1,94 +1,232 @@
-import asyncio
-from celery import shared_task
-from app.collectors.manager import CollectorManager
+import os
+from celery import chord, group, shared_task
+from app.tasks.runtime import collector_config, runtime
+from app.services.ingest import IngestPipeline
+from app.collectors.manager import collection_params
+from app.collectors.registry import get_collector_class
+from app.tasks.locks import (
+    TaskLease, current_lease, extend_lease, release_lease, single_instance
+)
+from app.services.retention import (
+    TrendArchiver, drop_expired_partitions, is_partitioned, purge_expired
+)
 from app.models.trend import Trend
 from app import db
 import logging
 from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import select, update
 
 logger = logging.getLogger(__name__)
 
+def collection_shards() -> List[Dict[str, Any]]:
+    """
+    Découpe la collecte en sous-tâches indépendantes : une par plateforme
+    configurée, ou, si COLLECTOR_REGIONS (liste séparée par des virgules)
+    est défini, une par région pour les plateformes dont le collecteur
+    accepte une région.
+    """
+    regions = [r.strip() for r in os.environ.get('COLLECTOR_REGIONS', '').split(',') if r.strip()]
+    shards = []
+    for platform, api_key in collector_config().items():
+        if not api_key:
+            continue
+        if regions and collection_params(get_collector_class(platform), {'region': None}):
+            shards.extend({'platform': platform, 'region': region} for region in regions)
+        else:
+            shards.append({'platform': platform})
+    return shards
+
+# Durée des baux des tâches planifiées (secondes)
+COLLECT_LEASE_TTL = 3600
+METRICS_LEASE_TTL = 300
+
 @shared_task(
+    bind=True,
     name='app.tasks.collectors.collect_all_trends',
     queue='collectors',
-    autoretry_for=(Exception,),
-    retry_kwargs={'max_retries': 3, 'countdown': 60},
 )
-def collect_all_trends():
-    """Tâche de collecte des tendances de toutes les plateformes."""
+@single_instance('collect_all_trends', ttl=COLLECT_LEASE_TTL, policy='coalesce', hold=True)
+def collect_all_trends(self):
+    """
+    Lance la collecte des tendances de toutes les plateformes.
+    
+    La collecte est répartie en un groupe de sous-tâches (une par plateforme
+    et région), réparties entre les workers et relancées indépendamment ;
+    chacune ingère ses tendances, puis un callback de chord agrège leurs
+    statistiques.
+    
+    Une seule collecte est en cours à la fois : le bail est conservé jusqu'au
+    callback du chord, prolongé par chaque sous-tâche, et les déclenchements
+    survenus entre-temps sont fusionnés en une seule relance.
+    """
+    lease = current_lease()
+    lease_token = lease.token if lease else None
     try:
-        # Initialise le gestionnaire avec les configurations
-        manager = CollectorManager({
-            'tiktok': os.environ.get('TIKTOK_API_KEY'),
-            'youtube': os.environ.get('YOUTUBE_API_KEY'),
-            'instagram': os.environ.get('INSTAGRAM_API_KEY'),
-            'facebook': os.environ.get('FACEBOOK_API_KEY'),
-        })
+        shards = collection_shards()
+        if not shards:
+            logger.warning("Aucune plateforme configurée pour la collecte")
+            if lease:
+                release_lease(lease)
+            return {'status': 'skipped', 'shards': 0}
         
-        # Exécute la collecte de manière asynchrone
-        loop = asyncio.get_event_loop()
-        loop.run_until_complete(manager.update_database())
+        header = group(
+            collect_platform_trends.s(lease_token=lease_token, **shard).set(
+                routing_key=f"collectors.{shard['platform']}"
+            )
+            for shard in shards
+        )
+        result = chord(header)(persist_collected_trends.s(lease_token=lease_token))
         
-        return {'status': 'success', 'timestamp': datetime.utcnow().isoformat()}
+        logger.info(f"Collecte répartie en {len(shards)} sous-tâches")
+        return {
+            'status': 'dispatched',
+            'shards': len(shards),
+            'chord_id': result.id,
+            'timestamp': datetime.utcnow().isoformat()
+        }
         
     except Exception as e:
+        if lease:
+            release_lease(lease)
         logger.error(f"Erreur lors de la collecte des tendances: {str(e)}")
         raise
 
 @shared_task(
+    bind=True,
+    name='app.tasks.collectors.collect_platform_trends',
+    queue='collectors',
+    max_retries=3,
+    default_retry_delay=60,
+)
+def collect_platform_trends(
+    self,
+    platform: str,
+    region: Optional[str] = None,
+    lease_token: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Collecte et ingère les tendances d'une plateforme (et d'une région).
+    
+    Les tendances passent directement par le pipeline d'ingestion
+    (normalisation, enrichissement, enregistrement par lots) : seules les
+    statistiques transitent par le backend de résultats.
+    Les échecs sont relancés pour cette sous-tâche seulement ; l'upsert
+    étant idempotent, une relance après un enregistrement partiel est sans
+    risque. Après la dernière tentative, la sous-tâche renvoie un statut
+    d'échec pour que le chord se termine tout de même.
+    """
+    # La collecte d'ensemble est toujours en cours : prolonge son bail
+    extend_lease('collect_all_trends', lease_token, COLLECT_LEASE_TTL)
+    
+    params = {'region': region} if region else {}
+    try:
+        trends = runtime.iterate(runtime.collector_manager().iter_platform(platform, **params))
+        return {'platform': platform, 'region': region, **IngestPipeline().run(trends)}
+        
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=self.default_retry_delay * 2 ** self.request.retries)
+        logger.error(f"Abandon de la collecte {platform} {region or ''}: {str(e)}")
+        return {'platform': platform, 'region': region, 'status': 'failed'}
+
+@shared_task(
+    name='app.tasks.collectors.persist_collected_trends',
+    queue='collectors',
+)
+def persist_collected_trends(results: List[Any], lease_token: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Callback du chord : agrège les statistiques d'ingestion des sous-tâches,
+    puis libère le bail de la collecte.
+    
+    Les résultats sous forme de listes de tendances (sous-tâches lancées
+    avant le passage au pipeline d'ingestion) sont ingérés ici.
+    """
+    try:
+        totals = {'inserted': 0, 'updated': 0, 'rejected': 0, 'failed_shards': 0}
+        for result in results:
+            if isinstance(result, list):
+                result = IngestPipeline().run(result)
+            result = result or {}
+            if result.get('status') == 'failed':
+                totals['failed_shards'] += 1
+            for key in ('inserted', 'updated', 'rejected'):
+                totals[key] += result.get(key, 0)
+        
+        logger.info(
+            f"Collecte terminée: {totals['inserted']} tendances insérées, "
+            f"{totals['updated']} mises à jour, {totals['failed_shards']} sous-tâches en échec"
+        )
+        return {
+            'status': 'success',
+            **totals,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+        
+    finally:
+        if lease_token:
+            try:
+                release_lease(
+                    TaskLease('collect_all_trends', COLLECT_LEASE_TTL, lease_token),
+                    rerun=collect_all_trends.apply_async,
+                )
+            except Exception as e:
+                logger.warning(f"Impossible de libérer le bail de collecte: {str(e)}")
+
+@shared_task(
+    bind=True,
     name='app.tasks.collectors.update_metrics',
     queue='metrics',
     rate_limit='100/m',
 )
-def update_metrics():
-    """Met à jour les métriques en temps réel des tendances actives."""
+@single_instance('update_metrics', ttl=METRICS_LEASE_TTL, policy='skip')
+def update_metrics(self, chunk_size: int = 1000):
+    """
+    Met à jour les métriques en temps réel des tendances actives.
+    
+    Les tendances des dernières 24h sont parcourues par pages de `chunk_size`
+    (pagination par id, colonnes utiles uniquement). Pour chaque page, les
+    métriques sont récupérées en masse auprès de chaque plateforme, puis
+    écrites par un UPDATE groupé validé aussitôt : la mémoire reste constante
+    et les verrous ne sont tenus que le temps d'une page.
+    
+    Une exécution qui déborde sur la suivante garde la main : les
+    déclenchements concurrents sont ignorés.
+    """
     try:
-        # Récupère les tendances actives des dernières 24h
-        active_trends = Trend.query.filter(
-            Trend.detected_at >= datetime.utcnow() - timedelta(days=1)
-        ).all()
-        
-        manager = CollectorManager({
-            'tiktok': os.environ.get('TIKTOK_API_KEY'),
-            'youtube': os.environ.get('YOUTUBE_API_KEY'),
-            'instagram': os.environ.get('INSTAGRAM_API_KEY'),
-            'facebook': os.environ.get('FACEBOOK_API_KEY'),
-        })
-        
-        # Met à jour chaque tendance
-        updated_count = 0
-        for trend in active_trends:
-            try:
-                # Récupère les nouvelles métriques
-                loop = asyncio.get_event_loop()
-                collector = manager.collectors.get(trend.platform)
-                if collector:
-                    metrics = loop.run_until_complete(
-                        collector.get_engagement_metrics(trend.id)
-                    )
-                    
-                    # Met à jour les métriques
-                    trend.engagement = metrics.get('engagement', trend.engagement)
-                    trend.growth_rate = metrics.get('growth_rate', trend.growth_rate)
-                    updated_count += 1
-                    
-            except Exception as e:
-                logger.error(f"Erreur lors de la mise à jour de la tendance {trend.id}: {str(e)}")
-                continue
+        manager = runtime.collector_manager()
+        platforms = list(manager.collectors)
+        
+        base_stmt = select(
+            Trend.id, Trend.platform, Trend.content_id
+        ).where(
+            Trend.detected_at >= datetime.utcnow() - timedelta(days=1),
+            Trend.content_id.isnot(None),
+            Trend.platform.in_(platforms),
+        ).order_by(Trend.id).limit(chunk_size)
         
-        # Sauvegarde les modifications
-        try:
-            db.session.commit()
-            logger.info(f"Métriques mises à jour pour {updated_count} tendances")
+        updated_count = 0
+        failed_count = 0
+        last_id = 0
+        while True:
+            chunk = db.session.execute(base_stmt.where(Trend.id > last_id)).all()
+            if not chunk:
+                break
+            last_id = chunk[-1].id
             
-        except Exception as e:
-            db.session.rollback()
-            logger.error(f"Erreur lors de la sauvegarde des métriques: {str(e)}")
-            raise
+            updated, failed = _refresh_metrics_chunk(manager, chunk)
+            updated_count += updated
+            failed_count += failed
         
+        logger.info(
+            f"Métriques mises à jour pour {updated_count} tendances "
+            f"({failed_count} sans métriques)"
+        )
         return {
             'status': 'success',
             'updated_count': updated_count,
+            'failed_count': failed_count,
             'timestamp': datetime.utcnow().isoformat()
         }
         
@@ -96,24 +234,120 @@ def update_metrics():
         logger.error(f"Erreur lors de la mise à jour des métriques: {str(e)}")
         raise
 
+def _update_columns(update_row: Dict[str, Any]) -> Tuple[str, ...]:
+    """Colonnes renseignées d'une mise à jour, clé de regroupement des UPDATE."""
+    return tuple(sorted(update_row))
+
+def _refresh_metrics_chunk(manager, rows) -> Tuple[int, int]:
+    """Rafraîchit et enregistre les métriques d'un lot de tendances (id, platform, content_id)."""
+    by_platform = {}
+    for row in rows:
+        by_platform.setdefault(row.platform, []).append(row)
+    
+    # Une requête groupée par plateforme, toutes exécutées en parallèle
+    results = runtime.run_batch([
+        manager.collectors[platform].get_engagement_metrics_batch(
+            list({row.content_id for row in group})
+        )
+        for platform, group in by_platform.items()
+    ])
+    
+    updates = []
+    failed = 0
+    for (platform, group), metrics in zip(by_platform.items(), results):
+        if isinstance(metrics, Exception):
+            logger.error(f"Erreur lors de la récupération des métriques {platform}: {str(metrics)}")
+            failed += len(group)
+            continue
+        
+        for row in group:
+            content_metrics = metrics.get(row.content_id)
+            if not content_metrics:
+                failed += 1
+                continue
+            
+            update_row = {'id': row.id}
+            engagement = content_metrics.get('engagement', content_metrics.get('engagement_count'))
+            if engagement is not None:
+                update_row['engagement'] = engagement
+            if content_metrics.get('growth_rate') is not None:
+                update_row['growth_rate'] = content_metrics['growth_rate']
+            if len(update_row) > 1:
+                updates.append(update_row)
+    
+    try:
+        if updates:
+            # UPDATE groupé par clé primaire, un executemany par jeu de colonnes
+            for _, group in groupby(sorted(updates, key=_update_columns), key=_update_columns):
+                db.session.execute(update(Trend), list(group))
+        # Valide aussi les pages sans mise à jour pour clore la transaction de lecture
+        db.session.commit()
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Erreur lors de la sauvegarde des métriques: {str(e)}")
+        raise
+    
+    return len(updates), failed
+
 @shared_task(
     name='app.tasks.collectors.clean_old_trends',
     queue='collectors',
 )
-def clean_old_trends():
-    """Nettoie les anciennes tendances de la base de données."""
+def clean_old_trends(
+    days: Optional[int] = None,
+    archive_dir: Optional[str] = None,
+    archive_format: Optional[str] = None,
+    chunk_size: int = 10000,
+):
+    """
+    Nettoie les anciennes tendances de la base de données.
+    
+    Sur PostgreSQL, les partitions entièrement expirées sont supprimées en
+    bloc ; les lignes restantes sont supprimées par tranches d'identifiants,
+    une transaction par tranche. Si un répertoire d'archive est configuré
+    (argument ou TREND_ARCHIVE_DIR), les lignes sont d'abord archivées en
+    fichiers compressés partitionnés par jour.
+    
+    Args:
+        days: Durée de rétention en jours (TREND_RETENTION_DAYS, 30 par défaut)
+        archive_dir: Répertoire d'archive (TREND_ARCHIVE_DIR)
+        archive_format: jsonl.zst, jsonl.gz ou parquet (TREND_ARCHIVE_FORMAT)
+        chunk_size: Nombre d'identifiants par tranche
+    """
     try:
-        # Supprime les tendances de plus de 30 jours
-        cutoff_date = datetime.utcnow() - timedelta(days=30)
+        if days is None:
+            days = int(os.environ.get('TREND_RETENTION_DAYS', 30))
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        archive_dir = archive_dir or os.environ.get('TREND_ARCHIVE_DIR')
+        archiver = TrendArchiver(
+            archive_dir, archive_format or os.environ.get('TREND_ARCHIVE_FORMAT', 'jsonl.zst')
+        ) if archive_dir else None
+        table = Trend.__table__
         
-        deleted = Trend.query.filter(
-            Trend.detected_at < cutoff_date
-        ).delete()
+        dropped = {'partitions': [], 'deleted': 0, 'archived': 0, 'elapsed': 0.0}
+        if is_partitioned(db.session, table.name):
+            dropped = drop_expired_partitions(db.session, table, cutoff_date, chunk_size, archiver)
         
-        db.session.commit()
+        purged = purge_expired(db.session, table, cutoff_date, chunk_size, archiver)
         
-        logger.info(f"Nettoyage terminé: {deleted} tendances supprimées")
-        return {'deleted_count': deleted}
+        deleted = dropped['deleted'] + purged['deleted']
+        elapsed = dropped['elapsed'] + purged['elapsed']
+        rows_per_second = deleted / elapsed if elapsed else 0.0
+        
+        logger.info(
+            f"Nettoyage terminé: {deleted} tendances supprimées "
+            f"({len(dropped['partitions'])} partitions, {purged['chunks']} tranches) "
+            f"en {elapsed:.2f}s, soit {rows_per_second:.0f} lignes/s"
+        )
+        return {
+            'deleted_count': deleted,
+            'archived_count': dropped['archived'] + purged['archived'],
+            'dropped_partitions': dropped['partitions'],
+            'chunks': purged['chunks'],
+            'elapsed': elapsed,
+            'rows_per_second': rows_per_second,
+        }
         
     except Exception as e:
         db.session.rollback()
@@ -0,0 +1,231 @@
+from typing import Any, Callable, Dict, Optional
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'task-guard'
+
+# Suppression / prolongation conditionnées au jeton : un worker dont le bail
+# a expiré ne peut ni libérer ni prolonger le bail repris par un autre
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+EXTEND_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_client = None
+_client_pid = None
+
+def get_redis():
+    """Client Redis du processus (REDIS_URL, sinon le broker Celery)."""
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        import redis
+        url = os.environ.get('REDIS_URL') or os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+        _client = redis.Redis.from_url(url)
+        _client_pid = os.getpid()
+    return _client
+
+def record_event(name: str, event: str, client=None) -> None:
+    """Comptabilise un événement de garde (exécutée, ignorée, fusionnée, en conflit...)."""
+    logger.info(f"Tâche {name}: {event}")
+    try:
+        (client or get_redis()).hincrby(f'{KEY_PREFIX}:metrics', f'{name}:{event}', 1)
+    except Exception as e:
+        logger.warning(f"Impossible d'enregistrer la métrique {name}:{event}: {str(e)}")
+
+def guard_metrics(client=None) -> Dict[str, Dict[str, int]]:
+    """Compteurs par tâche : {'update_metrics': {'acquired': 12, 'skipped': 3, ...}}."""
+    metrics: Dict[str, Dict[str, int]] = {}
+    for field, value in (client or get_redis()).hgetall(f'{KEY_PREFIX}:metrics').items():
+        field = field.decode() if isinstance(field, bytes) else field
+        name, _, event = field.rpartition(':')
+        metrics.setdefault(name, {})[event] = int(value)
+    return metrics
+
+class TaskLease:
+    """
+    Bail Redis exclusif sur une tâche planifiée.
+
+    Le bail est une clé `SET NX PX` portant un jeton aléatoire ; il expire de
+    lui-même si le worker disparaît. `keep_alive` le prolonge en tâche de fond
+    tant que l'exécution dure.
+    """
+
+    def __init__(self, name: str, ttl: float = 300, token: Optional[str] = None, client=None):
+        """
+        Args:
+            name: Nom de la tâche protégée
+            ttl: Durée du bail en secondes
+            token: Jeton d'un bail existant (pour le prolonger ou le libérer ailleurs)
+            client: Client Redis (celui du processus par défaut)
+        """
+        self.name = name
+        self.ttl = ttl
+        self.token = token or uuid.uuid4().hex
+        self.client = client or get_redis()
+        self.key = f'{KEY_PREFIX}:lease:{name}'
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def acquire(self) -> bool:
+        return bool(self.client.set(self.key, self.token, nx=True, px=int(self.ttl * 1000)))
+
+    def extend(self, ttl: Optional[float] = None) -> bool:
+        """Prolonge le bail s'il est toujours détenu."""
+        ttl = ttl or self.ttl
+        return bool(self.client.eval(EXTEND_SCRIPT, 1, self.key, self.token, int(ttl * 1000)))
+
+    def release(self) -> bool:
+        """Libère le bail s'il est toujours détenu."""
+        self.stop_keep_alive()
+        return bool(self.client.eval(RELEASE_SCRIPT, 1, self.key, self.token))
+
+    def keep_alive(self, interval: Optional[float] = None) -> 'TaskLease':
+        """Prolonge le bail toutes les `interval` secondes (ttl / 3 par défaut)."""
+        interval = interval or self.ttl / 3
+
+        def renew():
+            while not self._stop.wait(interval):
+                try:
+                    if not self.extend():
+                        self.lost = True
+                        record_event(self.name, 'lease_lost', self.client)
+                        return
+                except Exception as e:
+                    logger.warning(f"Échec de la prolongation du bail {self.name}: {str(e)}")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=renew, name=f'lease-{self.name}', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop_keep_alive(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+def release_lease(lease: TaskLease, rerun: Optional[Callable[[], Any]] = None) -> None:
+    """
+    Libère un bail ; si des appels ont été fusionnés pendant qu'il était
+    détenu, relance la tâche une seule fois via `rerun`.
+    """
+    lease.release()
+    if rerun is not None and lease.client.delete(f'{KEY_PREFIX}:pending:{lease.name}'):
+        rerun()
+        record_event(lease.name, 'rerun', lease.client)
+
+_current_lease: contextvars.ContextVar[Optional[TaskLease]] = contextvars.ContextVar(
+    'current_lease', default=None
+)
+
+def current_lease() -> Optional[TaskLease]:
+    """Bail de la tâche gardée en cours d'exécution (None hors garde)."""
+    return _current_lease.get()
+
+def single_instance(
+    name: str,
+    ttl: float = 300,
+    policy: str = 'skip',
+    done_ttl: float = 86400,
+    hold: bool = False,
+) -> Callable:
+    """
+    Empêche les exécutions concurrentes d'une tâche planifiée.
+
+    À utiliser sous `@shared_task(bind=True, ...)`. Avant l'exécution :
+    - un message déjà traité (même identifiant de tâche, redélivré après
+      `task_acks_late`) est ignoré grâce à une clé d'idempotence ;
+    - si une autre exécution détient le bail, l'appel est ignoré (`skip`)
+      ou fusionné (`coalesce`) : une seule relance est alors planifiée à la
+      fin de l'exécution en cours, quel que soit le nombre d'appels fusionnés.
+    Le bail est prolongé en tâche de fond pendant l'exécution. Avec
+    `hold=True`, il n'est pas libéré au retour : la tâche transmet son jeton
+    (voir `current_lease`) à la suite du traitement, qui le prolonge puis le
+    libère avec `release_lease`.
+    Si Redis est indisponible, la tâche s'exécute sans garde.
+
+    Args:
+        name: Nom du bail et des métriques
+        ttl: Durée du bail en secondes
+        policy: 'skip' ou 'coalesce'
+        done_ttl: Durée de conservation des clés d'idempotence
+        hold: Conserver le bail après le retour de la tâche
+    """
+    if policy not in ('skip', 'coalesce'):
+        raise ValueError(f"Politique inconnue: {policy}")
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(task, *args, **kwargs):
+            task_id = getattr(task.request, 'id', None)
+            try:
+                client = get_redis()
+                done_key = f'{KEY_PREFIX}:done:{name}:{task_id}' if task_id else None
+                if done_key and client.exists(done_key):
+                    record_event(name, 'duplicate', client)
+                    return {'status': 'skipped', 'reason': 'duplicate', 'task_id': task_id}
+
+                lease = TaskLease(name, ttl, client=client)
+                if not lease.acquire():
+                    record_event(name, 'contended', client)
+                    if policy == 'coalesce':
+                        client.set(f'{KEY_PREFIX}:pending:{name}', task_id or '1', ex=int(ttl))
+                        record_event(name, 'coalesced', client)
+                        return {'status': 'coalesced', 'task_id': task_id}
+                    record_event(name, 'skipped', client)
+                    return {'status': 'skipped', 'reason': 'running', 'task_id': task_id}
+
+            except Exception as e:
+                logger.warning(f"Garde Redis indisponible pour {name}, exécution sans verrou: {str(e)}")
+                record_event(name, 'unguarded')
+                return func(task, *args, **kwargs)
+
+            record_event(name, 'acquired', client)
+            started = time.perf_counter()
+            lease.keep_alive()
+            reset = _current_lease.set(lease)
+            try:
+                result = func(task, *args, **kwargs)
+                if done_key:
+                    client.set(done_key, '1', ex=int(done_ttl))
+                return result
+
+            finally:
+                _current_lease.reset(reset)
+                lease.stop_keep_alive()
+                logger.info(f"Tâche {name} terminée en {time.perf_counter() - started:.1f}s")
+                if not hold:
+                    rerun = None
+                    if policy == 'coalesce':
+                        rerun = lambda: task.apply_async(args=args, kwargs=kwargs)
+                    release_lease(lease, rerun)
+
+        return wrapper
+
+    return decorator
+
+def extend_lease(name: str, token: Optional[str], ttl: float) -> bool:
+    """Prolonge, depuis une autre tâche, un bail transmis par son jeton."""
+    if not token:
+        return False
+    try:
+        return TaskLease(name, ttl, token).extend()
+    except Exception as e:
+        logger.warning(f"Échec de la prolongation du bail {name}: {str(e)}")
+        return False
@@ -0,0 +1,189 @@
+from typing import (
+    Any, AsyncIterable, Awaitable, Callable, Coroutine, Dict, Iterable, Iterator, List, Optional, TypeVar
+)
+import asyncio
+import logging
+import os
+import threading
+from celery.signals import worker_process_init, worker_process_shutdown
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Plateformes dont les clés API sont lues dans l'environnement
+COLLECTOR_PLATFORMS = ('tiktok', 'youtube', 'instagram', 'facebook')
+
+def collector_config() -> Dict[str, Optional[str]]:
+    """Construit la configuration des collecteurs depuis l'environnement."""
+    return {
+        platform: os.environ.get(f'{platform.upper()}_API_KEY')
+        for platform in COLLECTOR_PLATFORMS
+    }
+
+class AsyncRuntime:
+    """
+    Boucle d'événements persistante pour les tâches Celery asynchrones.
+
+    Une boucle unique tourne dans un thread dédié pendant toute la vie du
+    processus worker. Les tâches (synchrones) y soumettent leurs coroutines ;
+    le gestionnaire de collecteurs et la session HTTP (pool de connexions)
+    sont créés une fois puis réutilisés d'une tâche à l'autre.
+    """
+
+    def __init__(self, connection_limit: int = 100):
+        self.connection_limit = connection_limit
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._http_session = None
+        self._manager = None
+
+    @property
+    def running(self) -> bool:
+        return self.loop is not None and self._pid == os.getpid() and self.loop.is_running()
+
+    def start(self) -> None:
+        """Démarre la boucle (une seule fois par processus)."""
+        with self._lock:
+            if self.running:
+                return
+            # Un processus issu d'un fork hérite d'un état inutilisable
+            self._http_session = None
+            self._manager = None
+
+            self.loop = asyncio.new_event_loop()
+            self._pid = os.getpid()
+            started = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(self.loop)
+                self.loop.call_soon(started.set)
+                self.loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name='async-runtime', daemon=True)
+            self._thread.start()
+            started.wait()
+            logger.info(f"Boucle asynchrone démarrée pour le processus {self._pid}")
+
+    def stop(self) -> None:
+        """Ferme les ressources partagées puis arrête la boucle."""
+        with self._lock:
+            if not self.running:
+                return
+            if self._http_session is not None:
+                asyncio.run_coroutine_threadsafe(self._http_session.close(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self.loop.close()
+            self.loop = None
+            self._thread = None
+            self._http_session = None
+            self._manager = None
+            logger.info(f"Boucle asynchrone arrêtée pour le processus {os.getpid()}")
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Exécute une coroutine sur la boucle du worker et attend son résultat."""
+        if not self.running:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def run_batch(
+        self,
+        coros: Iterable[Awaitable[T]],
+        concurrency: int = 50,
+        timeout: Optional[float] = None,
+    ) -> List[Any]:
+        """
+        Exécute un lot de coroutines en parallèle, avec au plus `concurrency`
+        en vol simultanément.
+
+        Returns:
+            Résultats dans l'ordre de soumission ; une coroutine en échec
+            produit son exception au lieu de la faire remonter.
+        """
+        async def bounded_gather():
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def bounded(coro):
+                async with semaphore:
+                    return await coro
+
+            return await asyncio.gather(*(bounded(c) for c in coros), return_exceptions=True)
+
+        return self.run(bounded_gather(), timeout)
+
+    def map(
+        self,
+        func: Callable[[Any], Awaitable[T]],
+        items: Iterable[Any],
+        concurrency: int = 50,
+        timeout: Optional[float] = None,
+    ) -> List[Any]:
+        """Applique une fonction asynchrone à chaque élément (voir `run_batch`)."""
+        return self.run_batch((func(item) for item in items), concurrency, timeout)
+
+    def iterate(
+        self,
+        items: AsyncIterable[T],
+        prefetch: int = 100,
+        timeout: Optional[float] = None,
+    ) -> Iterator[T]:
+        """
+        Parcourt un itérateur asynchrone depuis du code synchrone.
+        
+        Les éléments sont tirés sur la boucle par paquets de `prefetch`, et
+        seulement quand le consommateur les demande : une étape lente en aval
+        ralentit d'autant la source.
+        """
+        iterator = items.__aiter__()
+        
+        async def next_chunk():
+            chunk = []
+            try:
+                while len(chunk) < prefetch:
+                    chunk.append(await iterator.__anext__())
+            except StopAsyncIteration:
+                return chunk, True
+            return chunk, False
+        
+        finished = False
+        try:
+            while not finished:
+                chunk, finished = self.run(next_chunk(), timeout)
+                yield from chunk
+        finally:
+            if not finished and hasattr(iterator, 'aclose'):
+                self.run(iterator.aclose(), timeout)
+
+    def http_session(self):
+        """Session aiohttp partagée, créée sur la boucle du worker au premier appel."""
+        if self._http_session is None or self._http_session.closed:
+            import aiohttp
+
+            async def create_session():
+                return aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=self.connection_limit)
+                )
+
+            self._http_session = self.run(create_session())
+        return self._http_session
+
+    def collector_manager(self):
+        """Gestionnaire de collecteurs partagé pendant la vie du worker."""
+        if self._manager is None:
+            from app.collectors.manager import CollectorManager
+            self._manager = CollectorManager(collector_config(), self.http_session())
+        return self._manager
+
+# Instance unique par processus worker
+runtime = AsyncRuntime()
+
+@worker_process_init.connect
+def start_runtime(**kwargs):
+    runtime.start()
+
+@worker_process_shutdown.connect
+def stop_runtime(**kwargs):
+    runtime.stop()
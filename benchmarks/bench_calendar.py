@@ -0,0 +1,63 @@
+"""
+Microbenchmark de la génération de calendriers (app.analytics.calendar_engine) :
+l'ancienne boucle (trois `np.random.choice` par créneau, un créateur à la
+fois) face au moteur vectorisé, pour un trimestre.
+
+L'ancienne boucle est mesurée sur un échantillon de créateurs et ramenée
+au même nombre de calendriers.
+
+Usage : python benchmarks/bench_calendar.py [nombre_de_créateurs]
+"""
+import os
+import sys
+import time
+from datetime import date, timedelta
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from app.analytics.calendar_engine import DEFAULT_POSTING_HOURS, CalendarEngine
+
+DAYS = 91
+TOPICS = ['Python', 'AI', 'Web Development', 'Data', 'Cloud']
+
+def legacy_calendar(topics, frequency, start):
+    """Ancienne implémentation de PerformanceAnalyzer.generate_content_calendar."""
+    calendar = []
+    for i in range(DAYS):
+        current_date = start + timedelta(days=i)
+        for hour in DEFAULT_POSTING_HOURS[current_date.strftime('%A')][:frequency]:
+            topic = np.random.choice(topics)
+            platform = np.random.choice(['youtube', 'tiktok', 'instagram'])
+            content_type = np.random.choice(['tutorial', 'review', 'story'])
+            calendar.append({
+                'date': current_date.strftime('%Y-%m-%d'),
+                'time': f"{hour:02d}:00",
+                'topic': topic,
+                'platform': platform,
+                'content_type': content_type,
+                'suggested_hashtags': [f"#{topic.lower().replace(' ', '')}", "#content", f"#{platform}"]
+            })
+    return calendar
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    start = date(2024, 1, 1)
+    rng = np.random.default_rng(0)
+    creators = [
+        {'user_id': i, 'topics': dict(zip(TOPICS, rng.random(len(TOPICS)))), 'frequency': 3}
+        for i in range(n)
+    ]
+
+    sample = min(n, 200)
+    begin = time.perf_counter()
+    for creator in creators[:sample]:
+        legacy_calendar(list(creator['topics']), 3, start)
+    legacy = (time.perf_counter() - begin) * n / sample
+
+    begin = time.perf_counter()
+    entries = sum(len(c['entries']) for c in CalendarEngine(seed=0).iter_calendars(creators, start, DAYS))
+    elapsed = time.perf_counter() - begin
+
+    print(f"{n:,} créateurs × {DAYS} jours, {entries:,} publications")
+    print(f"{'boucle (extrapolée)':>22} {legacy:>8.2f}s")
+    print(f"{'moteur vectorisé':>22} {elapsed:>8.2f}s {entries / elapsed:>14,.0f} publications/s")
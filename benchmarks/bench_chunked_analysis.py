@@ -0,0 +1,87 @@
+"""
+Benchmark mémoire de l'analyse de fenêtre (agrégats SQL de
+services.trend_queries et corrélations par lots de app.analytics.chunked)
+face au chargement complet de la fenêtre dans un DataFrame.
+
+Les tendances sont écrites dans une base SQLite temporaire, puis analysées
+des deux façons ; le pic d'allocation (tracemalloc) de l'analyse par lots
+doit rester constant quand le volume augmente.
+
+Usage : python benchmarks/bench_chunked_analysis.py [volume ...]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from app.models.trend import Trend
+from app.analytics.chunked import analyze_trend_window
+from app.services.trend_queries import platform_performance
+from app.tasks.analysis import TREND_COLUMNS, analyze_correlations, analyze_platform_performance
+
+PLATFORMS = ['tiktok', 'youtube', 'instagram', 'facebook']
+
+def make_table(path: str, n: int, seed: int = 42):
+    table = Trend.__table__
+    engine = create_engine(f'sqlite:///{path}')
+    table.create(engine)
+
+    rng = np.random.default_rng(seed)
+    with engine.begin() as connection:
+        for start in range(0, n, 100_000):
+            size = min(100_000, n - start)
+            connection.execute(table.insert(), pd.DataFrame({
+                'id': np.arange(start + 1, start + size + 1),
+                'platform': rng.choice(PLATFORMS, size),
+                'keyword': [f'keyword-{i}' for i in range(start, start + size)],
+                'volume': rng.integers(0, 1_000_000, size),
+                'engagement': rng.integers(0, 100_000, size),
+                'growth_rate': rng.random(size),
+                'sentiment_score': rng.uniform(-1, 1, size),
+            }).to_dict('records'))
+    return engine, table
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+def run(n: int):
+    with tempfile.TemporaryDirectory() as directory:
+        engine, table = make_table(os.path.join(directory, 'trends.db'), n)
+
+        def full():
+            with Session(engine) as session:
+                rows = session.execute(select(*(table.c[c] for c in TREND_COLUMNS))).all()
+                df = pd.DataFrame.from_records(rows, columns=list(TREND_COLUMNS))
+                analyze_platform_performance(df)
+                analyze_correlations(df)
+
+        def chunked():
+            with Session(engine) as session:
+                platform_performance(session, table=table)
+                analyze_trend_window(session, table=table).correlation_analysis()
+
+        results = {'dataframe': measure(full), 'chunked': measure(chunked)}
+        engine.dispose()
+        return results
+
+if __name__ == '__main__':
+    volumes = [int(v) for v in sys.argv[1:]] or [100_000, 500_000, 1_000_000]
+
+    print(f"{'tendances':>10} {'DataFrame':>20} {'par lots':>20}")
+    for n in volumes:
+        results = run(n)
+        print(f'{n:>10} ' + ' '.join(
+            f'{elapsed:>7.2f}s {peak:>8.1f} Mo' for elapsed, peak in results.values()
+        ))
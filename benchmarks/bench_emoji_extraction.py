@@ -0,0 +1,62 @@
+"""
+Microbenchmark de l'extraction d'emojis (app.analytics.emojis) face au
+parcours caractère par caractère de emoji.EMOJI_DATA utilisé auparavant
+par SentimentAnalyzer.
+
+Les commentaires mêlent texte anglais, français et chinois, emojis
+simples, '❤️', teintes de peau et séquences ZWJ.
+
+Usage : python benchmarks/bench_emoji_extraction.py [nombre_de_commentaires]
+"""
+import os
+import sys
+import time
+import random
+import emoji
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from app.analytics.emojis import extract_emojis
+
+TEMPLATES = [
+    "This is amazing! {e} Love your content!",
+    "Vidéo n°{n} vraiment top {e}{e}",
+    "first",
+    "这个视频太棒了 {e}",
+    "Not really helpful... {e}",
+    "Great tutorial, very clear explanation for beginners",
+]
+EMOJIS = ['❤️', '🔥', '😂', '👍🏽', '👨‍👩‍👧', '💯', '😢', '🇫🇷']
+
+def make_comments(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES).format(n=i, e=rng.choice(EMOJIS))
+        for i in range(n)
+    ]
+
+def char_scan(text: str):
+    return [c for c in text if c in emoji.EMOJI_DATA]
+
+def measure(func, comments):
+    start = time.perf_counter()
+    found = 0
+    hearts = 0
+    for text in comments:
+        emojis = func(text)
+        found += len(emojis)
+        hearts += emojis.count('❤️')
+    return time.perf_counter() - start, found, hearts
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    comments = make_comments(n)
+
+    # Auparavant, analyze_comments parcourait chaque commentaire deux fois
+    # (statistiques d'emojis puis _get_sentiment) ; désormais une seule
+    print(f"{'méthode':>16} {'temps':>9} {'commentaires/s':>15} {'emojis':>9} {'❤️':>8} {'analyse':>9}")
+    for name, func, scans in (('caractère', char_scan, 2), ('trie + regex', extract_emojis, 1)):
+        elapsed, found, hearts = measure(func, comments)
+        print(
+            f'{name:>16} {elapsed:>8.2f}s {n / elapsed:>15,.0f} {found:>9} {hearts:>8}'
+            f' {elapsed * scans:>8.2f}s'
+        )
@@ -0,0 +1,65 @@
+"""
+Benchmark de mise à l'échelle de l'analyse globale des tendances
+(app.tasks.analysis), hors accès à la base de données.
+
+Mesure chaque étape du pipeline de analyze_global_trends pour plusieurs
+volumes de tendances ; le temps par tendance doit rester à peu près
+constant (complexité quasi linéaire).
+
+Usage : python benchmarks/bench_global_analysis.py [volume ...]
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from app.tasks.analysis import (
+    TREND_COLUMNS, analyze_correlations, analyze_platform_performance,
+    predict_trend_evolution, segment_trends, segment_updates
+)
+
+PLATFORMS = ['tiktok', 'youtube', 'instagram', 'facebook']
+
+def make_frame(n: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'platform': rng.choice(PLATFORMS, n),
+        'keyword': [f'keyword-{i}' for i in range(n)],
+        'volume': rng.integers(0, 1_000_000, n),
+        'engagement': rng.integers(0, 100_000, n),
+        'growth_rate': rng.random(n),
+        'sentiment_score': rng.uniform(-1, 1, n),
+    }, columns=TREND_COLUMNS)
+
+def run(n: int):
+    df = make_frame(n)
+    timings = {}
+
+    def step(name, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        timings[name] = time.perf_counter() - start
+        return result
+
+    step('platforms', analyze_platform_performance, df)
+    segments = step('segments', segment_trends, df)
+    step('correlations', analyze_correlations, df)
+    step('predictions', predict_trend_evolution, df)
+    step('write_back', segment_updates, segments)
+    return timings
+
+if __name__ == '__main__':
+    volumes = [int(v) for v in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    steps = ['platforms', 'segments', 'correlations', 'predictions', 'write_back']
+
+    print(f"{'tendances':>10} " + ' '.join(f'{s:>12}' for s in steps) + f" {'total':>9} {'µs/tendance':>12}")
+    for n in volumes:
+        timings = run(n)
+        total = sum(timings.values())
+        print(
+            f'{n:>10} ' + ' '.join(f'{timings[s]:>11.3f}s' for s in steps)
+            + f' {total:>8.2f}s {total / n * 1e6:>12.2f}'
+        )
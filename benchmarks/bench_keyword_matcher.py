@@ -0,0 +1,63 @@
+"""
+Microbenchmark de la recherche de mots-clés (app.analytics.keywords) :
+un `in` par motif, tel que le faisaient les collecteurs, face à l'automate
+d'Aho-Corasick, pour des lexiques de tailles croissantes.
+
+Le coût de la recherche directe croît avec le nombre de motifs, celui de
+l'automate non : AUTOMATON_THRESHOLD fixe le point de bascule.
+
+Usage : python benchmarks/bench_keyword_matcher.py [nombre_de_légendes]
+"""
+import os
+import sys
+import time
+import random
+import string
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from app.analytics.keywords import KeywordMatcher
+from app.collectors.base import BaseCollector
+
+WORDS = (
+    "the a video this is so i really my new tutorial about python and with friends "
+    "today check out link in bio morning coffee vibes summer travel beach food recipe "
+    "nouvelle vidéo recette été voyage plage"
+).split()
+
+def make_captions(n: int, lexicon, seed: int = 42):
+    rng = random.Random(seed)
+    return [
+        ' '.join(
+            rng.choice(lexicon) if rng.random() < 0.05 else rng.choice(WORDS)
+            for _ in range(rng.randint(5, 40))
+        ).capitalize() + ' !'
+        for _ in range(n)
+    ]
+
+def make_lexicon(size: int, seed: int = 7):
+    rng = random.Random(seed)
+    base = list(BaseCollector.positive_words + BaseCollector.negative_words)
+    extra = [
+        ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+        for _ in range(size - len(base))
+    ]
+    return base + extra
+
+def measure(func, captions):
+    start = time.perf_counter()
+    for text in captions:
+        func(text.lower())
+    return time.perf_counter() - start
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    print(f"{'motifs':>7} {'in':>8} {'automate':>9} {'légendes/s (automate)':>22}")
+    for size in (29, 64, 128, 256, 512):
+        lexicon = make_lexicon(size)
+        captions = make_captions(n, lexicon)
+        automaton = KeywordMatcher(lexicon, threshold=0)
+        direct = KeywordMatcher(lexicon, threshold=len(lexicon) + 1)
+        measure(automaton.search, captions)  # Mémorisation des suites de caractères
+        elapsed_direct = measure(direct.search, captions)
+        elapsed = measure(automaton.search, captions)
+        print(f'{size:>7} {elapsed_direct:>7.2f}s {elapsed:>8.2f}s {n / elapsed:>22,.0f}')
@@ -0,0 +1,57 @@
+"""
+Microbenchmark du moteur de sentiment lexical (app.analytics.lexicon) face
+à TextBlob : précision sur un corpus annoté (anglais, français, chinois)
+et débit sur ce corpus répété.
+
+Un texte est compté juste si le signe de sa polarité (zone neutre de
+±NEUTRAL) correspond à l'annotation : 1 positif, -1 négatif, 0 neutre.
+
+Usage : python benchmarks/bench_lexicon_sentiment.py [nombre_de_textes]
+"""
+import os
+import sys
+import json
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from app.services.sentiment_scoring import lexicon_batch, normalize_text, textblob_batch
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'data', 'sentiment_corpus.jsonl')
+NEUTRAL = 0.1
+
+def load_corpus():
+    with open(CORPUS, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def label(score: float) -> int:
+    return 1 if score > NEUTRAL else -1 if score < -NEUTRAL else 0
+
+def accuracy(scorer, corpus):
+    scores = scorer([normalize_text(row['text']) for row in corpus])
+    correct = defaultdict(int)
+    totals = defaultdict(int)
+    for row, score in zip(corpus, scores):
+        for lang in (row['lang'], 'total'):
+            totals[lang] += 1
+            correct[lang] += label(score) == row['label']
+    return {lang: correct[lang] / totals[lang] for lang in totals}
+
+def throughput(scorer, texts):
+    start = time.perf_counter()
+    scorer(texts)
+    return time.perf_counter() - start
+
+if __name__ == '__main__':
+    corpus = load_corpus()
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    texts = [normalize_text(corpus[i % len(corpus)]['text']) for i in range(n)]
+
+    print(f"{'moteur':>9} {'en':>6} {'fr':>6} {'zh':>6} {'total':>6} {'temps':>9} {'textes/s':>11}")
+    for name, scorer in (('textblob', textblob_batch), ('lexicon', lexicon_batch)):
+        scores = accuracy(scorer, corpus)
+        elapsed = throughput(scorer, texts)
+        print(
+            f"{name:>9} {scores['en']:>6.0%} {scores['fr']:>6.0%} {scores['zh']:>6.0%}"
+            f" {scores['total']:>6.0%} {elapsed:>8.2f}s {n / elapsed:>11,.0f}"
+        )
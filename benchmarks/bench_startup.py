@@ -0,0 +1,59 @@
+"""
+Benchmark du démarrage à froid de l'API et des workers Celery.
+
+Compare, dans des interpréteurs neufs, l'import des points d'entrée
+(app.main, app.tasks.*) avec l'import de toutes les dépendances que
+ces modules chargeaient auparavant dès leur import.
+
+Usage : python benchmarks/bench_startup.py [répétitions]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+ENTRY_POINTS = ['app.main', 'app.tasks.collectors', 'app.tasks.analysis']
+
+# Modules importés au chargement avant l'enregistrement paresseux des collecteurs
+EAGER_MODULES = [
+    'app.collectors.youtube', 'app.collectors.facebook', 'app.collectors.douyin',
+    'app.collectors.tiktok', 'googleapiclient.discovery',
+    'app.analytics.performance', 'app.analytics.sentiment',
+    'numpy', 'pandas', 'sklearn.cluster', 'sklearn.preprocessing', 'textblob',
+]
+
+PROBE = """
+import resource, sys, time
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+def measure(modules, repeat):
+    timings, rss = [], []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE, *modules],
+            cwd=BACKEND, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        timings.append(float(output[0]))
+        rss.append(int(output[1]))
+    return statistics.median(timings), statistics.median(rss)
+
+def main(repeat: int = 5):
+    # Premier passage pour chauffer le cache disque et les .pyc
+    measure(EAGER_MODULES + ENTRY_POINTS, 1)
+
+    results = {
+        'chargement paresseux': measure(ENTRY_POINTS, repeat),
+        'chargement immédiat': measure(EAGER_MODULES + ENTRY_POINTS, repeat),
+    }
+    for label, (elapsed, rss) in results.items():
+        print(f"{label:22s} import {elapsed * 1000:8.1f} ms   RSS max {rss / 1024:7.1f} Mo")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,46 @@
+"""
+Benchmark de l'ingestion en masse des tendances (services.trend_store).
+
+Usage : python benchmarks/bench_trend_upsert.py [nombre_de_tendances]
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from app.models.trend import Trend
+from app.services.trend_store import bulk_upsert, trend_row
+
+def make_trends(n: int, now: datetime):
+    platforms = ['youtube', 'tiktok', 'instagram', 'facebook']
+    return [
+        trend_row({
+            'platform': platforms[i % len(platforms)],
+            'keyword': f'keyword-{i}',
+            'views': i,
+            'hashtags': [f'#tag{i % 50}'],
+        }, now)
+        for i in range(n)
+    ]
+
+def main(n: int = 100_000):
+    table = Trend.__table__
+    engine = create_engine('sqlite://')
+    table.create(engine)
+    now = datetime.utcnow()
+
+    with Session(engine) as session:
+        for label, offset in [('insertion', 0), ('mise à jour', 1)]:
+            trends = make_trends(n, now + timedelta(minutes=offset))
+            start = time.perf_counter()
+            stats = bulk_upsert(session, table, trends)
+            session.commit()
+            elapsed = time.perf_counter() - start
+            print(f"{label:12s} {n:>8d} tendances en {elapsed:6.2f}s "
+                  f"({n / elapsed:,.0f} lignes/s) -> {stats}")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,55 @@
+"""
+Microbenchmark du score de viralité (app.analytics.virality) : boucle
+Python par contenu, telle que PerformanceAnalyzer.predict_virality la
+faisait, face au noyau vectorisé, en colonnes et en dictionnaires.
+
+Usage : python benchmarks/bench_virality.py [nombre_de_contenus]
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+from app.analytics.virality import CONTENT_VIRALITY
+
+def scalar_virality(content):
+    """Ancienne implémentation, un contenu à la fois."""
+    return (
+        0.4 * min(content.get('engagement_rate', 0) / 100, 1) +
+        0.2 * min(content.get('view_count', 0) / 1_000_000, 1) +
+        0.2 * min(content.get('comment_count', 0) / 10_000, 1) +
+        0.2 * min(content.get('share_count', 0) / 5_000, 1)
+    ) * 100
+
+def make_columns(n: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    return {
+        'engagement_rate': rng.gamma(2.0, 5.0, n),
+        'view_count': rng.lognormal(9, 2, n),
+        'comment_count': rng.lognormal(4, 2, n),
+        'share_count': rng.lognormal(3, 2, n),
+    }
+
+def measure(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    columns = make_columns(n)
+    records = [dict(zip(columns, values)) for values in zip(*(column.tolist() for column in columns.values()))]
+
+    elapsed_scalar, expected = measure(lambda: [scalar_virality(r) for r in records])
+    elapsed_records, from_records = measure(CONTENT_VIRALITY.score_records, records)
+    elapsed_columns, from_columns = measure(CONTENT_VIRALITY.score_columns, columns)
+    assert np.allclose(from_columns, expected) and np.allclose(from_records, expected)
+
+    print(f"{n:,} contenus")
+    for label, elapsed in (
+        ('boucle Python', elapsed_scalar),
+        ('noyau, dictionnaires', elapsed_records),
+        ('noyau, colonnes', elapsed_columns),
+    ):
+        print(f'{label:>22} {elapsed:>7.3f}s {n / elapsed:>14,.0f} contenus/s')
@@ -7,10 +7,15 @@ from aiohttp import ClientSession, ClientResponse
 from typing import List, Dict, Any, Optional
 import json
 from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 
 # Ajoute le répertoire racine au PYTHONPATH
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+# Paquet `app` des modèles (configuré par tests/config.py, prioritaire)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
 
 # Configuration des fixtures globales
 @pytest.fixture(autouse=True)
@@ -28,6 +33,26 @@ def env_setup():
     for key in ['TWITTER_API_KEY', 'LINKEDIN_API_KEY', 'TIKTOK_API_KEY', 'YOUTUBE_API_KEY', 'DOUYIN_API_KEY']:
         os.environ.pop(key, None)
 
+@pytest.fixture
+def trend_table():
+    """
+    Table `trend` du modèle Trend, créée dans une base SQLite en mémoire
+    (une seule connexion, partagée entre threads comme avec asyncio.to_thread).
+    """
+    from app.models.trend import Trend
+
+    engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+    Trend.__table__.create(engine)
+    yield engine, Trend.__table__
+    engine.dispose()
+
+@pytest.fixture
+def trend_session(trend_table):
+    """Session ouverte sur la table `trend` de test."""
+    engine, table = trend_table
+    with Session(engine) as session:
+        yield session, table
+
 class MockResponse:
     """Mock d'une réponse HTTP."""
     def __init__(self, data, status=200):
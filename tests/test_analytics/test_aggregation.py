@@ -0,0 +1,103 @@
+import pytest
+from backend.app.analytics.aggregation import TopK, TrendAggregator
+
+@pytest.fixture
+def sample_trends():
+    return [
+        {'platform': 'youtube', 'keyword': f'yt{i}', 'views': i * 10, 'type': 'music' if i % 2 else 'gaming'}
+        for i in range(25)
+    ] + [
+        {'platform': 'tiktok', 'keyword': 'tt1', 'views': 500},
+        {'platform': 'tiktok', 'keyword': 'tt2', 'views': 500, 'type': 'dance'},
+        {'platform': 'tiktok', 'keyword': 'tt3'},
+    ]
+
+def test_topk_keeps_best_items_in_order():
+    top = TopK(3, key=lambda x: x)
+    for value in [5, 1, 9, 3, 7, 9]:
+        top.push(value)
+
+    assert top.items() == [9, 9, 7]
+
+def test_aggregator_matches_sort_and_truncate(sample_trends):
+    aggregator = TrendAggregator(metric='views', k=10).consume(sample_trends)
+    stats = aggregator.platform_stats()
+
+    expected = sorted(
+        [t for t in sample_trends if t['platform'] == 'youtube'],
+        key=lambda t: t.get('views', 0),
+        reverse=True
+    )[:10]
+    assert stats['youtube']['top_trends'] == expected
+    assert stats['youtube']['total_trends'] == 25
+    assert stats['youtube']['total_engagement'] == sum(i * 10 for i in range(25))
+    assert set(stats['youtube']['categories']) == {'music', 'gaming'}
+
+    # À score égal, l'ordre d'arrivée est conservé
+    assert [t['keyword'] for t in stats['tiktok']['top_trends']] == ['tt1', 'tt2', 'tt3']
+    assert set(stats['tiktok']['categories']) == {'general', 'dance'}
+
+    assert aggregator.global_stats() == {
+        'total_trends': 28,
+        'total_engagement': sum(i * 10 for i in range(25)) + 1000,
+    }
+
+def test_aggregator_merge(sample_trends):
+    full = TrendAggregator(k=5).consume(sample_trends)
+    left = TrendAggregator(k=5).consume(sample_trends[:12])
+    right = TrendAggregator(k=5).consume(sample_trends[12:])
+
+    assert left.merge(right).platform_stats() == full.platform_stats()
+
+@pytest.mark.asyncio
+async def test_aggregator_consume_async(sample_trends):
+    async def stream():
+        for trend in sample_trends:
+            yield trend
+
+    aggregator = await TrendAggregator(k=3).consume_async(stream())
+
+    assert [t['views'] for t in aggregator.platform_stats()['youtube']['top_trends']] == [240, 230, 220]
+
+def test_space_saving_is_exact_under_capacity():
+    from collections import Counter
+    from backend.app.analytics.aggregation import SpaceSaving
+
+    items = list('abracadabra')
+    summary = SpaceSaving(capacity=10)
+    summary.update(Counter(items[:5]))
+    summary.update(Counter(items[5:]))
+
+    assert summary.exact
+    assert summary.most_common(3) == Counter(items).most_common(3)
+
+def test_space_saving_bounds_memory_and_overestimates():
+    from collections import Counter
+    from backend.app.analytics.aggregation import SpaceSaving
+
+    summary = SpaceSaving(capacity=5)
+    for start in range(0, 1000, 50):
+        summary.update(Counter(['hot'] * 10 + [f'rare{i}' for i in range(start, start + 40)]))
+
+    assert len(summary) == 5
+    assert not summary.exact
+    item, count = summary.most_common(1)[0]
+    assert item == 'hot'
+    assert 200 <= count <= 200 + summary.errors['hot']
+
+def test_aggregator_on_trend_rows():
+    # Forme de Trend.to_dict(), telle que la consomme l'API /analyze
+    rows = [
+        {'platform': 'youtube', 'keyword': 'a', 'category': 'tech', 'engagement': 3.0, 'volume': 10},
+        {'platform': 'youtube', 'keyword': 'b', 'category': None, 'engagement': 7.0, 'volume': 5},
+    ]
+    aggregator = TrendAggregator(
+        metric='engagement', k=1,
+        sum_fields={'total_engagement': 'engagement', 'total_volume': 'volume'},
+        category_field='category',
+    ).consume(rows)
+    stats = aggregator.platform_stats()['youtube']
+
+    assert stats['categories'] == ['general', 'tech']
+    assert [t['keyword'] for t in stats['top_trends']] == ['b']
+    assert aggregator.global_stats() == {'total_trends': 2, 'total_engagement': 10.0, 'total_volume': 15}
@@ -0,0 +1,65 @@
+from collections import Counter
+from datetime import date
+import numpy as np
+import pytest
+from backend.app.analytics.calendar_engine import DEFAULT_POSTING_HOURS, CalendarEngine, hour_weights
+from backend.app.analytics.heatmap import EngagementHeatmap
+
+MONDAY = date(2024, 1, 1)
+
+def creators(n, **extra):
+    return [{'user_id': i, 'topics': ['Python', 'AI'], **extra} for i in range(n)]
+
+def test_same_seed_same_calendars():
+    first = list(CalendarEngine(seed=7, chunk_size=4).iter_calendars(creators(10), MONDAY, 14))
+    second = list(CalendarEngine(seed=7, chunk_size=4).iter_calendars(creators(10), MONDAY, 14))
+    other = list(CalendarEngine(seed=8, chunk_size=4).iter_calendars(creators(10), MONDAY, 14))
+
+    assert first == second
+    assert first != other
+    assert [calendar['user_id'] for calendar in first] == list(range(10))
+
+def test_hours_follow_learned_heatmap():
+    heatmap = EngagementHeatmap()
+    heatmap.add(['2024-01-01T20:00:00Z', '2024-01-01T07:00:00Z'], [10.0, 5.0])  # Lundi
+
+    entries = CalendarEngine(seed=1).calendar(['Python'], heatmap, frequency=3, start=MONDAY, days=7)
+    by_date = Counter(entry['date'] for entry in entries)
+
+    # Lundi : seules les deux heures observées, dans l'ordre ; autres jours : horaires par défaut
+    assert [e['time'] for e in entries if e['date'] == '2024-01-01'] == ['07:00', '20:00']
+    assert [e['time'] for e in entries if e['date'] == '2024-01-02'] == [
+        f"{hour:02d}:00" for hour in DEFAULT_POSTING_HOURS['Tuesday']
+    ]
+    assert by_date['2024-01-03'] == 3
+
+def test_per_creator_frequency_topics_and_platforms():
+    batch = [
+        {'user_id': 'a', 'topics': {'rare': 1, 'common': 99}, 'frequency': 1, 'platforms': ['tiktok']},
+        {'user_id': 'b', 'topics': ['solo'], 'frequency': 2},
+    ]
+
+    a, b = CalendarEngine(seed=3).iter_calendars(batch, MONDAY, 60)
+
+    assert len(a['entries']) == 60 and len(b['entries']) == 120
+    assert {entry['platform'] for entry in a['entries']} == {'tiktok'}
+    assert Counter(entry['topic'] for entry in a['entries'])['common'] > 50
+    assert {entry['topic'] for entry in b['entries']} == {'solo'}
+    assert b['entries'][0]['suggested_hashtags'][0] == '#solo'
+
+def test_fractional_frequency_spreads_posts():
+    entries = CalendarEngine(seed=2).calendar(['Python'], frequency=3 / 7, start=MONDAY, days=28)
+    by_date = Counter(entry['date'] for entry in entries)
+
+    assert len(entries) == 12  # Trois par semaine
+    assert max(by_date.values()) == 1
+    one_and_a_half = CalendarEngine(seed=2).calendar(['Python'], frequency=1.5, start=MONDAY, days=4)
+    assert [count for _, count in sorted(Counter(e['date'] for e in one_and_a_half).items())] == [1, 2, 1, 2]
+
+def test_hour_weights_sources():
+    grid = hour_weights({'Monday': [9]})
+
+    assert grid[0].tolist() == [1.0 if hour == 9 else 0.0 for hour in range(24)]
+    assert np.flatnonzero(grid[6]).tolist() == DEFAULT_POSTING_HOURS['Sunday']
+    with pytest.raises(ValueError):
+        CalendarEngine().calendar([], days=1)
@@ -0,0 +1,66 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from backend.app.analytics.chunked import (
+    CORRELATION_FEATURES, ChunkedTrendAnalysis, iter_trend_chunks
+)
+
+def make_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    engagement = rng.lognormal(6, 1.5, n).astype(int)
+    engagement[::17] = 500  # Ex aequo dans le top
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'platform': rng.choice(['tiktok', 'youtube', 'twitter'], n),
+        'keyword': [f'kw{i}' for i in range(n)],
+        'volume': engagement * 3 + rng.integers(0, 1000, n),
+        'engagement': engagement,
+        'growth_rate': rng.normal(0, 50, n),
+        'sentiment_score': np.where(rng.random(n) < 0.2, np.nan, rng.uniform(-1, 1, n)),
+    })
+
+def assert_close(actual, expected, rel=1e-9):
+    if isinstance(expected, float) and math.isnan(expected):
+        assert math.isnan(actual)
+    else:
+        assert actual == pytest.approx(expected, rel=rel)
+
+def test_chunked_correlations_match_dataframe():
+    df = make_frame(3000)
+    analysis = ChunkedTrendAnalysis()
+    for start in range(0, len(df), 250):
+        analysis.update(df.iloc[start:start + 250])
+
+    correlations = analysis.correlation_analysis()
+    expected = df[list(CORRELATION_FEATURES)].corr()
+    for column, values in correlations['correlation_matrix'].items():
+        for row, value in values.items():
+            assert_close(value, expected.loc[row, column])
+    assert [(c['metric1'], c['metric2']) for c in correlations['significant_correlations']] == [
+        ('volume', 'engagement')
+    ]
+
+def test_merge_equals_sequential_updates():
+    df = make_frame(1000, seed=3)
+    sequential = ChunkedTrendAnalysis().update(df)
+    merged = ChunkedTrendAnalysis().update(df.iloc[:400]).merge(ChunkedTrendAnalysis().update(df.iloc[400:]))
+
+    assert merged.rows == sequential.rows
+    assert_close(
+        merged.correlation_analysis()['correlation_matrix']['volume']['engagement'],
+        sequential.correlation_analysis()['correlation_matrix']['volume']['engagement'],
+    )
+
+def test_iter_trend_chunks_pages_by_id(trend_session):
+    session, table = trend_session
+    df = make_frame(105)
+    session.execute(table.insert(), [
+        {k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in row.items()}
+        for row in df.to_dict('records')
+    ])
+
+    chunks = list(iter_trend_chunks(session, table=table, chunk_size=25))
+
+    assert [len(chunk) for chunk in chunks] == [25, 25, 25, 25, 5]
+    assert pd.concat(chunks)['id'].tolist() == df['id'].tolist()
@@ -0,0 +1,29 @@
+from backend.app.analytics.emojis import emoji_key, extract_emojis
+from backend.app.analytics.sentiment import SentimentAnalyzer
+
+def test_extract_emojis_keeps_sequences_whole():
+    text = "Top ❤️ 👍🏽 famille 👨‍👩‍👧 drapeau 🇫🇷 touche 1️⃣ fin 🔥🔥"
+
+    assert extract_emojis(text) == ['❤️', '👍🏽', '👨‍👩‍👧', '🇫🇷', '1️⃣', '🔥', '🔥']
+
+def test_extract_emojis_ignores_plain_text():
+    assert extract_emojis("Vidéo n°1 # 2024 * très 好 bien ©") == ['©']
+    assert extract_emojis("") == []
+
+def test_emoji_key_strips_variants():
+    assert emoji_key('❤️') == '❤'
+    assert emoji_key('👍🏽') == '👍'
+    assert emoji_key('🔥') == '🔥'
+
+def test_heart_with_variation_selector_is_scored():
+    analyzer = SentimentAnalyzer()
+
+    # Seul l'emoji compte : 0.3 × score emoji
+    assert analyzer._get_sentiment("❤️") == 0.3 * 1.0
+    assert analyzer._get_sentiment("👍🏽") == 0.3 * 0.8
+
+def test_every_known_sequence_is_extracted_whole():
+    import emoji
+
+    for sequence in emoji.EMOJI_DATA:
+        assert extract_emojis(f"a {sequence} b") == [sequence]
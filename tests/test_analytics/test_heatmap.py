@@ -0,0 +1,67 @@
+import random
+import pandas as pd
+import pytest
+from datetime import datetime, timedelta, timezone
+from backend.app.analytics.heatmap import EngagementHeatmap, WEEKDAYS
+
+NOW = datetime(2024, 3, 31, 12, tzinfo=timezone.utc)
+
+def make_records(n, seed=1):
+    rng = random.Random(seed)
+    return [
+        {
+            'posted_at': (NOW - timedelta(minutes=rng.randint(0, 60 * 24 * 60))).isoformat(),
+            'engagement_rate': rng.uniform(0, 20),
+        }
+        for _ in range(n)
+    ]
+
+def test_matches_groupby():
+    records = make_records(2000)
+    heatmap = EngagementHeatmap.from_records(records)
+
+    df = pd.DataFrame(records)
+    df['posted_at'] = pd.to_datetime(df['posted_at'])
+    grouped = df.groupby([df['posted_at'].dt.dayofweek, df['posted_at'].dt.hour])['engagement_rate']
+    for (day, hour), mean in grouped.mean().items():
+        assert heatmap.mean[day, hour] == pytest.approx(mean)
+    assert heatmap.counts.sum() == len(records)
+
+    best = {
+        WEEKDAYS[day]: group.groupby('hour')['engagement_rate'].mean().nlargest(3).index.tolist()
+        for day, group in df.assign(hour=df['posted_at'].dt.hour).groupby(df['posted_at'].dt.dayofweek)
+    }
+    assert heatmap.best_hours(3) == best
+
+def test_day_window():
+    records = [
+        {'posted_at': (NOW - timedelta(days=2)).isoformat(), 'engagement_rate': 1.0},
+        {'posted_at': (NOW - timedelta(days=40)).isoformat(), 'engagement_rate': 9.0},
+        {'posted_at': 'not a date', 'engagement_rate': 9.0},
+    ]
+
+    assert EngagementHeatmap.from_records(records, days=30, now=NOW).counts.sum() == 1
+    assert EngagementHeatmap.from_records(records, now=NOW).counts.sum() == 2
+
+def test_timezone_buckets():
+    # 30 mars 2024 23:30 UTC : dimanche 0h30 à Paris (heure d'hiver), lundi 1h30 après le changement d'heure
+    records = [
+        {'posted_at': '2024-03-30T23:30:00Z', 'engagement_rate': 1.0},
+        {'posted_at': '2024-04-01T23:30:00Z', 'engagement_rate': 2.0},
+    ]
+
+    paris = EngagementHeatmap.from_records(records, tz='Europe/Paris')
+
+    assert paris.counts[6, 0] == 1
+    assert paris.counts[1, 1] == 1
+    assert EngagementHeatmap.from_records(records).counts[5, 23] == 1
+    with pytest.raises(ValueError):
+        EngagementHeatmap('Mars/Olympus')
+
+def test_merge():
+    records = make_records(500)
+    merged = EngagementHeatmap.from_records(records[:200]).merge(EngagementHeatmap.from_records(records[200:]))
+
+    assert merged.sums == pytest.approx(EngagementHeatmap.from_records(records).sums)
+    with pytest.raises(ValueError):
+        merged.merge(EngagementHeatmap('Asia/Shanghai'))
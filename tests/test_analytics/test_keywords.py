@@ -0,0 +1,46 @@
+import random
+import pytest
+from backend.app.analytics.keywords import KeywordMatcher, KeywordSentiment
+
+def naive(patterns, text):
+    return {pattern for pattern in patterns if pattern in text}
+
+def test_automaton_finds_overlapping_patterns():
+    matcher = KeywordMatcher(['he', 'she', 'his', 'hers'], threshold=0)
+
+    assert matcher.use_automaton
+    assert matcher.search('ushers') == {'she', 'he', 'hers'}
+    assert matcher.search('this') == {'his'}
+    assert matcher.search('') == set()
+
+@pytest.mark.parametrize('threshold', [0, 1000])
+def test_automaton_matches_substring_search(threshold):
+    rng = random.Random(7)
+    patterns = ['nul', 'annul', 'super', 'superbe', "j'adore", 'génial', '好', '喜欢', 'ab', 'bab', 'abab']
+    matcher = KeywordMatcher(patterns, threshold=threshold)
+    alphabet = "abnulspergéj'adoi 好喜欢!"
+
+    for _ in range(500):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert matcher.search(text) == naive(patterns, text)
+        assert matcher.search(text) == naive(patterns, text)  # Résultats mémorisés
+
+def test_keyword_sentiment_batch():
+    sentiment = KeywordSentiment(['love', 'super'], ['bad', 'nul'])
+    texts = ['I LOVE it', 'Not bad, super', 'nothing', 'I LOVE it', 'Annuler']
+
+    assert sentiment.score_batch(texts) == [sentiment.score(text) for text in texts]
+    assert sentiment.score_batch(texts) == [1.0, 0.5, 0.5, 1.0, 0.0]
+
+def test_keyword_sentiment_large_lexicon_uses_automaton():
+    positive = [f'good{i:03d}' for i in range(200)] + ['love']
+    negative = [f'bad{i:03d}' for i in range(200)] + ['nul']
+    sentiment = KeywordSentiment(positive, negative)
+
+    assert sentiment.matcher.use_automaton  # 402 mots, au-delà du seuil
+    assert sentiment.counts('I LOVE good007 and good007, bad199 annulé') == (2, 2)
+
+def test_keyword_sentiment_whole_words():
+    sentiment = KeywordSentiment(['good'], ['bad'], whole_words=True)
+
+    assert sentiment.counts('good good bad goodness good!') == (2, 1)
@@ -0,0 +1,56 @@
+import pytest
+from backend.app.analytics.lexicon import LEXICON_VERSION, LexiconSentiment
+from backend.app.analytics.sentiment import SentimentAnalyzer
+from backend.app.analytics.sentiment_memo import SentimentMemo
+from backend.app.services.sentiment_scoring import SentimentScorer
+
+@pytest.fixture
+def lexicon():
+    return LexiconSentiment()
+
+@pytest.mark.parametrize('text, expected', [
+    ("I love this", 0.6),
+    ("very good", 0.91),
+    ("not bad at all", 0.35),
+    ("I don't like it", -0.15),
+    ("Ce n'est pas bon", -0.3),
+    ("J'adore, génial !", 0.85),
+    ("这个视频太棒了", 1.0),
+    ("不是很好", -0.35),
+    ("first", 0.0),
+])
+def test_polarity(lexicon, text, expected):
+    assert lexicon.polarity(text) == pytest.approx(expected)
+
+def test_negation_stops_at_punctuation(lexicon):
+    assert lexicon.polarity("Not good. Great though") == pytest.approx((-0.35 + 0.8) / 2)
+
+def test_batch_matches_single_texts(lexicon):
+    texts = ["I love this", "", "垃圾", "Vidéo nulle, je suis déçu", "Part 2 when?"]
+
+    matrix, counts = lexicon.document_terms(texts)
+    scores = lexicon.score_batch(texts)
+
+    assert matrix.shape == (len(texts), len(lexicon.weights))
+    assert counts.tolist() == [1, 0, 1, 2, 0]
+    assert scores.tolist() == [lexicon.polarity(text) for text in texts]
+    assert lexicon.score_batch([]).shape == (0,)
+
+@pytest.mark.asyncio
+async def test_engine_is_selectable_per_call():
+    analyzer = SentimentAnalyzer(memo=SentimentMemo(version='test'))
+    comments = [{'text': "Ce n'est pas bon"}, {'text': "J'adore 🔥"}] * 2
+
+    lexical = await analyzer.analyze_comments(comments, engine='lexicon')
+    default = await analyzer.analyze_comments(comments)
+
+    expected = [0.7 * -0.3 + 0.3 * 0, 0.7 * 0.8 + 0.3 * 0.9] * 2
+    assert lexical['sentiment_stats']['average'] == pytest.approx(sum(expected) / len(expected))
+    assert lexical['dedupe_stats']['scored'] == 2
+    assert default['sentiment_stats'] != lexical['sentiment_stats']
+    with pytest.raises(ValueError):
+        await analyzer.analyze_comments(comments, engine='unknown')
+
+def test_scorer_cache_is_keyed_by_engine():
+    assert SentimentScorer(engine='lexicon').model_version == LEXICON_VERSION
+    assert SentimentScorer(engine='textblob').model_version.startswith('textblob')
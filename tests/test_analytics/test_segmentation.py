@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from backend.app.analytics.segmentation import FEATURES, TrendSegmenter, assign_segments
+
+CENTERS = np.array([
+    [100, 10, 0.1, -0.5],
+    [5000, 800, 0.5, 0.0],
+    [20000, 3000, 0.9, 0.5],
+])
+
+def make_window(n_per_center, seed):
+    rng = np.random.default_rng(seed)
+    spread = np.array([20, 5, 0.02, 0.05])
+    return np.vstack([
+        center + rng.normal(0, 1, (n_per_center, len(FEATURES))) * spread
+        for center in CENTERS
+    ])
+
+@pytest.fixture
+def segmenter():
+    return TrendSegmenter(n_clusters=3, batch_size=64).refit(make_window(100, seed=0))
+
+def test_partial_fit_keeps_segments_stable(segmenter):
+    X = make_window(50, seed=1)
+    before = segmenter.predict(X)
+
+    segmenter.partial_fit(make_window(200, seed=2))
+
+    assert (segmenter.predict(X) == before).all()
+    assert segmenter.updates_since_refit == 1
+
+def test_refit_preserves_segment_numbers(segmenter):
+    X = make_window(50, seed=3)
+    before = segmenter.predict(X)
+
+    segmenter.refit(make_window(100, seed=4))
+
+    assert (segmenter.predict(X) == before).all()
+
+def test_assign_matches_vectorized_predict(segmenter):
+    X = make_window(20, seed=5)
+    trends = [dict(zip(FEATURES, row)) for row in X.tolist()]
+
+    assert [segmenter.assign(t) for t in trends] == segmenter.predict(X).tolist()
+
+def test_missing_values_are_imputed(segmenter):
+    trend = {'volume': 20000, 'engagement': 3000, 'growth_rate': 0.9, 'sentiment_score': None}
+
+    X = segmenter.matrix([trend])
+
+    assert not np.isnan(X).any()
+    assert segmenter.predict(X)[0] == segmenter.assign(trend)
+
+def test_state_roundtrip(segmenter):
+    X = make_window(10, seed=6)
+
+    restored = TrendSegmenter.loads(segmenter.dumps(), version=3)
+
+    assert restored.version == 3
+    assert (restored.predict(X) == segmenter.predict(X)).all()
+    restored.partial_fit(X)  # Le modèle restauré reste entraînable
+
+def test_needs_refit_after_interval(segmenter):
+    assert not segmenter.needs_refit()
+    assert segmenter.needs_refit(datetime.utcnow() + segmenter.refit_interval + timedelta(seconds=1))
+    assert TrendSegmenter().needs_refit()
+
+def test_assign_segments_sets_segment(segmenter):
+    rows = [{'volume': 100, 'engagement': 10, 'growth_rate': 0.1, 'sentiment_score': -0.5, 'category': 'music'}]
+
+    assign_segments(rows, segmenter)
+    assign_segments(rows + [{'volume': 1}], TrendSegmenter())  # Modèle vide : aucune affectation
+
+    assert rows[0]['segment'] == TrendSegmenter.segment_name(segmenter.assign(rows[0]))
+    assert rows[0]['category'] == 'music'
+
+def test_small_window_skips_refit(segmenter):
+    X = make_window(50, seed=7)
+    before = segmenter.predict(X)
+    refitted_at = segmenter.refitted_at
+
+    segmenter.refit(X[:2])
+    assert segmenter.refitted_at == refitted_at
+    assert (segmenter.predict(X) == before).all()
+
+    # Réestimation due mais fenêtre trop petite : simple mise à jour incrémentale
+    segmenter.update(X[:2], now=refitted_at + segmenter.refit_interval)
+    assert segmenter.refitted_at == refitted_at
+    assert segmenter.updates_since_refit == 1
+
+    assert not TrendSegmenter(n_clusters=3).refit(X[:2]).fitted
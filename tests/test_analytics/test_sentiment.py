@@ -93,3 +93,19 @@ def test_calculate_engagement_quality(sentiment_analyzer):
     
     assert isinstance(quality, float)
     assert 0 <= quality <= 100
+
+@pytest.mark.asyncio
+async def test_analyze_comments_in_process_pool(sample_comments):
+    from backend.app.analytics.sentiment import shutdown_process_pool
+
+    comments = sample_comments * 5
+    inline = await SentimentAnalyzer(process_threshold=len(comments) + 1).analyze_comments(comments)
+    try:
+        pooled = await SentimentAnalyzer(process_threshold=4, shard_size=3).analyze_comments(comments)
+    finally:
+        shutdown_process_pool()
+
+    assert pooled['top_themes'] == inline['top_themes']
+    assert pooled['top_emojis'] == inline['top_emojis']
+    assert pooled['sentiment_stats'] == pytest.approx(inline['sentiment_stats'])
+    assert pooled['engagement_quality'] == pytest.approx(inline['engagement_quality'])
@@ -0,0 +1,97 @@
+import pytest
+from backend.app.analytics.sentiment import SentimentAnalyzer
+from backend.app.analytics.sentiment_memo import SentimentMemo, memo_key
+
+class FakePipeline:
+    def __init__(self, store):
+        self.store = store
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value))
+
+    def execute(self):
+        self.store.update((key, value.encode()) for key, value in self.commands)
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.store)
+
+class BrokenRedis:
+    def mget(self, keys):
+        raise ConnectionError("redis down")
+
+    def pipeline(self, transaction=True):
+        raise ConnectionError("redis down")
+
+@pytest.mark.asyncio
+async def test_duplicate_comments_are_scored_once():
+    analyzer = SentimentAnalyzer(memo=SentimentMemo(version='test'))
+    calls = []
+    polarity = analyzer._text_polarity
+    analyzer._text_polarity = lambda text: calls.append(text) or polarity(text)
+    comments = [{'text': '🔥🔥🔥'}] * 50 + [{'text': 'love this'}] * 30 + [{'text': 'Love   THIS'}, {'text': 'first'}]
+
+    analysis = await analyzer.analyze_comments(comments)
+
+    assert sorted(calls) == ['first', 'love this', '🔥🔥🔥']  # Texte normalisé, une fois chacun
+    assert analysis['dedupe_stats'] == {
+        'comments': 82,
+        'unique_texts': 4,
+        'duplicates': 78,
+        'dedupe_ratio': pytest.approx(78 / 82),
+        'memo_hits': 0,
+        'shared_hits': 0,
+        'scored': 3,  # 'Love   THIS' normalisé comme 'love this'
+    }
+    assert analysis['top_emojis'] == [('🔥', 150)]
+    assert ('love this', 31) in analysis['top_themes']
+
+    again = await analyzer.analyze_comments(comments)
+
+    assert len(calls) == 3
+    assert again['dedupe_stats']['memo_hits'] == 3
+    assert again['sentiment_stats'] == analysis['sentiment_stats']
+
+@pytest.mark.asyncio
+async def test_dedupe_preserves_results():
+    sample_comments = [
+        {"text": "This is amazing! ❤️ Love your content! 🔥"},
+        {"text": "Not really helpful... 👎"},
+        {"text": "Could be better 😐"},
+    ]
+    comments = sample_comments * 3
+    analyzer = SentimentAnalyzer(memo=SentimentMemo(version='test'))
+
+    analysis = await analyzer.analyze_comments(comments)
+
+    expected = [analyzer._get_sentiment(c['text'].lower()) for c in comments]
+    assert analysis['sentiment_stats']['average'] == pytest.approx(sum(expected) / len(expected))
+    assert analysis['dedupe_stats']['unique_texts'] == len(sample_comments)
+
+def test_memo_is_shared_through_redis():
+    redis = FakeRedis()
+    first = SentimentMemo(version='v1', client=redis)
+    second = SentimentMemo(version='v1', client=redis)
+    other_version = SentimentMemo(version='v2', client=redis)
+    key = memo_key('first')
+
+    first.set_many({key: 0.25})
+
+    assert second.get_many([key]) == {'local': {}, 'shared': {key: 0.25}}
+    assert second.get_many([key]) == {'local': {key: 0.25}, 'shared': {}}
+    assert other_version.get_many([key]) == {'local': {}, 'shared': {}}
+
+def test_memo_is_bounded_and_survives_redis_errors():
+    memo = SentimentMemo(version='v1', size=2, client=BrokenRedis())
+
+    memo.set_many({'a': 0.1, 'b': 0.2, 'c': 0.3})
+
+    assert len(memo) == 2
+    assert memo.get_many(['a', 'c']) == {'local': {'c': 0.3}, 'shared': {}}
@@ -0,0 +1,107 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from backend.app.analytics import sentiment
+from backend.app.analytics.sentiment import SentimentAnalyzer, iter_ndjson
+from backend.app.analytics.sentiment_memo import SentimentMemo
+
+COMMENTS = [
+    {"text": "This is amazing! ❤️ Love your content! 🔥"},
+    {"text": "Not really helpful... 👎"},
+    {"text": "Great tutorial, very clear explanation 👍"},
+    {"text": "Could be better 😐"},
+    {"text": "This changed my life! Best content ever! ❤️😊"},
+    {"text": "first"},
+]
+
+async def stream(items):
+    for item in items:
+        yield item
+
+@pytest.mark.asyncio
+async def test_stream_matches_batch_analysis():
+    comments = COMMENTS * 20
+    analyzer = SentimentAnalyzer(memo=SentimentMemo(version='test'))
+
+    expected = await analyzer.analyze_comments(comments)
+    streamed = await analyzer.analyze_comment_stream(stream(comments), batch_size=7)
+
+    assert streamed['top_themes'] == expected['top_themes']
+    assert streamed['top_emojis'] == expected['top_emojis']
+    assert streamed['sentiment_stats'] == pytest.approx(expected['sentiment_stats'])
+    assert streamed['engagement_quality'] == pytest.approx(expected['engagement_quality'])
+    assert streamed['dedupe_stats']['comments'] == len(comments)
+
+@pytest.fixture(autouse=True)
+def stop_pool():
+    yield
+    sentiment.shutdown_process_pool()
+
+@pytest.mark.asyncio
+async def test_stream_batches_run_in_pool(monkeypatch):
+    loop_thread = threading.get_ident()
+    threads = []
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(sentiment, 'process_pool', lambda: pool)
+
+    def analyze_shard(items, engine=None):
+        threads.append(threading.get_ident())
+        return SentimentAnalyzer(memo=SentimentMemo(version='test')).analyze_counts(items, engine)
+
+    monkeypatch.setattr(sentiment, '_analyze_shard', analyze_shard)
+    analyzer = SentimentAnalyzer(memo=SentimentMemo(version='test'), process_threshold=6)
+    try:
+        analysis = await analyzer.analyze_comment_stream(stream(COMMENTS * 5), batch_size=7)
+    finally:
+        pool.shutdown()
+
+    # Lots de 7 : 6 textes distincts, dans le pool ; dernier lot (2 textes) hors du pool
+    assert len(threads) == 4
+    assert loop_thread not in threads
+    assert analysis['dedupe_stats']['comments'] == 30
+
+@pytest.mark.asyncio
+async def test_small_stream_batches_skip_pool(monkeypatch):
+    def no_pool():
+        raise AssertionError("pool de processus démarré")
+
+    monkeypatch.setattr(sentiment, 'process_pool', no_pool)
+    memo = SentimentMemo(version='test')
+    analyzer = SentimentAnalyzer(memo=memo)
+
+    await analyzer.analyze_comment_stream(stream(COMMENTS[:3]))
+    again = await analyzer.analyze_comment_stream(stream(COMMENTS[:3]))
+
+    assert len(memo) == 3  # Mémo du processus consulté et complété
+    assert again['dedupe_stats']['memo_hits'] == 3
+
+@pytest.mark.asyncio
+async def test_stream_keeps_heavy_hitters_in_bounded_memory():
+    # Un thème fréquent noyé dans beaucoup de thèmes uniques
+    comments = [
+        {"text": "awesome" if i % 3 == 0 else f"unique{i:05d}"}
+        for i in range(3000)
+    ]
+    analyzer = SentimentAnalyzer(memo=SentimentMemo(version='test'))
+
+    analysis = await analyzer.analyze_comment_stream(stream(comments), batch_size=100, capacity=50)
+
+    theme, count = analysis['top_themes'][0]
+    assert theme == 'awesome'
+    assert 1000 <= count <= 1000 + 3000 // 50
+
+@pytest.mark.asyncio
+async def test_iter_ndjson_handles_chunk_boundaries():
+    async def chunks():
+        for chunk in (b'{"text": "a"}\n{"te', b'xt": "b"}\n\n', b'{"text": "c"}'):
+            yield chunk
+
+    assert [c['text'] async for c in iter_ndjson(chunks())] == ['a', 'b', 'c']
+
+@pytest.mark.asyncio
+async def test_iter_ndjson_rejects_invalid_lines():
+    async def chunks():
+        yield b'{"text": "a"}\n[1, 2]\n'
+
+    with pytest.raises(ValueError, match='Ligne 2'):
+        [c async for c in iter_ndjson(chunks())]
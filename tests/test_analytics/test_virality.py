@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from backend.app.analytics.performance import PerformanceAnalyzer
+from backend.app.analytics.virality import CONTENT_VIRALITY, TREND_EVOLUTION, TREND_VIRALITY, ViralityModel
+from backend.app.services.ingest import estimate_virality
+
+CONTENTS = [
+    {'engagement_rate': 15.5, 'view_count': 10000, 'comment_count': 500, 'share_count': 200},
+    {'engagement_rate': 250, 'view_count': 5_000_000, 'comment_count': 20000, 'share_count': 9000},
+    {'view_count': 1000},
+]
+
+def test_content_scores_match_weighted_formula():
+    scores = CONTENT_VIRALITY.score_records(CONTENTS)
+
+    assert scores.tolist() == pytest.approx([
+        (0.4 * 0.155 + 0.2 * 0.01 + 0.2 * 0.05 + 0.2 * 0.04) * 100,
+        100.0,  # Toutes les caractéristiques plafonnées
+        0.2 * 0.001 * 100,
+    ])
+    columns = {key: [c.get(key) for c in CONTENTS] for key in CONTENT_VIRALITY.keys}
+    assert CONTENT_VIRALITY.score_columns(columns).tolist() == scores.tolist()
+
+def test_missing_values_take_feature_default():
+    rows = [{'engagement': 5000, 'growth_rate': 50, 'sentiment_score': None}, {}]
+
+    assert TREND_VIRALITY.score_records(rows).tolist() == pytest.approx([0.2 + 0.15 + 0.15, 0.15])
+    assert estimate_virality(rows[0]) == pytest.approx(0.5)
+
+def test_evolution_factors_are_relative_to_batch():
+    factors = TREND_EVOLUTION.factors({
+        'volume': np.array([0.0, 9.0, 99.0]),
+        'growth_rate': np.array([0.5, 0.1, 0.0]),
+        'sentiment_score': np.array([1.0, np.nan, -1.0]),
+    })
+
+    assert factors['volume'].tolist() == pytest.approx([0.0, 0.5, 1.0])
+    assert factors['sentiment_score'].tolist() == [1.0, 0.5, 0.0]
+    assert TREND_EVOLUTION.combine(factors).tolist() == pytest.approx([0.5, 0.34, 0.3])
+
+def test_invalid_columns():
+    with pytest.raises(ValueError):
+        CONTENT_VIRALITY.score_columns({'view_count': [1, 2], 'share_count': [1]})
+    with pytest.raises(ValueError):
+        ViralityModel([('views', 'sqrt', None, 1.0, 0.0)])
+
+@pytest.mark.asyncio
+async def test_batch_matches_single_predictions():
+    analyzer = PerformanceAnalyzer(collector=None)
+
+    batch = await analyzer.predict_virality_batch(CONTENTS)
+
+    assert batch.tolist() == [await analyzer.predict_virality(content) for content in CONTENTS]
+    assert (await analyzer.predict_virality_batch(columns={'view_count': []})).shape == (0,)
@@ -5,6 +5,8 @@ from backend.app.collectors.instagram import InstagramCollector
 from backend.app.collectors.facebook import FacebookCollector
 from backend.app.collectors.tiktok import TikTokCollector
 from backend.app.collectors.douyin import DouyinCollector
+from backend.app.collectors.registry import CollectorPool, create_collector, get_collector_class
+from backend.app.collectors.manager import CollectorManager
 from tests.conftest import MockClientSession
 
 @pytest.mark.asyncio
@@ -209,3 +211,154 @@ async def test_collector_session_cleanup(mock_responses):
             assert not session.closed
         
         assert session.closed
+
+def test_collector_registry():
+    """Test le chargement paresseux des collecteurs par nom."""
+    assert get_collector_class('youtube') is YouTubeCollector
+    assert isinstance(create_collector('tiktok', 'test_key'), TikTokCollector)
+
+    with pytest.raises(ValueError):
+        get_collector_class('myspace')
+
+    pool = CollectorPool({'youtube': 'test_key', 'tiktok': None, 'myspace': 'key'})
+    assert list(pool) == ['youtube']
+    assert pool['youtube'] is pool.get('youtube')
+    assert pool.get('tiktok') is None
+
+@pytest.mark.asyncio
+async def test_youtube_iter_comments_pages():
+    """Test le parcours paginé des commentaires YouTube."""
+    pages = {
+        None: {'items': [{'snippet': {'topLevelComment': {'snippet': {'textDisplay': 'a', 'likeCount': 1}}}}],
+               'nextPageToken': 'p2'},
+        'p2': {'items': [{'snippet': {'topLevelComment': {'snippet': {'textDisplay': 'b'}}}}] * 2},
+    }
+    requests = []
+
+    async def fake_request(url, params=None):
+        requests.append(params.get('pageToken'))
+        return pages[params.get('pageToken')]
+
+    collector = YouTubeCollector('test_key')
+    with patch.object(collector, '_make_request', side_effect=fake_request):
+        comments = [c['text'] async for c in collector.iter_comments('video')]
+        limited = [c['text'] async for c in collector.iter_comments('video', max_comments=2)]
+
+    assert comments == ['a', 'b', 'b']
+    assert limited == ['a', 'b']
+    assert requests == [None, 'p2', None, 'p2']
+
+def test_collectors_share_keyword_sentiment():
+    """Les collecteurs utilisent leurs lexiques via un analyseur partagé."""
+    texts = ["J'adore, génial !", "Worst video, total waste", "这个视频太棒了", "first"]
+    tiktok = TikTokCollector('test_key')
+    douyin = DouyinCollector('test_key')
+
+    assert tiktok.sentiment_lexicon is InstagramCollector('test_key').sentiment_lexicon
+    assert tiktok._analyze_sentiments(texts) == [1.0, 0.0, 0.5, 0.5]
+    assert douyin._analyze_sentiments(texts) == [0.5, 0.5, 1.0, 0.5]
+
+@pytest.mark.asyncio
+async def test_trending_captions_scored_in_one_batch():
+    """Les légendes des tendances sont analysées en un seul lot."""
+    posts = {'data': [
+        {'id': '1', 'message': 'Amazing, love it'},
+        {'id': '2', 'message': 'Worst post'},
+        {'id': '3'},  # Sans message
+    ]}
+    collector = FacebookCollector('test_key')
+    batches = []
+    analyze = collector._analyze_sentiments
+
+    def spy(texts):
+        batches.append(texts)
+        return analyze(texts)
+
+    with patch.object(collector, '_make_request', return_value=posts), \
+            patch.object(collector, '_analyze_sentiments', side_effect=spy):
+        trends = await collector.get_trending_topics()
+
+    assert batches == [['Amazing, love it', 'Worst post', '']]
+    assert [trend['sentiment'] for trend in trends] == [1.0, 0.0, 0.5]
+
+@pytest.mark.asyncio
+async def test_youtube_optimal_schedule():
+    """Test le planning optimal YouTube (statistiques en un lot, carte jour × heure)."""
+    search = {'items': [
+        {'id': {'videoId': 'a'}, 'snippet': {'publishedAt': '2024-01-19T12:00:00Z'}},  # Vendredi
+        {'id': {'videoId': 'b'}, 'snippet': {'publishedAt': '2024-01-19T18:00:00Z'}},
+        {'id': {'videoId': 'c'}, 'snippet': {'publishedAt': '2024-01-20T12:00:00Z'}},  # Samedi
+        {'id': {'playlistId': 'p'}, 'snippet': {'publishedAt': '2024-01-20T12:00:00Z'}},
+    ]}
+    statistics = {'items': [
+        {'id': video_id, 'statistics': {'viewCount': views}}
+        for video_id, views in (('a', '100'), ('b', '300'), ('c', '50'))
+    ]}
+    requests = []
+
+    async def fake_request(url, params=None):
+        requests.append(url.rsplit('/', 1)[-1])
+        return search if url.endswith('/search') else statistics
+
+    collector = YouTubeCollector('test_key')
+    with patch.object(collector, '_make_request', side_effect=fake_request):
+        schedule = await collector.get_optimal_schedule('channel', timezone='Asia/Tokyo')
+
+    assert requests == ['search', 'videos']
+    assert schedule['best_days'] == [{'day': 'Samedi', 'avg_views': 175.0}, {'day': 'Vendredi', 'avg_views': 100.0}]
+    assert schedule['best_hours'][0] == {'hour': '03:00', 'avg_views': 300.0}
+    assert schedule['heatmap']['timezone'] == 'Asia/Tokyo'
+
+@pytest.mark.asyncio
+async def test_youtube_engagement_metrics_batch():
+    """Test les statistiques YouTube par lots de 50 identifiants, un lot en échec."""
+    video_ids = [f'v{i}' for i in range(120)]
+    requests = []
+
+    async def fake_request(url, params=None):
+        ids = params['id'].split(',')
+        requests.append(len(ids))
+        if ids[0] == 'v50':
+            raise Exception('quota')
+        return {'items': [
+            {'id': video_id, 'statistics': {'viewCount': '1000', 'likeCount': '40', 'commentCount': '10'}}
+            for video_id in ids
+        ]}
+
+    collector = YouTubeCollector('test_key')
+    with patch.object(collector, '_make_request', side_effect=fake_request):
+        metrics = await collector.get_engagement_metrics_batch(video_ids, concurrency=2)
+
+    assert sorted(requests) == [20, 50, 50]
+    assert len(metrics) == 70 and 'v50' not in metrics
+    assert metrics['v0'] == {
+        'views': 1000, 'likes': 40, 'comments': 10, 'engagement': 50,
+        'engagement_rate': collector._calculate_engagement_rate(40, 10, 1000),
+    }
+
+@pytest.mark.asyncio
+async def test_youtube_trending_pages_stream_through_manager():
+    """Les pages du classement YouTube sont transmises une à une par CollectorManager.iter_platform."""
+    def video(i):
+        return {'id': f'v{i}', 'snippet': {'title': f'Vidéo {i}', 'description': '', 'publishedAt': '2024-01-19T12:00:00Z'},
+                'statistics': {'viewCount': '100', 'likeCount': '5', 'commentCount': '1'}}
+
+    pages = {None: {'items': [video(0), video(1)], 'nextPageToken': 'p2'}, 'p2': {'items': [video(2), video(3)]}}
+    requests = []
+
+    async def fake_request(url, params=None):
+        requests.append((params['regionCode'], params.get('pageToken'), params['maxResults']))
+        return pages[params.get('pageToken')]
+
+    manager = CollectorManager({})
+    collector = YouTubeCollector('test_key')
+    manager.collectors = {'youtube': collector}
+    with patch.object(collector, '_make_request', side_effect=fake_request):
+        stream = manager.iter_platform('youtube', region='US', max_results=3)
+        first = await stream.__anext__()
+        assert len(requests) == 1
+        rest = [trend async for trend in stream]
+
+    assert (first['platform'], first['keyword'], first['views']) == ('youtube', 'Vidéo 0', 100)
+    assert [trend['keyword'] for trend in rest] == ['Vidéo 1', 'Vidéo 2']
+    assert requests == [('US', None, 3), ('US', 'p2', 1)]
@@ -0,0 +1,55 @@
+import json
+import numpy as np
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from backend.app.services.analysis_store import decode_result, encode_result, save_result, to_jsonable
+
+def test_to_jsonable_converts_numpy_and_nan():
+    result = to_jsonable({
+        'mean': np.float64(1.5),
+        'count': np.int64(3),
+        'std': float('nan'),
+        'quartiles': {0.25: np.float64(1.0), np.int64(1): [np.inf]},
+        'at': datetime(2024, 1, 19, 12),
+    })
+
+    assert result == {
+        'mean': 1.5,
+        'count': 3,
+        'std': None,
+        'quartiles': {'0.25': 1.0, '1': [None]},
+        'at': '2024-01-19T12:00:00',
+    }
+    assert isinstance(result['count'], int)
+
+def test_encode_result_is_compressed_and_stable():
+    results = {'b': [1, 2, 3] * 100, 'a': 'tendance'}
+
+    payload, etag, size = encode_result(results)
+    same_payload, same_etag, _ = encode_result(dict(reversed(list(results.items()))))
+
+    assert json.loads(decode_result(payload)) == results
+    assert len(payload) < size
+    assert etag == same_etag  # Clés triées : même ETag quel que soit l'ordre
+
+def test_etag_ignores_run_timestamp():
+    _, etag, _ = encode_result({'timestamp': '2024-01-19T12:00:00', 'segments': [1, 2]})
+    _, same_etag, _ = encode_result({'timestamp': '2024-01-20T12:00:00', 'segments': [1, 2]})
+    _, other_etag, _ = encode_result({'timestamp': '2024-01-20T12:00:00', 'segments': [1, 3]})
+
+    assert etag == same_etag != other_etag
+
+def test_save_result_twice_keeps_one_version():
+    from app.models.analysis_result import AnalysisResult
+
+    engine = create_engine('sqlite://')
+    AnalysisResult.__table__.create(engine)
+    with Session(engine) as session:
+        first = save_result('global_trends', {'timestamp': datetime(2024, 1, 19).isoformat(), 'trends': 3}, session=session)
+        second = save_result('global_trends', {'timestamp': datetime(2024, 1, 20).isoformat(), 'trends': 3}, session=session)
+        changed = save_result('global_trends', {'timestamp': datetime(2024, 1, 21).isoformat(), 'trends': 4}, session=session)
+
+        assert second.version == first.version == 1
+        assert changed.version == 2
+        assert session.query(AnalysisResult).count() == 2
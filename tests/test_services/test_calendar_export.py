@@ -0,0 +1,84 @@
+import gzip
+import json
+from datetime import date
+import pytest
+from sqlalchemy import JSON, Boolean, Column, Float, Integer, MetaData, String, Table, create_engine, insert
+from sqlalchemy.orm import Session
+from backend.app.analytics.calendar_engine import CalendarEngine
+from backend.app.services.calendar_export import DEFAULT_FREQUENCY, _frequency, iter_creators, write_calendars
+
+@pytest.fixture
+def tables():
+    metadata = MetaData()
+    users = Table(
+        'user', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('content_niche', String(64)),
+        Column('preferred_platforms', JSON),
+        Column('posting_frequency', String(32)),
+        Column('is_active', Boolean, default=True),
+    )
+    ideas = Table(
+        'content_idea', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('user_id', Integer, nullable=False),
+        Column('title', String(256), nullable=False),
+        Column('estimated_virality', Float),
+        Column('is_used', Boolean, default=False),
+    )
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(users), [
+            {'id': 1, 'content_niche': 'cuisine', 'preferred_platforms': ['tiktok'], 'posting_frequency': '2', 'is_active': True},
+            {'id': 2, 'content_niche': None, 'preferred_platforms': None, 'posting_frequency': 'daily', 'is_active': True},
+            {'id': 3, 'content_niche': 'voyage', 'preferred_platforms': ['myspace'], 'posting_frequency': '3/week', 'is_active': True},
+            {'id': 4, 'content_niche': 'tech', 'preferred_platforms': None, 'posting_frequency': '1', 'is_active': False},
+        ])
+        connection.execute(insert(ideas), [
+            {'user_id': 1, 'title': 'Recette express', 'estimated_virality': 0.8, 'is_used': False},
+            {'user_id': 1, 'title': 'Déjà publiée', 'estimated_virality': 0.9, 'is_used': True},
+            {'user_id': 2, 'title': 'Vlog', 'estimated_virality': None, 'is_used': False},
+        ])
+    return engine, users, ideas
+
+@pytest.mark.parametrize('value, per_day', [
+    ('3', 3), ('2.5', 2.5), ('daily', 1), ('Weekly', 1 / 7), ('3/week', 3 / 7),
+    ('3 per week', 3 / 7), ('2 fois par semaine', 2 / 7), ('1,5/jour', 1.5), ('4 times a month', 4 / 30),
+    (None, DEFAULT_FREQUENCY), ('', DEFAULT_FREQUENCY), ('often', DEFAULT_FREQUENCY),
+    ('3/fortnight', DEFAULT_FREQUENCY),
+])
+def test_frequency_parses_free_text(value, per_day):
+    assert _frequency(value) == pytest.approx(per_day)
+
+def test_iter_creators_reads_ideas_in_chunks(tables):
+    engine, users, ideas = tables
+    seen = []
+
+    with Session(engine) as session:
+        creators = list(iter_creators(session, seen.append, chunk_size=2, user_table=users, idea_table=ideas))
+
+    assert [c['user_id'] for c in creators] == [1, 2, 3]
+    assert creators[0]['topics'] == {'Recette express': 0.8}
+    assert creators[0]['frequency'] == 2 and creators[0]['platforms'] == ['tiktok']
+    assert creators[1]['topics'] == {'Vlog': 0.5} and creators[1]['frequency'] == 1
+    assert creators[2]['topics'] == {'voyage': 1.0} and creators[2]['frequency'] == pytest.approx(3 / 7)
+    assert creators[2]['platforms'] == ['youtube', 'tiktok', 'instagram']
+    assert seen == ['tiktok', 'youtube', 'youtube']
+
+def test_write_calendars_streams_ndjson(tables, tmp_path):
+    engine, users, ideas = tables
+    path = str(tmp_path / 'export' / 'calendars.jsonl.gz')
+
+    with Session(engine) as session:
+        calendars = CalendarEngine(seed=0).iter_calendars(
+            iter_creators(session, user_table=users, idea_table=ideas), date(2024, 1, 1), 7
+        )
+        stats = write_calendars(calendars, path)
+
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    assert [line['user_id'] for line in lines] == [1, 2, 3]
+    assert stats['creators'] == 3
+    assert stats['entries'] == sum(len(line['entries']) for line in lines) == 7 * (2 + 1) + 3
+    assert not (tmp_path / 'export' / 'calendars.jsonl.gz.tmp').exists()
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+import pytest
+from sqlalchemy import select
+from backend.app.analytics.segmentation import TrendSegmenter
+from backend.app.services.ingest import IngestPipeline, extract_keywords
+
+class FakeScorer:
+    def __init__(self):
+        self.calls = []
+
+    def score_texts(self, texts, session=None, table=None):
+        texts = list(texts)
+        self.calls.append(texts)
+        return {' '.join(text.lower().split()): 0.5 for text in texts}
+
+def make_pipeline(trend_session, **params):
+    session, table = trend_session
+    scorer = FakeScorer()
+    pipeline = IngestPipeline(session, table, scorer=scorer, segmenter=TrendSegmenter(), **params)
+    return pipeline, scorer
+
+def test_extract_keywords():
+    assert extract_keywords('The best Python tips for 2024') == ['best', 'python', 'tips', '2024']
+
+def test_run_normalizes_enriches_and_persists(trend_session):
+    session, table = trend_session
+    pipeline, scorer = make_pipeline(trend_session, batch_size=2)
+    trends = [
+        {'platform': 'YouTube', 'keyword': '  Python   tips ', 'views': 20000, 'type': 'video'},
+        {'platform': 'tiktok', 'keyword': 'dance', 'views': 10, 'sentiment_score': -1.0},
+        {'platform': 'tiktok'},  # Mot-clé manquant : rejetée
+    ]
+
+    stats = pipeline.run(trends)
+
+    assert stats['received'] == 3
+    assert stats['rejected'] == 1
+    assert stats['inserted'] == 2
+    assert stats['batches'] == 1  # Le second lot ne contient qu'une tendance rejetée
+    # Seules les tendances sans score passent par le service de sentiment
+    assert scorer.calls == [['Python tips']]
+
+    rows = {row.keyword: row for row in session.execute(select(table))}
+    assert rows['Python tips'].platform == 'youtube'
+    assert rows['Python tips'].sentiment_score == 0.5
+    assert rows['Python tips'].related_keywords == ['python', 'tips']
+    assert rows['Python tips'].virality_score == pytest.approx(0.4 + 0.3 * 0.75)
+    assert rows['dance'].sentiment_score == -1.0
+    assert rows['dance'].virality_score == pytest.approx(0.4 * 0.001)
+
+def test_run_async_applies_backpressure(trend_session):
+    pipeline, _ = make_pipeline(trend_session, batch_size=10)
+    produced = []
+    processed = []
+    max_ahead = 0
+
+    async def source():
+        nonlocal max_ahead
+        for i in range(100):
+            produced.append(i)
+            max_ahead = max(max_ahead, len(produced) - len(processed))
+            yield {'platform': 'tiktok', 'keyword': f'trend {i}', 'views': i}
+
+    process = pipeline.process
+
+    def tracking_process(batch):
+        process(batch)
+        processed.extend(batch)
+
+    pipeline.process = tracking_process
+    stats = asyncio.run(pipeline.run_async(source(), max_pending=5))
+
+    assert stats['inserted'] == 100
+    # Au plus un lot en cours, la file pleine et l'élément en attente d'insertion
+    assert max_ahead <= 10 + 5 + 1
+
+def test_run_async_processes_off_the_event_loop(trend_session):
+    pipeline, _ = make_pipeline(trend_session, batch_size=4)
+    threads = []
+    ticks = []
+    during = []
+
+    async def source():
+        for i in range(8):
+            yield {'platform': 'tiktok', 'keyword': f'trend {i}', 'views': i}
+
+    async def ticker():
+        # La boucle reste disponible pendant l'écriture d'un lot
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0.001)
+
+    process = pipeline.process
+
+    def slow_process(batch):
+        threads.append(threading.get_ident())
+        before = len(ticks)
+        time.sleep(0.05)
+        during.append(len(ticks) - before)
+        process(batch)
+
+    async def main():
+        task = asyncio.ensure_future(ticker())
+        try:
+            return await pipeline.run_async(source())
+        finally:
+            task.cancel()
+
+    pipeline.process = slow_process
+    stats = asyncio.run(main())
+
+    assert stats['inserted'] == 8
+    assert len(threads) == 2 and threading.get_ident() not in threads
+    assert all(count > 0 for count in during)
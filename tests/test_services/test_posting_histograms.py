@@ -0,0 +1,174 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pytest
+from sqlalchemy import JSON, Column, DateTime, Integer, MetaData, String, Table, create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from backend.app.collectors.youtube import YouTubeCollector
+from backend.app.services.posting_histograms import PLATFORM_WIDE, PostingHistogramStore
+
+NOW = datetime(2024, 1, 22, 12, 0)  # Lundi
+
+@pytest.fixture
+def store():
+    metadata = MetaData()
+    table = Table(
+        'posting_histogram', metadata,
+        Column('platform', String(32), primary_key=True),
+        Column('channel_id', String(128), primary_key=True),
+        Column('views_sums', JSON),
+        Column('views_counts', JSON),
+        Column('engagement_sums', JSON),
+        Column('engagement_counts', JSON),
+        Column('videos', Integer, nullable=False, default=0),
+        Column('decayed_at', DateTime),
+        Column('fetched_at', DateTime),
+        Column('updated_at', DateTime),
+    )
+    videos = Table(
+        'posting_histogram_video', metadata,
+        Column('platform', String(32), primary_key=True),
+        Column('video_id', String(256), primary_key=True),
+        Column('channel_id', String(128), nullable=False),
+        Column('published_at', DateTime, index=True),
+    )
+    # Une seule connexion, partagée avec les threads de asyncio.to_thread
+    engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+    metadata.create_all(engine)
+    return PostingHistogramStore(
+        sessionmaker(engine), table, videos, half_life_days=7, max_age_hours=6, id_retention_days=30,
+    )
+
+def video(published_at, views, engagement=None, id=None):
+    return {'id': id, 'published_at': published_at, 'views': views, 'engagement': engagement}
+
+def test_record_adds_only_new_videos(store):
+    first = [video('2024-01-15T12:00:00Z', 100, 2.0, 'v1'), video('2024-01-19T18:00:00Z', 300, id='v2')]
+    assert store.record('youtube', 'chan', first, now=NOW, full_fetch=True) == 2
+    # Même lot et une vidéo plus récente : seule la nouvelle est ajoutée
+    assert store.record('youtube', 'chan', first + [video('2024-01-22T12:00:00Z', 50, id='v3')], now=NOW) == 1
+
+    heatmaps = store.lookup('youtube', 'chan', now=NOW)
+    views = heatmaps['views']
+    # Poids 0.5 ** (âge / 7 jours) : 1 semaine -> 0.5
+    assert views.counts[0, 12] == pytest.approx(1.5)
+    assert views.sums[0, 12] == pytest.approx(100 * 0.5 + 50)
+    assert views.counts.sum() == pytest.approx(1.5 + 0.5 ** (2.75 / 7))
+    assert heatmaps['engagement'].counts.sum() == pytest.approx(0.5)
+
+    assert store.rebuild_platform('youtube', now=NOW) == 1
+    platform = store.lookup('youtube', PLATFORM_WIDE, now=NOW)['views']
+    assert platform.sums.tolist() == views.sums.tolist()
+
+def test_record_counts_older_unseen_videos(store):
+    store.record('youtube', 'chan', [video('2024-01-22T12:00:00Z', 50, id='new')], now=NOW)
+    # Vidéo plus ancienne que la dernière comptée, mais jamais vue : elle est ajoutée
+    assert store.record('youtube', 'chan', [
+        video('2024-01-15T12:00:00Z', 100, id='old'), video('2024-01-15T12:00:00Z', 100, id='old'),
+    ], now=NOW) == 1
+    assert store.record('youtube', 'chan', [video('2024-01-15T12:00:00Z', 100, id='old')], now=NOW) == 0
+
+    store.rebuild_platform('youtube', now=NOW)
+    views = store.lookup('youtube', PLATFORM_WIDE, now=NOW)['views']
+    assert views.counts[0, 12] == pytest.approx(1.5)
+    assert views.sums[0, 12] == pytest.approx(50 + 100 * 0.5)
+
+def test_channel_map_fresh_only_after_full_fetch(store):
+    store.record('youtube', 'chan', [video('2024-01-22T10:00:00Z', 50, id='a')], now=NOW)
+    assert store.lookup('youtube', 'chan', now=NOW) is None  # Vidéo croisée, chaîne pas collectée
+    assert store.lookup('youtube', PLATFORM_WIDE, now=NOW) is None  # Pas encore reconstruite
+    store.rebuild_platform('youtube', now=NOW)
+    assert store.lookup('youtube', PLATFORM_WIDE, now=NOW) is not None
+
+    later = NOW + timedelta(hours=1)
+    assert store.record('youtube', 'chan', [video('2024-01-22T10:00:00Z', 50, id='a')], now=later, full_fetch=True) == 0
+    heatmaps = store.lookup('youtube', 'chan', now=later)
+    assert heatmaps['views'].counts.sum() == pytest.approx(0.5 ** (3 / (7 * 24)))  # Comptée une fois
+
+    assert store.lookup('youtube', 'chan', now=later + timedelta(hours=7)) is None
+
+def test_platform_map_merges_channels_and_ages(store):
+    store.record('youtube', 'a', [video('2024-01-22T12:00:00Z', 100)], now=NOW)
+    later = NOW + timedelta(days=7)
+    store.record('youtube', 'b', [video('2024-01-29T12:00:00Z', 300)], now=later)
+    assert store.platforms() == ['youtube']
+    assert store.rebuild_platform('youtube', now=later) == 2
+
+    views = store.lookup('youtube', PLATFORM_WIDE, now=later)['views']
+    # La publication de la chaîne a, vieille d'une semaine, compte pour moitié
+    assert views.counts[0, 12] == pytest.approx(1.5)
+    assert views.mean[0, 12] == pytest.approx((50 + 300) / 1.5)
+    assert store.lookup('youtube', 'a', now=later) is None  # Carte périmée
+
+def test_video_counted_once_per_platform(store):
+    shared = video('2024-01-22T12:00:00Z', 100, id='v')
+    assert store.record('youtube', 'a', [shared], now=NOW) == 1
+    # Même vidéo croisée sous un autre identifiant de chaîne : déjà comptée
+    assert store.record('youtube', 'b', [shared, video('2024-01-22T13:00:00Z', 10, id='w')], now=NOW) == 1
+    assert store.record('tiktok', 'b', [shared], now=NOW) == 1  # Autre plateforme
+
+    store.rebuild_platform('youtube', now=NOW)
+    views = store.lookup('youtube', PLATFORM_WIDE, now=NOW)['views']
+    assert views.counts.sum() == pytest.approx(2.0)
+    assert views.sums[0, 12] == pytest.approx(100)
+    with pytest.raises(ValueError):
+        store.record('youtube', PLATFORM_WIDE, [shared], now=NOW)
+
+def test_rebuild_forgets_old_ids(store):
+    old = video('2023-11-01T12:00:00Z', 100, id='old')
+    store.record('youtube', 'chan', [old, video('2024-01-22T12:00:00Z', 50, id='new')], now=NOW)
+    store.rebuild_platform('youtube', now=NOW)
+    with store.session_factory() as session:
+        kept = session.execute(store.video_table.select()).mappings().all()
+    assert [row['video_id'] for row in kept] == ['new']
+    assert store.record('youtube', 'chan', [video('2024-01-22T12:00:00Z', 50, id='new')], now=NOW) == 0
+
+def test_lookup_converts_timezone(store):
+    store.record('youtube', 'chan', [video('2024-01-19T18:00:00Z', 300)], now=NOW, full_fetch=True)
+
+    tokyo = store.lookup('youtube', 'chan', tz='Asia/Tokyo', now=NOW)['views']
+    assert tokyo.tz == 'Asia/Tokyo'
+    assert tokyo.best_days(1) == [5]  # Samedi 03:00 à Tokyo
+    assert tokyo.best_hours_overall(1) == [3]
+    assert store.lookup('youtube', 'unknown', now=NOW) is None
+    with pytest.raises(ValueError):
+        store.lookup('youtube', 'chan', tz='Mars/Olympus', now=NOW)
+
+@pytest.mark.asyncio
+async def test_optimal_schedule_reads_fresh_histogram(store):
+    store.record('youtube', 'chan', [video(datetime.utcnow().isoformat(), 300, id='v')], full_fetch=True)
+    collector = YouTubeCollector('test_key')
+    collector.posting_histograms = store
+
+    with patch.object(collector, '_make_request', side_effect=AssertionError("appel API")):
+        schedule = await collector.get_optimal_schedule('chan')
+
+    assert schedule['best_days'][0]['avg_views'] == pytest.approx(300.0)
+    assert schedule['heatmap']['timezone'] == 'UTC'
+
+@pytest.mark.asyncio
+async def test_optimal_schedule_full_fetch_refreshes_partial_map(store):
+    published = (datetime.utcnow() - timedelta(hours=1)).strftime('%Y-%m-%dT%H:00:00Z')
+    store.record('youtube', 'chan', [video(published, 300, id='a')])  # Croisée ailleurs
+    search = {'items': [
+        {'id': {'videoId': 'a'}, 'snippet': {'publishedAt': published}},
+        {'id': {'videoId': 'b'}, 'snippet': {'publishedAt': published}},
+    ]}
+    statistics = {'items': [
+        {'id': video_id, 'statistics': {'viewCount': '100'}} for video_id in ('a', 'b')
+    ]}
+    requests = []
+
+    async def fake_request(url, params=None):
+        requests.append(url.rsplit('/', 1)[-1])
+        return search if url.endswith('/search') else statistics
+
+    collector = YouTubeCollector('test_key')
+    collector.posting_histograms = store
+    with patch.object(collector, '_make_request', side_effect=fake_request):
+        await collector.get_optimal_schedule('chan')
+        await collector.get_optimal_schedule('chan')
+
+    assert requests == ['search', 'videos']  # Seconde lecture sur la carte
+    heatmaps = store.lookup('youtube', 'chan')
+    assert heatmaps['views'].counts.sum() == pytest.approx(2.0, rel=0.02)  # 'a' comptée une fois, pas trois
@@ -0,0 +1,45 @@
+import gzip
+import json
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from backend.app.services.retention import TrendArchiver, purge_expired
+
+@pytest.fixture
+def session_and_table(trend_session):
+    session, table = trend_session
+    start = datetime(2024, 1, 1, 12)
+    session.execute(table.insert(), [
+        {'id': i, 'platform': 'youtube', 'keyword': f'kw{i}', 'detected_at': start + timedelta(hours=6 * i), 'hashtags': ['#a']}
+        for i in range(1, 41)
+    ])
+    session.commit()
+    return session, table
+
+def test_purge_expired_in_chunks(session_and_table):
+    session, table = session_and_table
+    cutoff = datetime(2024, 1, 6)
+
+    stats = purge_expired(session, table, cutoff, chunk_size=7)
+
+    assert stats['deleted'] == 17
+    assert stats['chunks'] == 3
+    assert stats['rows_per_second'] > 0
+    assert session.execute(select(func.min(table.c.detected_at))).scalar() >= cutoff
+    assert session.execute(select(func.count()).select_from(table)).scalar() == 23
+
+def test_purge_expired_archives_by_day(session_and_table, tmp_path):
+    session, table = session_and_table
+    archiver = TrendArchiver(str(tmp_path), fmt='jsonl.gz')
+
+    stats = purge_expired(session, table, datetime(2024, 1, 3), chunk_size=100, archiver=archiver)
+
+    assert stats['archived'] == stats['deleted'] == 5
+    days = sorted(p.name for p in (tmp_path / 'trend').iterdir())
+    assert days == ['day=2024-01-01', 'day=2024-01-02']
+
+    archived = []
+    for path in sorted((tmp_path / 'trend').glob('day=*/*.jsonl.gz')):
+        archived.extend(json.loads(line) for line in gzip.decompress(path.read_bytes()).splitlines())
+    assert [row['id'] for row in archived] == [1, 2, 3, 4, 5]
+    assert archived[0]['hashtags'] == ['#a']
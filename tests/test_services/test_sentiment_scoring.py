@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import Column, DateTime, Float, MetaData, String, Table, Text, create_engine, func, select
+from sqlalchemy.orm import Session
+from backend.app.services.sentiment_scoring import SentimentScorer, normalize_text
+
+@pytest.fixture
+def cache_table():
+    metadata = MetaData()
+    table = Table(
+        'sentiment_cache', metadata,
+        Column('model_version', String(64), primary_key=True),
+        Column('text_hash', String(64), primary_key=True),
+        Column('text', Text),
+        Column('score', Float, nullable=False),
+        Column('scored_at', DateTime),
+    )
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    return engine, table
+
+class CountingModel:
+    """Scorer factice qui enregistre les lots reçus."""
+    __name__ = 'counting-v1'
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        return [len(text) / 100 for text in texts]
+
+def test_normalize_text():
+    assert normalize_text('  Great  MUSIC\n') == 'great music'
+    assert normalize_text(None) == ''
+
+def test_scores_unique_texts_in_batches(cache_table):
+    engine, table = cache_table
+    model = CountingModel()
+    scorer = SentimentScorer(model, batch_size=2)
+
+    with Session(engine) as session:
+        scores = scorer.score_texts(['Dance', 'dance ', 'Great music', 'news', 'news'], session, table)
+        session.commit()
+        cached = session.execute(select(func.count()).select_from(table)).scalar()
+
+    assert scores == {'dance': 0.05, 'great music': 0.11, 'news': 0.04}
+    assert model.batches == [['dance', 'great music'], ['news']]
+    assert cached == 3
+    assert scorer.stats['texts'] == 5
+    assert scorer.stats['unique_texts'] == 3
+    assert scorer.stats['cache_misses'] == 3
+    assert scorer.stats['hit_ratio'] == 0.0
+
+def test_persistent_cache_is_reused(cache_table):
+    engine, table = cache_table
+    with Session(engine) as session:
+        SentimentScorer(CountingModel()).score_texts(['dance', 'news'], session, table)
+        session.commit()
+
+    # Nouveau processus : cache mémoire vide, cache persistant rempli
+    model = CountingModel()
+    scorer = SentimentScorer(model)
+    with Session(engine) as session:
+        scores = scorer.score_texts(['DANCE', 'news', 'party'], session, table)
+
+    assert scores['dance'] == 0.05
+    assert model.batches == [['party']]
+    assert scorer.stats['cache_hits'] == 2
+    assert scorer.stats['hit_ratio'] == pytest.approx(2 / 3)
+
+def test_cache_is_keyed_by_model_version(cache_table):
+    engine, table = cache_table
+    with Session(engine) as session:
+        SentimentScorer(CountingModel(), model_version='v1').score_texts(['dance'], session, table)
+        session.commit()
+
+        model = CountingModel()
+        SentimentScorer(model, model_version='v2').score_texts(['dance'], session, table)
+
+    assert model.batches == [['dance']]
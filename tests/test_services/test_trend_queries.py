@@ -0,0 +1,71 @@
+import math
+import random
+import pandas as pd
+import pytest
+from datetime import datetime, timedelta
+from backend.app.services.trend_queries import platform_performance
+
+@pytest.fixture
+def session_and_rows(trend_session):
+    session, table = trend_session
+    rng = random.Random(7)
+    now = datetime(2024, 1, 19, 12)
+    rows = [
+        {
+            'id': i,
+            'platform': rng.choice(['tiktok', 'youtube', 'twitter']),
+            'keyword': f'kw{i}',
+            'engagement': rng.choice([rng.randint(0, 10_000), 500]),  # Avec ex aequo
+            'growth_rate': rng.uniform(-50, 200),
+            'sentiment_score': rng.choice([rng.uniform(-1, 1), None]),
+            'detected_at': now - timedelta(hours=rng.randint(0, 47)),
+        }
+        for i in range(1, 301)
+    ]
+    session.execute(table.insert(), rows)
+    session.commit()
+    return session, table, rows
+
+def assert_close(actual, expected):
+    assert actual == pytest.approx(expected, rel=1e-9) or (math.isnan(actual) and math.isnan(expected))
+
+def test_platform_performance_matches_pandas(session_and_rows):
+    session, table, rows = session_and_rows
+    since = datetime(2024, 1, 18, 12)
+
+    stats = platform_performance(session, since, table=table)
+
+    df = pd.DataFrame([row for row in rows if row['detected_at'] >= since])
+    assert set(stats) == set(df['platform'].unique())
+    for platform, platform_df in df.groupby('platform'):
+        result = stats[platform]
+        engagement = platform_df['engagement']
+        assert_close(result['metrics']['avg_engagement'], engagement.mean())
+        assert_close(result['metrics']['avg_growth_rate'], platform_df['growth_rate'].mean())
+        assert_close(result['metrics']['avg_sentiment'], platform_df['sentiment_score'].mean())
+
+        distribution = result['engagement_distribution']
+        assert_close(distribution['median'], engagement.median())
+        assert_close(distribution['std'], engagement.std())
+        for q, value in engagement.quantile([0.25, 0.75]).to_dict().items():
+            assert_close(distribution['quartiles'][q], value)
+
+        expected_top = platform_df.nlargest(5, 'engagement')[
+            ['keyword', 'engagement', 'growth_rate']
+        ].to_dict('records')
+        assert result['top_trends'] == expected_top
+
+def test_platform_performance_single_row(session_and_rows):
+    session, table, _ = session_and_rows
+    session.execute(table.insert(), [{
+        'id': 1000, 'platform': 'instagram', 'keyword': 'seul', 'engagement': 42,
+        'growth_rate': 1.0, 'sentiment_score': None, 'detected_at': datetime(2024, 2, 1),
+    }])
+
+    stats = platform_performance(session, datetime(2024, 2, 1), table=table)
+
+    distribution = stats['instagram']['engagement_distribution']
+    assert list(stats) == ['instagram']
+    assert distribution['median'] == distribution['mean'] == distribution['quartiles'][0.75] == 42.0
+    assert math.isnan(distribution['std'])  # Écart-type d'un seul point : NaN comme pandas
+    assert math.isnan(stats['instagram']['metrics']['avg_sentiment'])
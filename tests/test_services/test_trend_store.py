@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from backend.app.services.trend_store import bulk_upsert, time_bucket, trend_row
+
+def test_time_bucket():
+    assert time_bucket(datetime(2024, 1, 19, 12, 34, 56, 789)) == datetime(2024, 1, 19, 12)
+    aware = datetime(2024, 1, 19, 13, 5, tzinfo=timezone(timedelta(hours=1)))
+    assert time_bucket(aware) == datetime(2024, 1, 19, 12)
+
+def test_bulk_upsert_deduplicates_by_hour(trend_table):
+    engine, table = trend_table
+    now = datetime(2024, 1, 19, 12, 10)
+    first = [
+        trend_row({'platform': 'youtube', 'keyword': 'python', 'views': 100}, now),
+        trend_row({'platform': 'youtube', 'keyword': 'python', 'views': 150}, now + timedelta(minutes=20)),
+        trend_row({'platform': 'tiktok', 'keyword': 'python', 'views': 50}, now),
+    ]
+    second = [
+        trend_row({'platform': 'youtube', 'keyword': 'python', 'views': 300}, now + timedelta(minutes=40)),
+        trend_row({'platform': 'youtube', 'keyword': 'python', 'views': 10}, now + timedelta(hours=1)),
+    ]
+
+    with Session(engine) as session:
+        assert bulk_upsert(session, table, first) == {'inserted': 2, 'updated': 0}
+        assert bulk_upsert(session, table, second) == {'inserted': 1, 'updated': 1}
+        session.commit()
+
+        rows = session.execute(
+            select(table.c.platform, table.c.engagement, table.c.detected_at)
+            .order_by(table.c.platform, table.c.time_bucket)
+        ).all()
+
+    assert [(r.platform, r.engagement) for r in rows] == [
+        ('tiktok', 50), ('youtube', 300), ('youtube', 10)
+    ]
+    # La date de première détection est conservée
+    assert rows[1].detected_at == now
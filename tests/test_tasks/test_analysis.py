@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.analytics import segmentation
+from app.analytics.segmentation import TrendSegmenter, load_segmenter, save_segmenter
+from app.models.model_state import ModelState
+from app.tasks import analysis, locks
+from app.services.trend_queries import platform_performance
+from app.tasks.analysis import (
+    TREND_COLUMNS, predict_trend_evolution, segment_trends, segment_updates
+)
+
+FEATURES = ['volume', 'engagement', 'growth_rate', 'sentiment_score']
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(11)
+    n = 400
+    engagement = rng.integers(0, 5000, n)
+    engagement[::13] = 4999  # Ex aequo parmi les plus engageantes
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1) * 7,
+        'platform': rng.choice(['tiktok', 'youtube', 'instagram'], n),
+        'keyword': [f'kw{i}' for i in range(n)],
+        'volume': rng.integers(0, 100_000, n),
+        'engagement': engagement,
+        'growth_rate': rng.uniform(-0.5, 1.5, n),
+        'sentiment_score': rng.uniform(-1, 1, n),
+    }, columns=TREND_COLUMNS)
+
+def legacy_predictions(df):
+    """Ancienne implémentation de predict_trend_evolution (iterrows)."""
+    predictions = []
+    for _, trend in df.iterrows():
+        engagement_momentum = trend['growth_rate']
+        sentiment_factor = (trend['sentiment_score'] + 1) / 2
+        volume_factor = np.log1p(trend['volume']) / np.log1p(df['volume'].max())
+        potential_score = 0.4 * engagement_momentum + 0.3 * sentiment_factor + 0.3 * volume_factor
+        if potential_score > 0.7:
+            prediction, expected_growth = "forte_croissance", ">100%"
+        elif potential_score > 0.5:
+            prediction, expected_growth = "croissance_moderee", "50-100%"
+        elif potential_score > 0.3:
+            prediction, expected_growth = "stable", "0-50%"
+        else:
+            prediction, expected_growth = "declin", "<0%"
+        predictions.append({
+            'trend_id': trend['id'],
+            'keyword': trend['keyword'],
+            'platform': trend['platform'],
+            'prediction': prediction,
+            'expected_growth': expected_growth,
+            'confidence_score': potential_score,
+            'factors': {
+                'engagement_momentum': engagement_momentum,
+                'sentiment_factor': sentiment_factor,
+                'volume_factor': volume_factor,
+            },
+        })
+    return predictions
+
+def legacy_segments(df, clusters, n_clusters):
+    """Ancienne agrégation par segment de segment_trends, pour des étiquettes données."""
+    segments = []
+    for i in range(n_clusters):
+        cluster_df = df[clusters == i]
+        segments.append({
+            'name': f"Segment {i+1}",
+            'size': len(cluster_df),
+            'characteristics': {feature: cluster_df[feature].mean() for feature in FEATURES},
+            'representative_trends': cluster_df.nlargest(3, 'engagement')[
+                ['id', 'keyword', 'platform']
+            ].to_dict('records'),
+            'trend_ids': cluster_df['id'].tolist(),
+        })
+    return segments
+
+class FixedSegmenter:
+    """Modèle factice : étiquettes imposées, pour comparer les agrégations."""
+    fitted = True
+
+    def __init__(self, labels, n_clusters):
+        self.labels = labels
+        self.n_clusters = n_clusters
+
+    def matrix(self, df):
+        return df[FEATURES].to_numpy(dtype=float)
+
+    def update(self, X):
+        pass
+
+    def predict(self, X):
+        return self.labels
+
+def test_predictions_match_legacy_loop(frame):
+    expected = legacy_predictions(frame)
+    actual = predict_trend_evolution(frame)
+
+    assert len(actual) == len(expected)
+    for new, old in zip(actual, expected):
+        assert {k: new[k] for k in ('trend_id', 'keyword', 'platform', 'prediction', 'expected_growth')} == \
+            {k: old[k] for k in ('trend_id', 'keyword', 'platform', 'prediction', 'expected_growth')}
+        assert new['confidence_score'] == pytest.approx(old['confidence_score'], rel=1e-12)
+        assert new['factors'] == pytest.approx(old['factors'], rel=1e-12)
+
+def test_segments_match_legacy_aggregation(frame):
+    labels = np.random.default_rng(3).integers(0, 4, len(frame))  # Segment 5 vide
+    actual = segment_trends(frame, FixedSegmenter(labels, 5))
+    expected = legacy_segments(frame, labels, 5)
+
+    assert [s['name'] for s in actual] == [TrendSegmenter.segment_name(i) for i in range(5)]
+    for new, old in zip(actual[:4], expected[:4]):
+        assert new['size'] == old['size']
+        assert new['trend_ids'] == old['trend_ids']
+        assert new['representative_trends'] == old['representative_trends']
+        assert new['characteristics'] == pytest.approx(old['characteristics'], rel=1e-12)
+    assert actual[4]['size'] == 0 and actual[4]['trend_ids'] == []
+
+def test_segment_updates_match_legacy_lookup(frame):
+    labels = np.random.default_rng(5).integers(0, 5, len(frame))
+    segments = segment_trends(frame, FixedSegmenter(labels, 5))
+
+    # Ancienne écriture : recherche linéaire du segment de chaque tendance
+    expected = {
+        trend_id: next(s for s in segments if trend_id in s['trend_ids'])['name']
+        for trend_id in frame['id'].tolist()
+    }
+    updates = segment_updates(segments)
+
+    assert len(updates) == len(frame)
+    assert {u['id']: u['segment'] for u in updates} == expected
+
+def no_redis():
+    raise ConnectionError('redis indisponible')
+
+def test_failed_commit_leaves_cached_segmenter_untouched(trend_table, frame, monkeypatch):
+    engine, table = trend_table
+    ModelState.__table__.create(engine)
+    monkeypatch.setattr(segmentation, '_cached', None)
+    monkeypatch.setattr(locks, 'get_redis', no_redis)
+
+    session = Session(engine)
+    rows = frame.head(50).assign(detected_at=datetime.utcnow(), category='music').to_dict('records')
+    session.execute(table.insert(), rows)
+    save_segmenter(TrendSegmenter(n_clusters=3).refit(frame[FEATURES].to_numpy(dtype=float)), session)
+    session.commit()
+    cached = load_segmenter(session)
+    centers, updates = cached.summary()['centers'], cached.updates_since_refit
+
+    def failing_commit():
+        raise RuntimeError('commit refusé')
+
+    monkeypatch.setattr(analysis, 'db', SimpleNamespace(session=session))
+    monkeypatch.setattr(session, 'commit', failing_commit)
+    with pytest.raises(RuntimeError):
+        analysis.analyze_global_trends.run()
+
+    assert load_segmenter(session) is cached
+    assert cached.summary()['centers'] == centers and cached.updates_since_refit == updates
+    assert set(session.execute(select(table.c.category)).scalars()) == {'music'}
+    assert set(session.execute(select(table.c.segment)).scalars()) == {None}
+    session.close()
+
+def test_trend_window_uses_sql_platform_stats(trend_session, frame, monkeypatch):
+    session, table = trend_session
+    detected_at = datetime.utcnow() - timedelta(days=1)
+    session.execute(table.insert(), frame.assign(detected_at=detected_at).to_dict('records'))
+    session.commit()
+    saved = []
+    monkeypatch.setattr(analysis, 'db', SimpleNamespace(session=session))
+    monkeypatch.setattr(analysis, 'save_result',
+        lambda kind, result, summary: saved.append(result) or SimpleNamespace(handle=dict))
+    monkeypatch.setattr(locks, 'get_redis', no_redis)
+
+    assert analysis.analyze_trend_window.run(days=0) is None  # Fenêtre vide, pas 30 jours
+    analysis.analyze_trend_window.run(days=2)
+
+    result, = saved
+    assert result['window_days'] == 2
+    assert result['platform_analysis'] == platform_performance(session, detected_at, table=table)
@@ -0,0 +1,142 @@
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from sqlalchemy import select
+from app.analytics.segmentation import TrendSegmenter
+from app.collectors.manager import CollectorManager
+from app.services.ingest import IngestPipeline
+from app.tasks import collectors as tasks
+from app.tasks import locks
+from app.tasks.runtime import AsyncRuntime
+
+class FakeCollector:
+    def __init__(self, metrics=None, error=None):
+        self.metrics = metrics or {}
+        self.error = error
+        self.calls = []
+
+    async def get_engagement_metrics_batch(self, content_ids):
+        self.calls.append(sorted(content_ids))
+        if self.error:
+            raise self.error
+        return {i: self.metrics[i] for i in content_ids if i in self.metrics}
+
+@pytest.fixture
+def metrics_env(trend_session, monkeypatch):
+    """Tâches branchées sur la table de test, sans Redis, avec des collecteurs factices."""
+    session, table = trend_session
+    now = datetime.utcnow()
+    session.execute(table.insert(), [
+        {'id': 1, 'platform': 'youtube', 'keyword': 'a', 'content_id': 'y1', 'engagement': 1, 'detected_at': now},
+        {'id': 2, 'platform': 'youtube', 'keyword': 'b', 'content_id': 'y2', 'engagement': 1, 'detected_at': now},
+        {'id': 3, 'platform': 'tiktok', 'keyword': 'c', 'content_id': 't1', 'engagement': 1, 'detected_at': now},
+        {'id': 4, 'platform': 'youtube', 'keyword': 'd', 'content_id': 'y1', 'engagement': 1, 'detected_at': now},
+        {'id': 5, 'platform': 'youtube', 'keyword': 'e', 'content_id': 'y3', 'engagement': 1,
+         'detected_at': now - timedelta(days=2)},  # Hors fenêtre
+        {'id': 6, 'platform': 'youtube', 'keyword': 'f', 'content_id': None, 'engagement': 1, 'detected_at': now},
+        {'id': 7, 'platform': 'instagram', 'keyword': 'g', 'content_id': 'i1', 'engagement': 1, 'detected_at': now},
+    ])
+    session.commit()
+
+    collectors = {
+        'youtube': FakeCollector({'y1': {'engagement': 50, 'growth_rate': 2.5}, 'y3': {'engagement': 9}}),
+        'tiktok': FakeCollector({'t1': {'engagement_count': 7}}),
+    }
+    runtime = AsyncRuntime()
+    runtime._manager = SimpleNamespace(collectors=collectors)
+
+    def no_redis():
+        raise ConnectionError('redis indisponible')
+
+    monkeypatch.setattr(tasks, 'db', SimpleNamespace(session=session))
+    monkeypatch.setattr(tasks, 'runtime', runtime)
+    monkeypatch.setattr(locks, 'get_redis', no_redis)
+    yield session, table, collectors
+    runtime.stop()
+
+def engagement(session, table):
+    return dict(session.execute(select(table.c.id, table.c.engagement)).all())
+
+def test_refresh_metrics_chunk_groups_by_platform(metrics_env):
+    session, table, collectors = metrics_env
+    collectors['tiktok'].error = RuntimeError('quota')
+    rows = [SimpleNamespace(id=i, platform=p, content_id=c) for i, p, c in (
+        (1, 'youtube', 'y1'), (2, 'youtube', 'y2'), (3, 'tiktok', 't1'), (4, 'youtube', 'y1'),
+    )]
+
+    updated, failed = tasks._refresh_metrics_chunk(tasks.runtime.collector_manager(), rows)
+
+    assert (updated, failed) == (2, 2)  # y2 sans métriques, tiktok en échec
+    assert collectors['youtube'].calls == [['y1', 'y2']]
+    assert engagement(session, table)[1] == engagement(session, table)[4] == 50
+    assert session.execute(select(table.c.growth_rate).where(table.c.id == 1)).scalar() == 2.5
+    assert engagement(session, table)[3] == 1
+
+def test_update_metrics_pages_by_id(metrics_env):
+    session, table, collectors = metrics_env
+
+    result = tasks.update_metrics.run(chunk_size=2)
+
+    assert result['status'] == 'success'
+    assert (result['updated_count'], result['failed_count']) == (3, 1)
+    # Pages (1, 2) puis (3, 4) : ni tendance ancienne, ni sans contenu, ni plateforme inconnue
+    assert collectors['youtube'].calls == [['y1', 'y2'], ['y1']]
+    assert collectors['tiktok'].calls == [['t1']]
+    assert engagement(session, table) == {1: 50, 2: 1, 3: 7, 4: 50, 5: 1, 6: 1, 7: 1}
+
+class StubYouTube:
+    """Collecteur factice : la signature de YouTubeCollector.get_trending_topics."""
+    api_key = 'test_key'
+
+    def __init__(self):
+        self.regions = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def get_trending_topics(self, region: str = 'FR'):
+        self.regions.append(region)
+        return [
+            {'id': 'v1', 'title': f'Top {region}', 'metrics': {'views': 1200, 'likes': 80}},
+            {'id': 'v2', 'title': '', 'metrics': {'views': 5}},  # Sans mot-clé : rejetée
+        ]
+
+class FakeScorer:
+    def score_texts(self, texts, session=None, table=None):
+        return {' '.join(text.lower().split()): 0.5 for text in texts}
+
+def test_collection_shards_split_regions_where_supported(monkeypatch):
+    monkeypatch.setenv('COLLECTOR_REGIONS', 'FR, US')
+    monkeypatch.setattr(tasks, 'collector_config', lambda: {'youtube': 'k', 'tiktok': 'k', 'facebook': None})
+
+    assert tasks.collection_shards() == [
+        {'platform': 'youtube', 'region': 'FR'},
+        {'platform': 'youtube', 'region': 'US'},
+        {'platform': 'tiktok'},
+    ]
+
+def test_collect_platform_trends_shard_end_to_end(trend_session, monkeypatch):
+    session, table = trend_session
+    collector = StubYouTube()
+    manager = CollectorManager({})
+    manager.collectors = {'youtube': collector}
+    runtime = AsyncRuntime()
+    runtime._manager = manager
+    monkeypatch.setattr(tasks, 'runtime', runtime)
+    monkeypatch.setattr(tasks, 'IngestPipeline', lambda: IngestPipeline(
+        session, table, scorer=FakeScorer(), segmenter=TrendSegmenter()
+    ))
+
+    try:
+        result = tasks.collect_platform_trends.run('youtube', region='US')
+    finally:
+        runtime.stop()
+
+    assert collector.regions == ['US']
+    assert result['platform'] == 'youtube' and result['region'] == 'US'
+    assert (result['inserted'], result['rejected']) == (1, 1)
+    row = session.execute(select(table)).mappings().one()
+    assert (row['keyword'], row['content_id'], row['engagement']) == ('Top US', 'v1', 1200)
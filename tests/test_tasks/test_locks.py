@@ -0,0 +1,165 @@
+import time
+import pytest
+from types import SimpleNamespace
+from backend.app.tasks import locks
+from backend.app.tasks.locks import (
+    EXTEND_SCRIPT, RELEASE_SCRIPT, TaskLease, current_lease, guard_metrics, release_lease,
+    single_instance
+)
+
+class FakeRedis:
+    """Sous-ensemble de Redis utilisé par les baux (expirations en temps réel)."""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.hashes = {}
+
+    def _alive(self, key):
+        if key in self.expires and self.expires[key] <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def set(self, key, value, nx=False, px=None, ex=None):
+        if nx and self._alive(key):
+            return None
+        self.data[key] = value
+        self.expires.pop(key, None)
+        if px or ex:
+            self.expires[key] = time.monotonic() + (px / 1000 if px else ex)
+        return True
+
+    def get(self, key):
+        return self.data.get(key) if self._alive(key) else None
+
+    def exists(self, key):
+        return int(self._alive(key))
+
+    def delete(self, key):
+        return int(self._alive(key) and self.data.pop(key, None) is not None)
+
+    def eval(self, script, numkeys, key, token, *args):
+        if self.get(key) != token:
+            return 0
+        if script == RELEASE_SCRIPT:
+            return self.delete(key)
+        if script == EXTEND_SCRIPT:
+            self.expires[key] = time.monotonic() + int(args[0]) / 1000
+            return 1
+        raise NotImplementedError(script)
+
+    def hincrby(self, name, field, amount):
+        values = self.hashes.setdefault(name, {})
+        values[field] = values.get(field, 0) + amount
+
+    def hgetall(self, name):
+        return dict(self.hashes.get(name, {}))
+
+class FakeTask:
+    def __init__(self, task_id):
+        self.request = SimpleNamespace(id=task_id)
+        self.reruns = []
+
+    def apply_async(self, args=(), kwargs=None):
+        self.reruns.append((args, kwargs))
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(locks, 'get_redis', lambda: client)
+    return client
+
+def test_lease_is_exclusive_and_token_checked(redis):
+    first = TaskLease('job', ttl=10)
+    second = TaskLease('job', ttl=10)
+
+    assert first.acquire()
+    assert not second.acquire()
+    assert not second.release()  # Mauvais jeton : le bail reste détenu
+    assert not second.extend()
+    assert first.extend()
+    assert first.release()
+    assert second.acquire()
+
+def test_keep_alive_extends_long_runs(redis):
+    lease = TaskLease('job', ttl=0.15)
+    assert lease.acquire()
+
+    lease.keep_alive(interval=0.03)
+    time.sleep(0.4)
+    still_held = not TaskLease('job', ttl=1).acquire()
+    lease.release()
+
+    assert still_held
+    assert not lease.lost
+
+def test_skip_policy_skips_overlapping_runs(redis):
+    calls = []
+
+    @single_instance('job', ttl=10, policy='skip')
+    def job(task, value):
+        calls.append(value)
+        # Exécution concurrente pendant que le bail est détenu
+        return job(FakeTask('t-2'), value + 1) if value == 1 else value
+
+    result = job(FakeTask('t-1'), 1)
+
+    assert calls == [1]
+    assert result == {'status': 'skipped', 'reason': 'running', 'task_id': 't-2'}
+    assert guard_metrics()['job'] == {'acquired': 1, 'contended': 1, 'skipped': 1}
+
+def test_redelivered_message_is_not_run_twice(redis):
+    calls = []
+
+    @single_instance('job', ttl=10)
+    def job(task):
+        calls.append(task.request.id)
+        return 'done'
+
+    assert job(FakeTask('t-1')) == 'done'
+    assert job(FakeTask('t-1'))['reason'] == 'duplicate'
+    assert job(FakeTask('t-2')) == 'done'
+    assert calls == ['t-1', 't-2']
+
+def test_coalesce_policy_reruns_once(redis):
+    outer = FakeTask('t-1')
+
+    @single_instance('job', ttl=10, policy='coalesce')
+    def job(task):
+        if task is outer:
+            assert job(FakeTask('t-2'))['status'] == 'coalesced'
+            assert job(FakeTask('t-3'))['status'] == 'coalesced'
+        return 'done'
+
+    assert job(outer) == 'done'
+    assert outer.reruns == [((), {})]
+    assert guard_metrics()['job']['coalesced'] == 2
+    assert guard_metrics()['job']['rerun'] == 1
+
+def test_held_lease_is_released_by_follow_up(redis):
+    tokens = []
+
+    @single_instance('job', ttl=10, hold=True)
+    def job(task):
+        tokens.append(current_lease().token)
+        return 'dispatched'
+
+    assert job(FakeTask('t-1')) == 'dispatched'
+    assert current_lease() is None
+    assert job(FakeTask('t-2'))['status'] == 'skipped'
+
+    release_lease(TaskLease('job', token=tokens[0]))
+    assert job(FakeTask('t-3')) == 'dispatched'
+
+def test_runs_unguarded_without_redis(monkeypatch):
+    def unavailable():
+        raise ConnectionError("redis indisponible")
+
+    monkeypatch.setattr(locks, 'get_redis', unavailable)
+
+    @single_instance('job')
+    def job(task):
+        return 'done'
+
+    assert job(FakeTask('t-1')) == 'done'
@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+from backend.app.tasks.runtime import AsyncRuntime
+
+@pytest.fixture
+def runtime():
+    runtime = AsyncRuntime()
+    yield runtime
+    runtime.stop()
+
+def test_run_reuses_single_loop(runtime):
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    first = runtime.run(current_loop())
+    second = runtime.run(current_loop())
+
+    assert first is second is runtime.loop
+
+def test_run_batch_limits_concurrency(runtime):
+    in_flight = 0
+    peak = 0
+
+    async def refresh(i):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if i == 3:
+            raise ValueError("quota")
+        return i * 2
+
+    results = runtime.map(refresh, range(20), concurrency=5)
+
+    assert peak == 5
+    assert isinstance(results[3], ValueError)
+    assert [r for i, r in enumerate(results) if i != 3] == [i * 2 for i in range(20) if i != 3]
+
+def test_http_session_is_shared(runtime):
+    session = runtime.http_session()
+
+    assert runtime.http_session() is session
+    runtime.stop()
+    assert session.closed